@@ -0,0 +1,49 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class BandPool:
+    """Persistent thread pool that runs a per-pixel kernel over horizontal bands.
+
+    ``run(kernel, img, out)`` calls ``kernel(src_band, out_band)`` for
+    row bands of the image, each writing its own slice of one shared
+    output buffer. The NumPy and OpenCV kernels used for the color
+    transforms release the GIL, so bands can run on separate cores, and
+    as every output pixel depends only on its input pixel the result is
+    byte-identical to a single call over the whole frame. How much this
+    gains depends on the machine; it has only been checked for
+    correctness so far, on one core (``benchmark.py --threads``
+    measures it).
+    """
+
+    def __init__(self, workers=None, min_band_pixels=1 << 16):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_band_pixels = min_band_pixels
+        self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="band") if self.workers > 1 else None
+
+    def band_count(self, shape):
+        """One band per worker, but no band smaller than min_band_pixels"""
+        height, width = shape[:2]
+        return max(1, min(self.workers, height, height * width // self.min_band_pixels))
+
+    def bands(self, height, count):
+        edges = np.linspace(0, height, count + 1).astype(int)
+        return [slice(a, b) for a, b in zip(edges[:-1], edges[1:])]
+
+    def run(self, kernel, img, out):
+        count = self.band_count(img.shape)
+        if count == 1 or self.executor is None:
+            kernel(img, out)
+            return out
+        futures = [self.executor.submit(kernel, img[band], out[band])
+                   for band in self.bands(img.shape[0], count)]
+        for future in futures:
+            future.result()
+        return out
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
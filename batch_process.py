@@ -0,0 +1,192 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from color_engine import ColorEngine
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp'}
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv', '.m4v', '.webm'}
+CB_TYPES = ['protanopia', 'deuteranopia', 'tritanopia']
+MODES = ['simulated', 'corrected']
+
+# One engine per worker process, created by init_worker
+_engine = None
+
+
+def init_worker(backend):
+    global _engine
+    _engine = ColorEngine(backend=backend)
+
+
+def transform_frame(frame, jobs):
+    """Run every (cb_type, mode, strength) job on one BGR frame.
+
+    The RGB matrices are applied in RGB order, and the results are
+    returned as BGR frames ready for imwrite or VideoWriter.
+    """
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    results = []
+    for cb_type, mode, strength in jobs:
+        if mode == 'simulated':
+            out = _engine.simulate_color_blindness(rgb, cb_type)
+        else:
+            out = _engine.daltonize_image(rgb, cb_type, strength)
+        results.append(cv2.cvtColor(out, cv2.COLOR_RGB2BGR))
+    return results
+
+
+def process_image(path, outputs, jobs):
+    """Worker task: transform one image file and write every output"""
+    frame = cv2.imread(path, cv2.IMREAD_COLOR)
+    if frame is None:
+        return path, 0, "could not read image"
+    for out_path, result in zip(outputs, transform_frame(frame, jobs)):
+        os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+        if not cv2.imwrite(out_path, result):
+            return path, 0, f"could not write {out_path}"
+    return path, frame.shape[0] * frame.shape[1], None
+
+
+def output_paths(path, root, out_dir, jobs, ext=None):
+    """<out_dir>/<path relative to root>/<stem>_<type>_<mode><ext>"""
+    rel_dir = os.path.relpath(os.path.dirname(os.path.abspath(path)), root)
+    stem, path_ext = os.path.splitext(os.path.basename(path))
+    return [
+        os.path.normpath(os.path.join(out_dir, rel_dir, f"{stem}_{cb_type}_{mode}{ext or path_ext}"))
+        for cb_type, mode, _ in jobs
+    ]
+
+
+def collect_inputs(inputs):
+    """Split command-line inputs into (path, root) image and video lists"""
+    images, videos = [], []
+    for item in inputs:
+        if os.path.isdir(item):
+            root = os.path.abspath(item)
+            for dirpath, _, filenames in os.walk(item):
+                for name in sorted(filenames):
+                    ext = os.path.splitext(name)[1].lower()
+                    path = os.path.join(dirpath, name)
+                    if ext in IMAGE_EXTENSIONS:
+                        images.append((path, root))
+                    elif ext in VIDEO_EXTENSIONS:
+                        videos.append((path, root))
+        elif os.path.isfile(item):
+            root = os.path.dirname(os.path.abspath(item))
+            ext = os.path.splitext(item)[1].lower()
+            if ext in VIDEO_EXTENSIONS:
+                videos.append((item, root))
+            else:
+                images.append((item, root))
+        else:
+            print(f"⚠️ Skipping missing input: {item}")
+    return images, videos
+
+
+def run_images(pool, images, out_dir, jobs):
+    pixels = 0
+    failures = 0
+    tasks = [(path, output_paths(path, root, out_dir, jobs), jobs) for path, root in images]
+    for path, count, error in pool.map(process_image, *zip(*tasks), chunksize=4) if tasks else []:
+        if error:
+            failures += 1
+            print(f"❌ {path}: {error}")
+        pixels += count
+    return len(images) - failures, pixels
+
+
+def run_video(pool, path, root, out_dir, jobs, workers):
+    """Stream one video through the pool, keeping only a few frames in flight"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        print(f"❌ {path}: could not open video")
+        return 0, 0
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    writers = []
+    for out_path in output_paths(path, root, out_dir, jobs, ext='.mp4'):
+        os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+        writers.append(cv2.VideoWriter(out_path, fourcc, fps, (width, height)))
+
+    pending = deque()
+    frames = 0
+
+    def write_next():
+        for writer, result in zip(writers, pending.popleft().result()):
+            writer.write(result)
+
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            pending.append(pool.submit(transform_frame, frame, jobs))
+            frames += 1
+            if len(pending) >= workers * 2:
+                write_next()
+        while pending:
+            write_next()
+    finally:
+        cap.release()
+        for writer in writers:
+            writer.release()
+    return frames, frames * width * height
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render simulated and daltonized versions of images and videos"
+    )
+    parser.add_argument("inputs", nargs="+", help="image files, video files or directories")
+    parser.add_argument("-o", "--output", default="batch_output", help="output directory")
+    parser.add_argument("-t", "--type", nargs="+", choices=CB_TYPES + ['all'], default=['all'],
+                        help="color vision deficiency types")
+    parser.add_argument("-m", "--mode", nargs="+", choices=MODES + ['both'], default=['both'],
+                        help="view modes to render")
+    parser.add_argument("--strength", type=float, default=0.7, help="daltonization strength")
+    parser.add_argument("--backend", choices=["fused", "lut", "matrix"], default="fused")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    cb_types = CB_TYPES if 'all' in args.type else args.type
+    modes = MODES if 'both' in args.mode else args.mode
+    jobs = [(cb_type, mode, args.strength) for cb_type in cb_types for mode in modes]
+
+    images, videos = collect_inputs(args.inputs)
+    if not images and not videos:
+        print("❌ No images or videos found.")
+        return 1
+
+    print(f"🎨 Processing {len(images)} image(s) and {len(videos)} video(s) "
+          f"with {args.workers} worker(s), {len(jobs)} output(s) each")
+    start = time.perf_counter()
+    frames = 0
+    pixels = 0
+    with ProcessPoolExecutor(args.workers, initializer=init_worker, initargs=(args.backend,)) as pool:
+        done, count = run_images(pool, images, args.output, jobs)
+        frames += done
+        pixels += count
+        for path, root in videos:
+            done, count = run_video(pool, path, root, args.output, jobs, args.workers)
+            print(f"🎞️ {path}: {done} frames")
+            frames += done
+            pixels += count
+    elapsed = time.perf_counter() - start
+
+    print("=" * 40)
+    print(f"✅ {frames} frame(s), {frames * len(jobs)} output frame(s) in {elapsed:.2f} s")
+    if elapsed > 0:
+        print(f"   {frames / elapsed:.1f} input frames/s | "
+              f"{pixels * len(jobs) / elapsed / 1e6:.1f} output megapixels/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# Color of the top-left 2x2 sites of each CFA pattern, in reading order
+CFA_PATTERNS = ('RGGB', 'BGGR', 'GRBG', 'GBRG')
+_BGR_CHANNEL = {'B': 0, 'G': 1, 'R': 2}
+_SITES = ((0, 0), (0, 1), (1, 0), (1, 1))
+
+# OpenCV names Bayer codes after the second row, so RGGB is "BayerBG"
+_OPENCV_NAMES = {'RGGB': 'BG', 'BGGR': 'RG', 'GRBG': 'GB', 'GBRG': 'GR'}
+DEMOSAIC_ALGORITHMS = {
+    'bilinear': '',
+    'vng': '_VNG',       # variable number of gradients, sharper edges
+    'ea': '_EA',         # edge-aware
+}
+# Rows of context a band needs on each side to demosaic like the whole frame (kept even)
+_HALO_ROWS = 4
+# VNG demosaics images shorter than this differently, so bands at the frame edges are widened to it
+_MIN_SCRATCH_ROWS = 8
+
+
+def _check_pattern(pattern):
+    if pattern not in CFA_PATTERNS:
+        raise ValueError(f"Unknown CFA pattern {pattern!r}; expected one of {', '.join(CFA_PATTERNS)}")
+
+
+def demosaic_code(pattern, algorithm='bilinear'):
+    """cv2.cvtColor code turning a pattern's mosaic into BGR"""
+    _check_pattern(pattern)
+    if algorithm not in DEMOSAIC_ALGORITHMS:
+        raise ValueError(f"Unknown demosaic algorithm {algorithm!r}; "
+                         f"expected one of {', '.join(DEMOSAIC_ALGORITHMS)}")
+    return getattr(cv2, f"COLOR_Bayer{_OPENCV_NAMES[pattern]}2BGR{DEMOSAIC_ALGORITHMS[algorithm]}")
+
+
+def mosaic(image, pattern='RGGB', out=None):
+    """Single-plane raw mosaic of a BGR image, as a sensor with this CFA would record it"""
+    _check_pattern(pattern)
+    h, w = image.shape[:2]
+    if out is None:
+        out = np.empty((h, w), dtype=np.uint8)
+    for (dy, dx), color in zip(_SITES, pattern):
+        out[dy::2, dx::2] = image[dy::2, dx::2, _BGR_CHANNEL[color]]
+    return out
+
+
+def demosaic(raw, pattern='RGGB', algorithm='bilinear', out=None):
+    """BGR image from a single-plane mosaic"""
+    code = demosaic_code(pattern, algorithm)
+    if algorithm != 'bilinear':
+        # VNG and EA do not write into a caller's buffer
+        result = cv2.cvtColor(raw, code)
+        if out is None:
+            return result
+        np.copyto(out, result)
+        return out
+    return cv2.cvtColor(raw, code, dst=out)
+
+
+class BayerPipeline:
+    """Demosaic and color transform fused band by band.
+
+    Each band of rows (plus a few rows of context) is demosaiced into a
+    small per-thread scratch buffer that stays in cache, and the color
+    kernel writes it straight into the shared output, so no full-frame
+    intermediate image is allocated. Bands run on a BandPool when one is
+    given. Output matches demosaic() followed by the kernel.
+    """
+
+    def __init__(self, pattern='RGGB', algorithm='bilinear', band_pool=None, band_rows=128):
+        demosaic_code(pattern, algorithm)
+        if band_rows % 2:
+            raise ValueError("band_rows must be even to keep the CFA phase")
+        self.pattern = pattern
+        self.algorithm = algorithm
+        self.band_pool = band_pool
+        self.band_rows = band_rows
+        self._local = threading.local()
+        self._output = None
+
+    def _scratch(self, rows, width):
+        buffer = getattr(self._local, 'scratch', None)
+        if buffer is None or buffer.shape[0] < rows or buffer.shape[1] != width:
+            buffer = self._local.scratch = np.empty((rows, width, 3), dtype=np.uint8)
+        return buffer[:rows]
+
+    def _rows(self, raw, kernel, out, start, stop):
+        """Demosaic rows start:stop with context, then apply the kernel into out"""
+        h, w = raw.shape
+        step = self.band_rows
+        for a in range(start, stop, step):
+            b = min(a + step, stop)
+            top = max(a - _HALO_ROWS, 0)
+            bottom = min(b + _HALO_ROWS, h)
+            if bottom - top < _MIN_SCRATCH_ROWS:
+                top = max(min(top, bottom - _MIN_SCRATCH_ROWS) & ~1, 0)
+                bottom = min(max(bottom, top + _MIN_SCRATCH_ROWS), h)
+            scratch = self._scratch(bottom - top, w)
+            demosaic(raw[top:bottom], self.pattern, self.algorithm, out=scratch)
+            kernel(scratch[a - top:b - top], out[a:b])
+
+    def process(self, raw, kernel=None):
+        """BGR output of kernel(demosaic(raw)); valid until the next call"""
+        h, w = raw.shape
+        if self._output is None or self._output.shape != (h, w, 3):
+            self._output = np.empty((h, w, 3), dtype=np.uint8)
+        out = self._output
+        if kernel is None:
+            kernel = lambda img, dst: np.copyto(dst, img)
+        executor = self.band_pool.executor if self.band_pool is not None else None
+        if executor is None:
+            self._rows(raw, kernel, out, 0, h)
+            return out
+        # Split on even rows so every band starts on the same CFA phase
+        count = self.band_pool.band_count((h, w))
+        edges = sorted({(h * i // count) & ~1 for i in range(count)} | {h})
+        futures = [executor.submit(self._rows, raw, kernel, out, a, b) for a, b in zip(edges[:-1], edges[1:])]
+        for future in futures:
+            future.result()
+        return out
+
+
+class RawBayerSource:
+    """cv2.VideoCapture-like reader of raw Bayer frames from .npy or .raw files.
+
+    ``.npy`` files hold one (height, width) mosaic or a (frames, height,
+    width) sequence. ``.raw`` files are headerless frames of ``width`` x
+    ``height`` samples back to back; ``dtype`` may be uint16 for 10-16
+    bit sensors, scaled down by ``bits - 8``. Files are memory-mapped and
+    frames are returned as fast as they are read unless ``fps`` is set;
+    with ``loop`` the sequence restarts at the end.
+    """
+
+    def __init__(self, path, width=None, height=None, dtype=np.uint8, bits=None, fps=None, loop=True):
+        if path.lower().endswith('.npy'):
+            frames = np.load(path, mmap_mode='r')
+            if frames.ndim == 2:
+                frames = frames[np.newaxis]
+        else:
+            if not width or not height:
+                raise ValueError(".raw files need width and height")
+            frame_bytes = width * height * np.dtype(dtype).itemsize
+            size = os.path.getsize(path)
+            if size < frame_bytes:
+                raise ValueError(f"{path} holds {size} bytes, less than one {width}x{height} frame")
+            frames = np.memmap(path, dtype=dtype, mode='r', shape=(size // frame_bytes, height, width))
+        if frames.ndim != 3 or not len(frames):
+            raise ValueError(f"{path} holds no (height, width) Bayer frames")
+        self.frames = frames
+        self.shift = max((bits or 8 * frames.dtype.itemsize) - 8, 0) if frames.dtype != np.uint8 else 0
+        self.interval = 1.0 / fps if fps else 0.0
+        self.loop = loop
+        self.index = 0
+        self.next_time = None
+
+    def __len__(self):
+        return len(self.frames)
+
+    def isOpened(self):
+        return self.frames is not None
+
+    def read(self):
+        if self.frames is None:
+            return False, None
+        if self.index >= len(self.frames):
+            if not self.loop:
+                return False, None
+            self.index = 0
+        if self.interval:
+            now = time.perf_counter()
+            if self.next_time is not None and self.next_time > now:
+                time.sleep(self.next_time - now)
+            self.next_time = max((self.next_time or now) + self.interval, now)
+        frame = self.frames[self.index]
+        self.index += 1
+        if self.shift:
+            return True, (frame >> self.shift).astype(np.uint8)
+        return True, np.ascontiguousarray(frame)
+
+    def release(self):
+        self.frames = None
@@ -0,0 +1,226 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from band_pool import BandPool
+from bayer import demosaic, mosaic
+from color_engine import ColorEngine
+
+RESOLUTIONS = {
+    '480p': (480, 640),
+    '720p': (720, 1280),
+    '1080p': (1080, 1920),
+    '4K': (2160, 3840),
+}
+
+
+def synthetic_frame(height, width, seed=0):
+    """Camera-like BGR frame: smooth color gradients, a few flat objects and sensor noise"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    frame = np.empty((height, width, 3), dtype=np.float32)
+    frame[..., 0] = 128 + 100 * np.sin(x / width * 3.1 + 0.5)
+    frame[..., 1] = 128 + 100 * np.sin(y / height * 2.3 + 1.7)
+    frame[..., 2] = 128 + 100 * np.cos((x + y) / (width + height) * 4.0)
+    for _ in range(12):
+        cx, cy = rng.integers(0, width), rng.integers(0, height)
+        radius = int(rng.integers(height // 20, height // 5))
+        color = tuple(float(c) for c in rng.integers(0, 256, 3))
+        cv2.circle(frame, (int(cx), int(cy)), radius, color, -1)
+    frame += rng.normal(0, 4, frame.shape).astype(np.float32)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def naming_samples(count=5000, seed=1):
+    """Pixels sampled from a synthetic scene, so repeats and near-duplicates occur as in real use"""
+    frame = synthetic_frame(480, 640, seed)
+    rng = np.random.default_rng(seed)
+    ys = rng.integers(0, frame.shape[0], count)
+    xs = rng.integers(0, frame.shape[1], count)
+    return frame[ys, xs, ::-1].copy()
+
+
+def measure(func, repeats, warmup=1, min_time=0.0):
+    """Median/min/p95 latency in seconds and peak traced memory in bytes"""
+    for _ in range(warmup):
+        func()
+    times = []
+    start = time.perf_counter()
+    while len(times) < repeats or time.perf_counter() - start < min_time:
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    times = np.array(times)
+    return {
+        'median_s': float(np.median(times)),
+        'min_s': float(times.min()),
+        'p95_s': float(np.percentile(times, 95)),
+        'runs': len(times),
+        'peak_bytes': int(peak),
+    }
+
+
+def frame_benchmarks(engine, frame):
+    """Per-frame hot paths, keyed by benchmark name"""
+    matrix = engine.color_matrices['protanopia']
+    raw = mosaic(frame)
+    rgb = frame[..., ::-1].copy()
+    cases = {
+        'apply_color_matrix': lambda: engine.apply_color_matrix(frame, matrix),
+        'analyse_frame_stats': lambda: engine.analyse_frame(rgb),
+        'bayer.mosaic': lambda: mosaic(frame),
+        'bayer.demosaic': lambda: demosaic(raw),
+        'demosaic+simulate[separate]': lambda: engine.transform(demosaic(raw), 'protanopia', 'simulated'),
+        'demosaic+simulate[fused]': lambda: engine.demosaic_transform(raw, 'protanopia'),
+    }
+    for backend in ('matrix', 'lut', 'fused'):
+        cases[f'simulate[{backend}]'] = (
+            lambda b=backend: engine.transform(frame, 'protanopia', 'simulated', backend=b))
+        cases[f'daltonize_image[{backend}]'] = (
+            lambda b=backend: engine.transform(frame, 'protanopia', 'corrected', 0.7, backend=b))
+    return cases
+
+
+def naming_benchmarks(engine, samples):
+    index = engine.color_index
+
+    def single_uncached():
+        index.clear_cache()
+        for rgb in samples[:500]:
+            engine.get_color_name_advanced(rgb)
+
+    def single_cached():
+        for rgb in samples[:500]:
+            engine.get_color_name_advanced(rgb)
+
+    return {
+        'get_color_name_advanced[500 px, cold]': single_uncached,
+        'get_color_name_advanced[500 px, warm]': single_cached,
+        f'get_color_names[{len(samples)} px batch]': lambda: engine.get_color_names(samples),
+    }
+
+
+def scaling_benchmarks(resolutions, thread_counts, repeats, min_time):
+    """Band-parallel transforms per thread count, with speedup over one thread"""
+    results = {}
+    for res in resolutions:
+        frame = synthetic_frame(*RESOLUTIONS[res])
+        for backend in ('fused', 'lut'):
+            base = None
+            for threads in thread_counts:
+                pool = BandPool(threads)
+                engine = ColorEngine(backend=backend, band_pool=pool)
+                stats = measure(lambda: engine.transform(frame, 'protanopia', 'corrected', 0.7),
+                                repeats, min_time=min_time)
+                pool.shutdown()
+                base = base or stats['median_s']
+                stats['speedup'] = base / stats['median_s'] if stats['median_s'] else 0.0
+                name = f'daltonize_image[{backend}, {threads} threads]@{res}'
+                results[name] = stats
+                print(f"{name:<42} {stats['median_s'] * 1e3:9.2f} ms {stats['speedup']:8.2f}x")
+    return results
+
+
+def run(resolutions, repeats, min_time):
+    engine = ColorEngine()
+    # Bake LUTs and build the naming index outside the timed region
+    engine.transform(np.zeros((1, 1, 3), np.uint8), 'protanopia', 'simulated', backend='lut')
+    engine.transform(np.zeros((1, 1, 3), np.uint8), 'protanopia', 'corrected', 0.7, backend='lut')
+    engine.get_color_name_advanced((0, 0, 0))
+
+    results = {}
+    for res in resolutions:
+        frame = synthetic_frame(*RESOLUTIONS[res])
+        for name, func in frame_benchmarks(engine, frame).items():
+            stats = measure(func, repeats, min_time=min_time)
+            stats['fps'] = 1.0 / stats['median_s'] if stats['median_s'] else float('inf')
+            results[f'{name}@{res}'] = stats
+            print(f"{name + '@' + res:<42} {stats['median_s'] * 1e3:9.2f} ms "
+                  f"{stats['fps']:9.1f} fps {stats['peak_bytes'] / 1e6:9.1f} MB")
+
+    samples = naming_samples()
+    for name, func in naming_benchmarks(engine, samples).items():
+        stats = measure(func, repeats, min_time=min_time)
+        results[name] = stats
+        print(f"{name:<42} {stats['median_s'] * 1e3:9.2f} ms {'':>13} {stats['peak_bytes'] / 1e6:9.1f} MB")
+    return results
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print the change per benchmark and return the names that regressed.
+
+    Best-of-N latency is compared, as it is far less noisy than the median.
+    """
+    regressions = []
+    print(f"\n{'benchmark':<42} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, stats in results.items():
+        old = baseline.get('results', {}).get(name)
+        if old is None:
+            continue
+        change = stats['min_s'] / old['min_s'] - 1 if old['min_s'] else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  ⚠️ REGRESSION"
+        print(f"{name:<42} {old['min_s'] * 1e3:8.2f}ms {stats['min_s'] * 1e3:8.2f}ms "
+              f"{change:+7.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the color transform and naming hot paths")
+    parser.add_argument("-r", "--resolutions", nargs="+", choices=list(RESOLUTIONS), default=list(RESOLUTIONS))
+    parser.add_argument("-n", "--repeats", type=int, default=10, help="timed runs per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.0, help="minimum seconds per benchmark")
+    parser.add_argument("--threads", type=int, nargs="+", metavar="N",
+                        help="also measure band-parallel transforms with these thread counts (e.g. 1 2 4 8)")
+    parser.add_argument("--save", metavar="JSON", help="write results as a baseline file")
+    parser.add_argument("--compare", metavar="JSON", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="best-of-N slowdown treated as a regression (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results = run(args.resolutions, args.repeats, args.min_time)
+    if args.threads:
+        print()
+        results.update(scaling_benchmarks(args.resolutions, args.threads, args.repeats, args.min_time))
+    report = {'environment': environment(), 'repeats': args.repeats, 'results': results}
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,384 @@
+import multiprocessing as mp
+import threading
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+# Header layout (int64): [newest sequence number, slot sequence numbers...]
+# A slot holds sequence -1 while it is being written.
+_HEADER_FIELDS = 1
+
+
+class SyntheticSource:
+    """Moving color bars with a frame counter, in place of a camera"""
+
+    def __init__(self, width=640, height=480, fps=30):
+        self.width = width
+        self.height = height
+        self.interval = 1.0 / fps if fps else 0.0
+        self.index = 0
+        self.next_time = None
+        x = np.arange(width, dtype=np.float32) / width
+        self.bars = np.empty((height, width, 3), dtype=np.uint8)
+        self.bars[..., 0] = (np.sin(x * 6.28) * 127 + 128).astype(np.uint8)
+        self.bars[..., 1] = (np.sin(x * 6.28 + 2.09) * 127 + 128).astype(np.uint8)
+        self.bars[..., 2] = (np.sin(x * 6.28 + 4.19) * 127 + 128).astype(np.uint8)
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        now = time.perf_counter()
+        if self.next_time is None:
+            self.next_time = now
+        if self.next_time > now:
+            time.sleep(self.next_time - now)
+        self.next_time = max(self.next_time + self.interval, now)
+        frame = np.roll(self.bars, self.index * 4, axis=1)
+        cv2.putText(frame, str(self.index), (10, self.height - 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        self.index += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+
+class LoopingFileSource:
+    """Video file played in a loop at its own frame rate"""
+
+    def __init__(self, path):
+        self.capture = cv2.VideoCapture(path)
+        fps = self.capture.get(cv2.CAP_PROP_FPS) or 30
+        self.interval = 1.0 / fps
+        self.next_time = None
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def read(self):
+        ret, frame = self.capture.read()
+        if not ret:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.capture.read()
+        now = time.perf_counter()
+        if self.next_time is not None and self.next_time > now:
+            time.sleep(self.next_time - now)
+        self.next_time = max((self.next_time or now) + self.interval, now)
+        return ret, frame
+
+    def release(self):
+        self.capture.release()
+
+
+def open_source(source):
+    """Camera index, video file path, or "synthetic" / ("synthetic", width, height, fps)"""
+    if isinstance(source, int):
+        return cv2.VideoCapture(source)
+    if source == "synthetic":
+        return SyntheticSource()
+    if isinstance(source, tuple) and source and source[0] == "synthetic":
+        return SyntheticSource(*source[1:])
+    return LoopingFileSource(source)
+
+
+def parse_source(text, width=640, height=480, fps=30):
+    """Source for open_source() from a command-line or environment string"""
+    if text.isdigit():
+        return int(text)
+    if text == "synthetic":
+        return ("synthetic", width, height, fps)
+    return text
+
+
+class FrameRing:
+    """Ring of equally sized frames in one shared memory block.
+
+    A single writer fills slots round-robin; any number of readers in
+    other threads or processes get numpy views of the newest slot
+    without copying. A view stays intact for about ``slots - 1`` frame
+    periods, after which the writer reuses the slot; ``intact(seq)``
+    tells whether it still holds frame seq, and ``copy(seq)`` returns a
+    copy that is checked after copying.
+    """
+
+    def __init__(self, shape, slots=4, name=None, create=False):
+        self.shape = tuple(shape)
+        self.slots = slots
+        frame_bytes = int(np.prod(self.shape))
+        header_bytes = 8 * (_HEADER_FIELDS + slots)
+        # Keep frames 64-byte aligned
+        self.offset = (header_bytes + 63) // 64 * 64
+        size = self.offset + frame_bytes * slots
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.owner = create
+        self.header = np.ndarray(_HEADER_FIELDS + slots, dtype=np.int64, buffer=self.shm.buf)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf, offset=self.offset)
+        if create:
+            self.header[:] = -1
+            self.header[0] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def newest(self):
+        return int(self.header[0])
+
+    def write(self, frame, seq):
+        """Store frame as sequence number seq (1, 2, ...)"""
+        slot = seq % self.slots
+        self.header[_HEADER_FIELDS + slot] = -1
+        np.copyto(self.frames[slot], frame)
+        self.header[_HEADER_FIELDS + slot] = seq
+        self.header[0] = seq
+
+    def view(self, seq):
+        """Read-only view of frame seq, or None if it has been overwritten"""
+        slot = seq % self.slots
+        if self.header[_HEADER_FIELDS + slot] != seq:
+            return None
+        frame = self.frames[slot]
+        view = frame.view()
+        view.flags.writeable = False
+        return view
+
+    def intact(self, seq):
+        """Whether frame seq has not been overwritten (yet)"""
+        header = self.header
+        return header is not None and header[_HEADER_FIELDS + seq % self.slots] == seq
+
+    def copy(self, seq, out=None):
+        """Copy of frame seq, or None if it was overwritten before or while copying"""
+        view = self.view(seq)
+        if view is None:
+            return None
+        if out is None:
+            out = np.empty(self.shape, dtype=np.uint8)
+        np.copyto(out, view)
+        return out if self.intact(seq) else None
+
+    def close(self):
+        # Drop our views before closing the mapping
+        self.header = None
+        self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # A reader still holds a view; the mapping goes away with the last one
+            pass
+        if self.owner:
+            self.shm.unlink()
+
+
+def _capture_main(source, conn, stop_event, slots):
+    """Capture process: open the source, report the frame shape, then fill the ring"""
+    capture = open_source(source)
+    ring = None
+    try:
+        ret, frame = capture.read() if capture.isOpened() else (False, None)
+        if not ret:
+            conn.send(("error", f"Cannot open camera source {source!r}"))
+            return
+        conn.send(("shape", frame.shape))
+        name = conn.recv()
+        ring = FrameRing(frame.shape, slots, name=name)
+        seq = 0
+        while not stop_event.is_set():
+            if frame.shape != ring.shape:
+                frame = cv2.resize(frame, (ring.shape[1], ring.shape[0]))
+            seq += 1
+            ring.write(frame, seq)
+            ret, frame = capture.read()
+            if not ret:
+                break
+    finally:
+        capture.release()
+        if ring is not None:
+            ring.close()
+        conn.close()
+
+
+class CameraBroker:
+    """One capture process per device, fanned out to many subscribers.
+
+    The capture process writes into a FrameRing; every subscriber reads
+    the newest frame from it directly. Subscribers are reference
+    counted; when the last one leaves, the device is released after
+    ``linger`` seconds, so a Streamlit rerun that resubscribes
+    immediately does not reopen the camera.
+    """
+
+    def __init__(self, source=0, slots=4, linger=2.0, start_timeout=10.0):
+        self.source = source
+        self.slots = slots
+        self.linger = linger
+        self.start_timeout = start_timeout
+        self.ring = None
+        self.process = None
+        self.error = None
+        self.subscribers = 0
+        self._lock = threading.Lock()
+        # Serializes starting and closing; held while spawning, unlike _lock
+        self._start_lock = threading.Lock()
+        self._stop_event = None
+        self._release_timer = None
+
+    def subscribe(self):
+        with self._start_lock:
+            with self._lock:
+                if self._release_timer is not None:
+                    self._release_timer.cancel()
+                    self._release_timer = None
+                # Counted first, so a pending release cannot stop the process being started
+                self.subscribers += 1
+                needs_start = self.process is None or not self.process.is_alive()
+                if needs_start:
+                    self._shutdown()
+            if needs_start:
+                # Spawning can take seconds; unsubscribers only need _lock meanwhile
+                self._start()
+        return CameraSubscriber(self)
+
+    def unsubscribe(self):
+        with self._lock:
+            self.subscribers = max(self.subscribers - 1, 0)
+            if self.subscribers:
+                return
+            if self.linger > 0:
+                self._release_timer = threading.Timer(self.linger, self._release_if_idle)
+                self._release_timer.daemon = True
+                self._release_timer.start()
+            else:
+                self._shutdown()
+
+    @property
+    def running(self):
+        return self.process is not None and self.process.is_alive() and self.error is None
+
+    def _release_if_idle(self):
+        with self._lock:
+            self._release_timer = None
+            if not self.subscribers:
+                self._shutdown()
+
+    def _start(self):
+        # Spawn rather than fork: the Streamlit server is heavily threaded
+        ctx = mp.get_context("spawn")
+        parent_conn, child_conn = ctx.Pipe()
+        self._stop_event = ctx.Event()
+        self.error = None
+        self.process = ctx.Process(target=_capture_main, name=f"camera-broker-{self.source}",
+                                   args=(self.source, child_conn, self._stop_event, self.slots),
+                                   daemon=True)
+        self.process.start()
+        child_conn.close()
+        try:
+            if not parent_conn.poll(self.start_timeout):
+                self.error = f"Camera source {self.source!r} did not start"
+                return
+            kind, value = parent_conn.recv()
+            if kind == "error":
+                self.error = value
+                return
+            self.ring = FrameRing(value, self.slots, create=True)
+            parent_conn.send(self.ring.name)
+        except (EOFError, OSError) as e:
+            self.error = f"Camera process failed: {e}"
+        finally:
+            parent_conn.close()
+
+    def _shutdown(self):
+        if self.process is not None:
+            self._stop_event.set()
+            self.process.join(2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+            self.process = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def close(self):
+        with self._start_lock, self._lock:
+            if self._release_timer is not None:
+                self._release_timer.cancel()
+                self._release_timer = None
+            self.subscribers = 0
+            self._shutdown()
+
+
+class CameraSubscriber:
+    """cv2.VideoCapture-like reader of a broker's newest frame.
+
+    ``read()`` waits for a frame newer than the last one returned and
+    gives a private copy of it, checked against being overwritten while
+    copying. ``read(copy=False)`` gives a read-only view into shared
+    memory instead, which the writer reuses after about ``slots - 1``
+    frame periods; callers that finish with it quickly (e.g. flip it
+    into their own array) should then confirm ``intact()``.
+    ``release()`` unsubscribes.
+    """
+
+    def __init__(self, broker, poll_interval=0.002):
+        self.broker = broker
+        self.poll_interval = poll_interval
+        self.last_seq = 0
+        self.skipped = 0
+        self.released = False
+
+    def isOpened(self):
+        return not self.released and self.broker.error is None and self.broker.ring is not None
+
+    def read(self, timeout=2.0, copy=True):
+        deadline = time.perf_counter() + timeout
+        while self.isOpened():
+            ring = self.broker.ring
+            seq = ring.newest if ring is not None else 0
+            if seq > self.last_seq:
+                frame = ring.copy(seq) if copy else ring.view(seq)
+                if frame is not None:
+                    if self.last_seq:
+                        self.skipped += seq - self.last_seq - 1
+                    self.last_seq = seq
+                    return True, frame
+            elif not self.broker.running or time.perf_counter() > deadline:
+                break
+            time.sleep(self.poll_interval)
+        return False, None
+
+    def intact(self):
+        """Whether the frame last returned by read(copy=False) is still unchanged"""
+        ring = self.broker.ring
+        return ring is not None and ring.intact(self.last_seq)
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.broker.unsubscribe()
+
+
+_brokers = {}
+_brokers_lock = threading.Lock()
+
+
+def acquire_camera(source=0, **broker_options):
+    """Subscribe to the process-wide broker for a source, starting it if needed"""
+    with _brokers_lock:
+        broker = _brokers.get(source)
+        if broker is None:
+            broker = _brokers[source] = CameraBroker(source, **broker_options)
+    return broker.subscribe()
+
+
+def shutdown_brokers():
+    """Stop every broker in this process, whatever their subscriber counts"""
+    with _brokers_lock:
+        brokers = list(_brokers.values())
+        _brokers.clear()
+    for broker in brokers:
+        broker.close()
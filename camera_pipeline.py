@@ -0,0 +1,146 @@
+import queue
+import threading
+import time
+
+from perf_monitor import PerfMonitor
+
+
+class FramePacer:
+    """Sleeps just long enough to hold a target frame rate"""
+
+    def __init__(self, target_fps=30):
+        self.interval = 1.0 / target_fps if target_fps else 0.0
+        self.next_time = None
+
+    def wait(self):
+        now = time.perf_counter()
+        if self.next_time is None:
+            self.next_time = now
+        self.next_time += self.interval
+        delay = self.next_time - now
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # Running behind: restart the schedule instead of bursting to catch up
+            self.next_time = now
+
+
+def put_latest(q, item):
+    """Put into a bounded queue, discarding the oldest items if it is full.
+
+    Returns the number of items dropped.
+    """
+    dropped = 0
+    while True:
+        try:
+            q.put_nowait(item)
+            return dropped
+        except queue.Full:
+            try:
+                q.get_nowait()
+                dropped += 1
+            except queue.Empty:
+                pass
+
+
+class CameraPipeline:
+    """Capture -> process -> render pipeline for a live camera.
+
+    A capture thread keeps only the newest camera frame, a processing
+    thread runs ``process(frame)`` on it, and the caller renders the
+    results from ``frames()``, paced to ``target_fps``. Stages are linked
+    by bounded queues that drop stale frames instead of building latency.
+    ``stop()`` joins both threads and releases the capture. Stage timings
+    and dropped frames go to ``monitor`` when one is given.
+
+    The capture thread reads copies (``read()``): a queued frame waits
+    for the processing thread, and a camera broker may reuse its shared
+    memory slot meanwhile. The sequential loop, which processes each
+    frame as soon as it is read, reads in place instead.
+    """
+
+    def __init__(self, capture, process, target_fps=30, queue_size=1, monitor=None):
+        self.capture = capture
+        self.process = process
+        self.monitor = monitor or PerfMonitor()
+        self.target_fps = target_fps
+        self.raw_frames = queue.Queue(maxsize=queue_size)
+        self.processed_frames = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.error = None
+        self.captured = 0
+        self.processed = 0
+        self.rendered = 0
+        self.dropped = 0
+
+    def start(self):
+        self.threads = [
+            threading.Thread(target=self._capture_loop, name="camera-capture", daemon=True),
+            threading.Thread(target=self._process_loop, name="camera-process", daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    @property
+    def running(self):
+        return not self.stop_event.is_set()
+
+    def _capture_loop(self):
+        while not self.stop_event.is_set():
+            with self.monitor.stage("capture"):
+                ret, frame = self.capture.read()
+            if not ret:
+                self.error = "Failed to read from camera."
+                self.stop_event.set()
+                break
+            self.captured += 1
+            self._count_dropped(put_latest(self.raw_frames, frame))
+
+    def _process_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                frame = self.raw_frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                result = self.process(frame)
+            except Exception as e:
+                self.error = f"Frame processing failed: {e}"
+                self.stop_event.set()
+                break
+            self.processed += 1
+            self._count_dropped(put_latest(self.processed_frames, result))
+
+    def _count_dropped(self, count):
+        self.dropped += count
+        self.monitor.drop(count)
+
+    def frames(self):
+        """Yield processed frames at the target rate until the pipeline stops"""
+        pacer = FramePacer(self.target_fps)
+        while not self.stop_event.is_set():
+            try:
+                result = self.processed_frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self.rendered += 1
+            yield result
+            pacer.wait()
+
+    def stop(self, timeout=1.0):
+        self.stop_event.set()
+        for thread in self.threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+        self.threads = []
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,144 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from patch_sampler import PatchSampler
+
+
+def _size(value):
+    """Bytes held by arrays in a cached value (tuples and lists are searched)"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_size(item) for item in value)
+    return getattr(value, 'nbytes', 0)
+
+
+class Capture:
+    """Data derived from one captured frame, each piece computed on first use.
+
+    ``image`` is a read-only view of the frame. ``sampler`` holds its
+    integral image, and ``derived(key, compute)`` memoises anything else
+    (statistics, name map, overlays, click results), keeping the most
+    recent ``max_derived`` results.
+    """
+
+    def __init__(self, key, image, max_derived=64, on_grow=None):
+        self.key = key
+        self.image = image.view()
+        self.image.flags.writeable = False
+        self.max_derived = max_derived
+        self._on_grow = on_grow
+        self._sampler = None
+        self._derived = OrderedDict()
+        self._derived_bytes = 0
+
+    @property
+    def sampler(self):
+        if self._sampler is None:
+            self._sampler = PatchSampler(self.image)
+            self._grew()
+        return self._sampler
+
+    @property
+    def nbytes(self):
+        total = self.image.nbytes + self._derived_bytes
+        if self._sampler is not None:
+            total += self._sampler.integral.nbytes
+        return total
+
+    def derived(self, key, compute):
+        """Cached compute() for key, computed on the first request"""
+        if key in self._derived:
+            self._derived.move_to_end(key)
+            return self._derived[key][0]
+        value = compute()
+        size = _size(value)
+        self._derived[key] = (value, size)
+        self._derived_bytes += size
+        while len(self._derived) > self.max_derived:
+            self._drop_oldest()
+        self._grew()
+        return value
+
+    def name_map(self, color_index, tolerance):
+        """Per-pixel name codes (index into color_index.labels) of the whole frame"""
+        def compute():
+            codes = color_index.name_codes(self.image, tolerance)
+            return codes.astype(np.uint16) if len(color_index.labels) < 1 << 16 else codes
+        return self.derived(('name_map', tolerance), compute)
+
+    def release_derived(self):
+        """Forget everything but the frame itself"""
+        self._sampler = None
+        self._derived.clear()
+        self._derived_bytes = 0
+
+    def _drop_oldest(self):
+        _, (_, size) = self._derived.popitem(last=False)
+        self._derived_bytes -= size
+
+    def _grew(self):
+        if self._on_grow is not None:
+            self._on_grow(self)
+
+
+class CaptureCache:
+    """Capture entries keyed by frame content, under a memory cap.
+
+    ``get(frame)`` returns the entry of a frame, hashing its bytes only
+    when a different array object comes in, so reruns on the same
+    capture cost a dictionary lookup. Recapturing adds an entry and
+    evicts the least recently used ones beyond ``max_entries`` or
+    ``max_bytes``. If the current capture alone goes over the cap, its
+    derived data is dropped, oldest first, but the frame is kept.
+    """
+
+    def __init__(self, max_bytes=256 << 20, max_entries=3):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._last_frame = None
+        self._last_entry = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    @staticmethod
+    def content_key(frame):
+        frame = np.ascontiguousarray(frame)
+        digest = hashlib.blake2b(frame.data, digest_size=16)
+        digest.update(repr((frame.shape, frame.dtype.str)).encode())
+        return digest.hexdigest()
+
+    def get(self, frame):
+        if frame is self._last_frame and self._last_entry.key in self._entries:
+            self._entries.move_to_end(self._last_entry.key)
+            return self._last_entry
+        key = self.content_key(frame)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = Capture(key, frame, on_grow=self._trim)
+        self._entries.move_to_end(key)
+        self._last_frame, self._last_entry = frame, entry
+        self._trim(entry)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+        self._last_frame = self._last_entry = None
+
+    def _trim(self, keep):
+        """Evict old captures, then old derived data of keep, until within the caps"""
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self.nbytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            if oldest == keep.key:
+                break
+            del self._entries[oldest]
+        while keep.nbytes > self.max_bytes and keep._derived:
+            keep._drop_oldest()
@@ -0,0 +1,289 @@
+import cv2
+import numpy as np
+from bayer import BayerPipeline, demosaic, mosaic
+from color_lut import LUTCache
+from color_naming import ColorNameIndex
+from cvd_simulation import MACHADO_2009, SRGB_TO_LINEAR, linear_to_srgb, machado_matrix, srgb_to_linear
+from frame_stats import frame_statistics
+
+
+class ColorEngine:
+    """Color blindness transforms and color naming without any UI or hardware.
+
+    Importing this module never opens a camera, a window or a speech
+    engine, so worker processes, scripts and benchmarks can use it
+    directly. model1.py and model2.py call it for naming and transforms;
+    ColorBlindAssist in model3_streamlit.py adds voice output on top.
+
+    The matrices are defined on RGB. Transforms take ``bgr=True`` for
+    OpenCV's BGR frames; the matrices and tables are then permuted to
+    BGR order, so no channel swap is made per frame.
+    """
+
+    def __init__(self, backend="fused", color_index=None, lut_cache=None, band_pool=None):
+        # Enhanced color dictionary
+        self.extended_colors = {
+            'black': '#000000', 'white': '#ffffff', 'red': '#ff0000', 'lime': '#00ff00', 
+            'blue': '#0000ff', 'yellow': '#ffff00', 'cyan': '#00ffff', 'magenta': '#ff00ff',
+            'silver': '#c0c0c0', 'gray': '#808080', 'maroon': '#800000', 'olive': '#808000',
+            'green': '#008000', 'purple': '#800080', 'teal': '#008080', 'navy': '#000080',
+            'orange': '#ffa500', 'pink': '#ffc0cb', 'brown': '#a52a2a', 'gold': '#ffd700',
+            'beige': '#f5f5dc', 'coral': '#ff7f50', 'indigo': '#4b0082', 'violet': '#ee82ee',
+            'crimson': '#dc143c', 'salmon': '#fa8072', 'khaki': '#f0e68c', 'plum': '#dda0dd',
+            'orchid': '#da70d6', 'tan': '#d2691e', 'azure': '#f0ffff', 'lavender': '#e6e6fa',
+            'turquoise': '#40e0d0', 'chocolate': '#d2691e', 'firebrick': '#b22222'
+        }
+        # Naming index over webcolors + extended_colors with HSV fallback, built on first use.
+        # An index or LUT cache can be passed in to share it between engines.
+        self._color_index = color_index
+
+        # Color blindness simulation matrices
+        self.color_matrices = {
+            'protanopia': np.array([
+                [0.56667, 0.43333, 0.00000],
+                [0.55833, 0.44167, 0.00000],
+                [0.00000, 0.24167, 0.75833]
+            ]),
+            'deuteranopia': np.array([
+                [0.625, 0.375, 0.0],
+                [0.7, 0.3, 0.0],
+                [0.0, 0.3, 0.7]
+            ]),
+            'tritanopia': np.array([
+                [0.95, 0.05, 0.0],
+                [0.0, 0.43333, 0.56667],
+                [0.0, 0.475, 0.525]
+            ])
+        }
+
+        # Transform backend for the live view:
+        #   "fused"  - one float32 3x3 transform into a reused buffer (LUT if clipping is needed)
+        #   "lut"    - baked 3D lookup tables
+        #   "matrix" - original float64 matrix path, kept as the reference
+        self.backend = backend
+        self.lut_cache = lut_cache if lut_cache is not None else LUTCache()
+        self._fused_matrices = {}
+        self._output_buffer = None
+        # Optional BandPool: transforms then run over row bands on several cores
+        self.band_pool = band_pool
+        self._bayer_pipelines = {}
+        # Anomalous trichromacy (protanomaly etc.) severity from 0 to 1, and
+        # whether matrices are applied to linear light instead of sRGB values
+        self.severity = 1.0
+        self.linear_rgb = False
+        # Live views set this so a new LUT is baked in the background while a
+        # plain matrix stands in, instead of stalling the stream
+        self.bake_in_background = False
+
+    @property
+    def color_index(self):
+        if self._color_index is None:
+            self._color_index = ColorNameIndex(self.extended_colors, exact_names=True, hsv_fallback=True)
+        return self._color_index
+
+    def hex_to_rgb(self, hex_color):
+        """Convert hex color to RGB"""
+        hex_color = hex_color.lstrip('#')
+        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+    def get_color_name_advanced(self, rgb, tolerance=50):
+        """Advanced color name detection"""
+        return self.color_index.name(rgb, tolerance)
+
+    def get_color_names(self, pixels, tolerance=50):
+        """Name an N x 3 array of colors, or a whole frame, in one call"""
+        return self.color_index.name_many(pixels, tolerance)
+
+    def analyse_frame(self, img, tolerance=50, top_n=8):
+        """Unique colors, dominant palette and average color of a frame"""
+        return frame_statistics(img, top_n, lambda pixels: self.get_color_names(pixels, tolerance))
+
+    def apply_color_matrix(self, img, matrix):
+        """Apply color transformation matrix"""
+        img_float = img.astype(float) / 255.0
+        h, w, c = img_float.shape
+        img_reshaped = img_float.reshape(-1, c)
+        transformed = np.dot(img_reshaped, matrix.T)
+        transformed = np.clip(transformed, 0, 1.0)
+        result = (transformed * 255).astype(np.uint8)
+        return result.reshape(h, w, c)
+
+    def simulates(self, cb_type):
+        """Whether cb_type is a deficiency this engine can simulate"""
+        return cb_type in self.color_matrices or cb_type in MACHADO_2009
+
+    def simulation_matrix(self, cb_type):
+        """Simulation matrix of a deficiency type at the current severity"""
+        if cb_type in MACHADO_2009:
+            return machado_matrix(cb_type, self.severity)
+        return self.color_matrices[cb_type]
+
+    def _lut_key(self, cb_type, mode, strength, bgr=False):
+        severity = self.severity if cb_type in MACHADO_2009 else None
+        return (cb_type, mode, strength, severity, self.linear_rgb, bgr)
+
+    def get_lut(self, cb_type, mode, strength=None, wait=True, bgr=False):
+        """Return the cached LUT for a deficiency type and view mode.
+
+        With wait=False, returns None while a missing table is baked in
+        the background. With bgr=True the table maps BGR colors. Tables
+        that clip or go through linear light are baked exact (8 bits):
+        a coarser grid is off by several levels there, most near black.
+        """
+        matrix = self.simulation_matrix(cb_type)
+        linear = self.linear_rgb
+        if mode == "simulated":
+            transform = lambda img: self._simulate(img, matrix, linear)
+        else:
+            transform = lambda img: self._daltonize(img, matrix, linear, strength)
+        if bgr:
+            rgb_transform = transform
+            transform = lambda img: np.asarray(rgb_transform(img[..., ::-1]))[..., ::-1]
+        key = self._lut_key(cb_type, mode, strength, bgr)
+        bits = 8 if linear or cb_type in MACHADO_2009 else None
+        if wait:
+            return self.lut_cache.get(key, transform, bits)
+        return self.lut_cache.get_nowait(key, transform, bits)
+
+    def get_fused_matrix(self, cb_type, mode, strength=None, bgr=False):
+        """Single 3x3 matrix for simulation or simulation + error correction.
+
+        Daltonizing is img + strength * (img - M img), i.e. one linear map,
+        as long as M never leaves the [0, 1] range on its own. Returns None
+        for matrices that need the intermediate clip.
+        """
+        key = self._lut_key(cb_type, mode, strength, bgr)
+        if key not in self._fused_matrices:
+            matrix = self.simulation_matrix(cb_type)
+            clip_free = bool(np.all(matrix >= 0) and np.all(matrix.sum(axis=1) <= 1 + 1e-6))
+            if not clip_free or self.linear_rgb:
+                fused = None
+            else:
+                fused = self._gamma_matrix(matrix, mode, strength, bgr)
+            self._fused_matrices[key] = fused
+        return self._fused_matrices[key]
+
+    @staticmethod
+    def _gamma_matrix(matrix, mode, strength, bgr=False):
+        """float32 3x3 map applied directly to sRGB values"""
+        if mode != "simulated":
+            matrix = (1 + strength) * np.eye(3) - strength * matrix
+        if bgr:
+            # Same map with inputs and outputs in reverse channel order
+            matrix = matrix[::-1, ::-1]
+        return np.ascontiguousarray(matrix, dtype=np.float32)
+
+    def view_key(self, cb_type, mode, strength=None, bgr=False):
+        """Everything that determines transform() output, for caching results.
+
+        Includes whether the exact transform is ready, so results made
+        with a stand-in matrix while a LUT bakes are not kept.
+        """
+        backend = self.backend
+        key = self._lut_key(cb_type, mode, strength, bgr)
+        exact = (backend == "matrix" or not self.bake_in_background
+                 or (backend == "fused" and self.get_fused_matrix(cb_type, mode, strength, bgr) is not None)
+                 or key in self.lut_cache)
+        return key + (backend, exact)
+
+    def output_buffer(self, img):
+        """Frame-sized uint8 buffer reused across calls"""
+        if self._output_buffer is None or self._output_buffer.shape != img.shape:
+            self._output_buffer = np.empty(img.shape, dtype=np.uint8)
+        return self._output_buffer
+
+    def transform(self, img, cb_type, mode, strength=None, backend=None, out=None, bgr=False):
+        """Run a simulation or correction through the selected backend.
+
+        The fused and LUT backends write into output_buffer(), so the
+        result is only valid until the next call; copy it to keep it.
+        Pass out (which may be a view of a larger frame) to write there
+        instead, e.g. for tiles of varying shapes. img is RGB unless bgr
+        is set. With a band_pool the frame is split into row bands processed in
+        parallel; the output is identical either way.
+        """
+        backend = backend or self.backend
+        kernel = self.kernel(cb_type, mode, strength, backend, bgr)
+        if out is None:
+            out = np.empty(img.shape, dtype=np.uint8) if backend == "matrix" else self.output_buffer(img)
+        if self.band_pool is not None:
+            return self.band_pool.run(kernel, img, out)
+        kernel(img, out)
+        return out
+
+    def kernel(self, cb_type, mode, strength=None, backend=None, bgr=False):
+        """Function writing the transform of an image (or band) into out"""
+        backend = backend or self.backend
+        if backend == "fused":
+            fused = self.get_fused_matrix(cb_type, mode, strength, bgr)
+            if fused is not None:
+                return lambda img, out: cv2.transform(img, fused, dst=out)
+            backend = "lut"
+        if backend == "lut":
+            lut = self.get_lut(cb_type, mode, strength, wait=not self.bake_in_background, bgr=bgr)
+            if lut is None:
+                # sRGB-space matrix until the exact table is ready
+                approximate = self._gamma_matrix(self.simulation_matrix(cb_type), mode, strength, bgr)
+                return lambda img, out: cv2.transform(img, approximate, dst=out)
+            return lambda img, out: lut.apply(img, out=out)
+        matrix = self.simulation_matrix(cb_type)
+        linear = self.linear_rgb
+        order = slice(None, None, -1) if bgr else slice(None)
+        if mode == "simulated":
+            return lambda img, out: np.copyto(out, self._simulate(img[..., order], matrix, linear)[..., order])
+        return lambda img, out: np.copyto(out,
+                                          self._daltonize(img[..., order], matrix, linear, strength)[..., order])
+
+    def compare_backends(self, img, cb_type, mode, strength=None, backend=None):
+        """Largest per-channel difference between a backend and the matrix path"""
+        result = self.transform(img, cb_type, mode, strength, backend).astype(np.int16)
+        reference = self.transform(img, cb_type, mode, strength, backend="matrix")
+        return int(np.abs(result - reference).max())
+
+    def simulate_color_blindness(self, img, cb_type, out=None, bgr=False):
+        """Simulate different types of color blindness"""
+        if self.simulates(cb_type):
+            return self.transform(img, cb_type, "simulated", out=out, bgr=bgr)
+        return img
+
+    def daltonize_image(self, img, cb_type, strength=0.7, out=None, bgr=False):
+        """Apply basic daltonization correction"""
+        if self.simulates(cb_type):
+            return self.transform(img, cb_type, "corrected", strength, out=out, bgr=bgr)
+        return img
+
+    def simulate_matrix(self, img, cb_type):
+        """Simulation through the float matrix path (reference for the LUT)"""
+        return self._simulate(img, self.simulation_matrix(cb_type), self.linear_rgb)
+
+    def _simulate(self, img, matrix, linear):
+        if not linear:
+            return self.apply_color_matrix(img, matrix)
+        light = SRGB_TO_LINEAR[img] if img.dtype == np.uint8 else srgb_to_linear(img / 255.0)
+        simulated = linear_to_srgb((light.reshape(-1, 3) @ matrix.T).reshape(light.shape))
+        return np.rint(simulated * 255).astype(np.uint8)
+
+    def daltonize_matrix(self, img, cb_type, strength=0.7):
+        """Daltonization through the float matrix path (reference for the LUT)"""
+        return self._daltonize(img, self.simulation_matrix(cb_type), self.linear_rgb, strength)
+
+    def _daltonize(self, img, matrix, linear, strength):
+        simulated = self._simulate(img, matrix, linear)
+        error = img.astype(float) - simulated.astype(float)
+        corrected = img.astype(float) + error * strength
+        return np.clip(corrected, 0, 255).astype(np.uint8)
+
+    def demosaic_transform(self, raw, cb_type=None, mode="simulated", strength=None,
+                           pattern='RGGB', algorithm='bilinear'):
+        """Demosaic a single-plane Bayer frame and simulate or correct it in one pass.
+
+        Without cb_type this is a plain demosaic. The result is BGR and is
+        reused by the next call with the same pattern and algorithm.
+        """
+        key = (pattern, algorithm)
+        pipeline = self._bayer_pipelines.get(key)
+        if pipeline is None:
+            pipeline = self._bayer_pipelines[key] = BayerPipeline(pattern, algorithm)
+        pipeline.band_pool = self.band_pool
+        kernel = self.kernel(cb_type, mode, strength, bgr=True) if self.simulates(cb_type) else None
+        return pipeline.process(raw, kernel)
@@ -0,0 +1,159 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class ColorLUT:
+    """3D lookup table baked from a per-pixel uint8 color transform.
+
+    The transform is evaluated once on a regular RGB grid with ``2**bits``
+    levels per channel. Frames are then mapped with a single table lookup
+    per pixel, straight from uint8 to uint8.
+
+    With ``bits=8`` the table is exact (48 MB). With fewer bits each input
+    channel is rounded to the centre of its bin, so the result differs from
+    the transform by at most ``(2**(8 - bits) - 1)`` input levels pushed
+    through the transform, plus one level of rounding.
+    """
+
+    def __init__(self, transform, bits=7):
+        if not 1 <= bits <= 8:
+            raise ValueError(f"bits must be between 1 and 8, got {bits}")
+        self.bits = bits
+        self.shift = 8 - bits
+        self.size = 1 << bits
+        self.table = self._bake(transform)
+        self._local = threading.local()
+
+    def _bake(self, transform):
+        """Evaluate the transform on every grid color, one plane at a time"""
+        size = self.size
+        levels = (np.arange(size, dtype=np.uint16) << self.shift) + ((1 << self.shift) >> 1)
+        levels = levels.astype(np.uint8)
+        c1, c2 = np.meshgrid(levels, levels, indexing='ij')
+        plane = np.empty((size, size, 3), dtype=np.uint8)
+        plane[..., 1] = c1
+        plane[..., 2] = c2
+        table = np.empty((size, size * size, 3), dtype=np.uint8)
+        for i, level in enumerate(levels):
+            plane[..., 0] = level
+            table[i] = np.asarray(transform(plane), dtype=np.uint8).reshape(-1, 3)
+        return table.reshape(-1, 3)
+
+    def _index_buffer(self, shape):
+        """Reusable uint32 buffer for packed grid indices, one per thread"""
+        index = getattr(self._local, 'index', None)
+        if index is None or index.shape != shape:
+            index = self._local.index = np.empty(shape, dtype=np.uint32)
+        return index
+
+    def indices(self, img):
+        """Pack a uint8 (..., 3) image into flat table indices"""
+        img = np.asarray(img, dtype=np.uint8)
+        idx = self._index_buffer(img.shape[:-1])
+        s, b = self.shift, self.bits
+        np.right_shift(img[..., 0], s, out=idx)
+        np.left_shift(idx, b, out=idx)
+        np.bitwise_or(idx, img[..., 1] >> s, out=idx)
+        np.left_shift(idx, b, out=idx)
+        np.bitwise_or(idx, img[..., 2] >> s, out=idx)
+        return idx
+
+    def apply(self, img, out=None):
+        """Map a uint8 (..., 3) image through the table"""
+        img = np.asarray(img, dtype=np.uint8)
+        if out is None:
+            out = np.empty(img.shape, dtype=np.uint8)
+        return np.take(self.table, self.indices(img), axis=0, out=out)
+
+    def max_error(self, transform, img=None, samples=200000, seed=0):
+        """Largest per-channel difference between the table and the transform"""
+        if img is None:
+            rng = np.random.default_rng(seed)
+            img = rng.integers(0, 256, size=(1, samples, 3), dtype=np.uint8)
+        expected = np.asarray(transform(img), dtype=np.int16)
+        return int(np.abs(self.apply(img).astype(np.int16) - expected).max())
+
+
+class LUTCache:
+    """Bakes each keyed transform into a ColorLUT once and keeps the most recent ones.
+
+    At most ``max_entries`` tables and ``max_bytes`` of them are kept
+    (about 6 MB each at 7 bits, 48 MB at 8); the least recently used one
+    is dropped first, but the newest is always kept. ``bits`` can be
+    raised per table, for transforms a 7-bit grid cannot follow closely
+    enough. ``get`` bakes on the calling thread. ``get_nowait`` returns None instead and bakes on one
+    background thread, only ever for the key asked for last, so sweeping
+    a slider through many settings bakes just the one it settles on.
+    """
+
+    def __init__(self, bits=7, max_entries=8, max_bytes=256 << 20):
+        self.bits = bits
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = set()
+        self._latest = None
+
+    def _store(self, key, lut):
+        with self._lock:
+            self._tables[key] = lut
+            self._tables.move_to_end(key)
+            while len(self._tables) > 1 and (len(self._tables) > self.max_entries or self.nbytes > self.max_bytes):
+                self._tables.popitem(last=False)
+
+    @property
+    def nbytes(self):
+        return sum(lut.table.nbytes for lut in self._tables.values())
+
+    def _lookup(self, key):
+        with self._lock:
+            lut = self._tables.get(key)
+            if lut is not None:
+                self._tables.move_to_end(key)
+            return lut
+
+    def get(self, key, transform, bits=None):
+        lut = self._lookup(key)
+        if lut is None:
+            lut = ColorLUT(transform, bits or self.bits)
+            self._store(key, lut)
+        return lut
+
+    def get_nowait(self, key, transform, bits=None):
+        """Cached LUT for key, or None while it is baked in the background"""
+        lut = self._lookup(key)
+        if lut is not None:
+            return lut
+        with self._lock:
+            self._latest = key
+            if key in self._pending:
+                return None
+            self._pending.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(1, thread_name_prefix="lut-bake")
+        self._executor.submit(self._bake, key, transform, bits or self.bits)
+        return None
+
+    def _bake(self, key, transform, bits):
+        try:
+            # Skip settings that were passed over while this one waited
+            if key == self._latest:
+                self._store(key, ColorLUT(transform, bits))
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+
+    def __contains__(self, key):
+        return key in self._tables
+
+    def __len__(self):
+        return len(self._tables)
@@ -0,0 +1,265 @@
+import colorsys
+import math
+import threading
+
+import numpy as np
+
+UNKNOWN_COLOR = "Unknown Color"
+
+# Hue bands used for descriptive names, as (upper bound in degrees, name)
+HUE_BANDS = [
+    (15, "red"), (45, "orange"), (75, "yellow"), (105, "yellow-green"),
+    (135, "green"), (165, "cyan-green"), (195, "cyan"), (225, "blue"),
+    (255, "blue-violet"), (285, "violet"), (315, "magenta"), (345, "red-magenta"),
+]
+GRAY_NAMES = ["very dark gray", "gray", "light gray"]
+VALUE_PREFIXES = ["dark ", "", "bright "]
+SATURATION_PREFIXES = ["pale ", "", "vivid "]
+
+
+def to_rgb(value):
+    """Accept '#rrggbb' strings or (r, g, b) tuples"""
+    if isinstance(value, str):
+        value = value.lstrip('#')
+        return tuple(int(value[i:i+2], 16) for i in (0, 2, 4))
+    return tuple(int(c) for c in value)
+
+
+def describe_hsv(rgb):
+    """Descriptive name such as 'pale bright orange' from HSV analysis"""
+    r, g, b = rgb
+    h, s, v = colorsys.rgb_to_hsv(r/255, g/255, b/255)
+    h = h * 360
+    s = s * 100
+    v = v * 100
+
+    if s < 20:
+        if v < 30:
+            return "very dark gray"
+        elif v < 70:
+            return "gray"
+        return "light gray"
+
+    hue_name = "red"
+    for limit, name in HUE_BANDS:
+        if h < limit:
+            hue_name = name
+            break
+    if v < 30:
+        hue_name = f"dark {hue_name}"
+    elif v > 80:
+        hue_name = f"bright {hue_name}"
+    if s < 40:
+        hue_name = f"pale {hue_name}"
+    elif s > 80:
+        hue_name = f"vivid {hue_name}"
+    return hue_name
+
+
+def css3_exact_names():
+    """Map every CSS3 color to the name webcolors.rgb_to_name returns for it"""
+    import webcolors
+    if hasattr(webcolors, 'names'):
+        names = webcolors.names('css3')
+    else:
+        names = webcolors.CSS3_NAMES_TO_HEX.keys()
+    table = {}
+    for name in names:
+        rgb = tuple(webcolors.name_to_rgb(name))
+        table[rgb] = webcolors.rgb_to_name(rgb)
+    return table
+
+
+class ColorNameIndex:
+    """Color naming index built once from a name -> color dictionary.
+
+    Names are resolved in the same order as the original lookups: exact
+    CSS3 name (optional), nearest dictionary color within ``tolerance``
+    (first entry wins ties), then a descriptive HSV name (optional) or
+    ``unknown``. ``tolerance=None`` always takes the nearest color.
+
+    ``name`` handles a single pixel; ``name_codes`` and ``name_many``
+    handle an N x 3 array or a whole (H, W, 3) frame in one call.
+    """
+
+    chunk_size = 1 << 16
+
+    def __init__(self, colors, exact_names=False, hsv_fallback=False, unknown=UNKNOWN_COLOR):
+        self.names = list(colors)
+        self.colors = [to_rgb(value) for value in colors.values()]
+        # float32 holds every squared RGB distance exactly (all below 2**24)
+        self.palette = np.array(self.colors, dtype=np.float32).reshape(-1, 3)
+        self._palette_sq = (self.palette ** 2).sum(axis=1)
+        self.hsv_fallback = hsv_fallback
+        self.unknown = unknown
+
+        # Every name the index can return, addressed by integer code
+        self.labels = list(self.names)
+        self._label_codes = {}
+        for name in self.names:
+            self._label_codes.setdefault(name, self.names.index(name))
+        self._gray_codes = np.array([self._code(name) for name in GRAY_NAMES], dtype=np.int32)
+        self._hue_codes = np.array([
+            [[self._code(sp + vp + hue) for vp in VALUE_PREFIXES] for sp in SATURATION_PREFIXES]
+            for _, hue in HUE_BANDS
+        ], dtype=np.int32)
+        self.unknown_code = self._code(unknown)
+        self._label_array = np.array(self.labels, dtype=object)
+        self._memo = {}
+
+        # The CSS3 table needs webcolors, so it is only built on first use
+        self.exact_names = exact_names
+        self._exact = None
+        self._exact_lock = threading.Lock()
+
+    @property
+    def exact(self):
+        """CSS3 exact-name table, {} unless exact_names was requested"""
+        if self._exact is None:
+            with self._exact_lock:
+                if self._exact is None:
+                    self._build_exact()
+        return self._exact
+
+    def _build_exact(self):
+        exact = css3_exact_names() if self.exact_names else {}
+        exact_items = sorted((_pack(rgb), name) for rgb, name in exact.items())
+        self._exact_keys = np.array([key for key, _ in exact_items], dtype=np.uint32)
+        self._exact_modulus, self._exact_slots = _perfect_hash(self._exact_keys)
+        self._exact_codes = np.array([self._code(name) for _, name in exact_items], dtype=np.int32)
+        self._exact = exact
+
+    def _code(self, name):
+        code = self._label_codes.get(name)
+        if code is None:
+            code = len(self.labels)
+            self.labels.append(name)
+            self._label_codes[name] = code
+        return code
+
+    def name(self, rgb, tolerance=50):
+        """Name a single (r, g, b) color"""
+        rgb = tuple(int(c) for c in rgb)
+        key = (rgb, tolerance)
+        name = self._memo.get(key)
+        if name is None:
+            name = self._name_uncached(rgb, tolerance)
+            if len(self._memo) > 65536:
+                self._memo.clear()
+            self._memo[key] = name
+        return name
+
+    def clear_cache(self):
+        """Forget memoized single-pixel names"""
+        self._memo.clear()
+
+    def _name_uncached(self, rgb, tolerance):
+        exact = self.exact.get(rgb)
+        if exact is not None:
+            return exact
+        r, g, b = rgb
+        min_distance = float('inf')
+        closest_name = None
+        for name, (rc, gc, bc) in zip(self.names, self.colors):
+            distance = math.sqrt((r - rc) ** 2 + (g - gc) ** 2 + (b - bc) ** 2)
+            if distance < min_distance and (tolerance is None or distance <= tolerance):
+                min_distance = distance
+                closest_name = name
+        if closest_name is not None:
+            return closest_name
+        if self.hsv_fallback:
+            return describe_hsv(rgb)
+        return self.unknown
+
+    def name_codes(self, pixels, tolerance=50):
+        """Label codes for an (..., 3) array of colors, same leading shape"""
+        pixels = np.asarray(pixels)
+        flat = pixels.reshape(-1, 3)
+        codes = np.empty(len(flat), dtype=np.int32)
+        for start in range(0, len(flat), self.chunk_size):
+            chunk = flat[start:start + self.chunk_size]
+            codes[start:start + len(chunk)] = self._codes_for(chunk, tolerance)
+        return codes.reshape(pixels.shape[:-1])
+
+    def name_many(self, pixels, tolerance=50):
+        """Color names for an (..., 3) array of colors, as an object array"""
+        # name_codes may grow labels (the exact table is built on first use), so index afterwards
+        codes = self.name_codes(pixels, tolerance)
+        return self._label_array_for()[codes]
+
+    def _label_array_for(self):
+        if len(self._label_array) != len(self.labels):
+            self._label_array = np.array(self.labels, dtype=object)
+        return self._label_array
+
+    def _codes_for(self, chunk, tolerance):
+        exact = self.exact
+        rgb = chunk.astype(np.float32)
+        d2 = rgb @ (-2.0 * self.palette.T)
+        d2 += self._palette_sq
+        nearest = d2.argmin(axis=1)
+        codes = nearest.astype(np.int32)
+        if tolerance is not None:
+            d2_min = d2[np.arange(len(chunk)), nearest] + (rgb ** 2).sum(axis=1)
+            distance = np.sqrt(d2_min.astype(np.float64))
+            outside = ~(distance <= tolerance)
+            if outside.any():
+                if self.hsv_fallback:
+                    codes[outside] = self._hsv_codes(rgb[outside])
+                else:
+                    codes[outside] = self.unknown_code
+        if exact:
+            packed = _pack_array(chunk)
+            slot = self._exact_slots[packed % self._exact_modulus]
+            hit = self._exact_keys[slot] == packed
+            codes[hit] = self._exact_codes[slot[hit]]
+        return codes
+
+    def _hsv_codes(self, rgb):
+        """Vectorized describe_hsv, mirroring colorsys operation for operation"""
+        rgb = rgb.astype(np.float64)
+        r, g, b = rgb[:, 0] / 255, rgb[:, 1] / 255, rgb[:, 2] / 255
+        maxc = np.maximum(np.maximum(r, g), b)
+        minc = np.minimum(np.minimum(r, g), b)
+        rangec = maxc - minc
+        chromatic = rangec != 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            s = np.where(chromatic, rangec / maxc, 0.0)
+            rc = (maxc - r) / rangec
+            gc = (maxc - g) / rangec
+            bc = (maxc - b) / rangec
+        h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+        h = np.where(chromatic, np.mod(h / 6.0, 1.0), 0.0)
+        h = h * 360
+        s = s * 100
+        v = maxc * 100
+
+        gray = self._gray_codes[(v >= 30).astype(np.intp) + (v >= 70)]
+        limits = np.array([limit for limit, _ in HUE_BANDS])
+        hue = np.searchsorted(limits, h, side='right')
+        hue[hue == len(HUE_BANDS)] = 0
+        s_band = (s >= 40).astype(np.intp) + (s > 80)
+        v_band = (v >= 30).astype(np.intp) + (v > 80)
+        return np.where(s < 20, gray, self._hue_codes[hue, s_band, v_band])
+
+
+def _pack(rgb):
+    r, g, b = rgb
+    return (r << 16) | (g << 8) | b
+
+
+def _pack_array(pixels):
+    pixels = pixels.astype(np.uint32)
+    return (pixels[:, 0] << 16) | (pixels[:, 1] << 8) | pixels[:, 2]
+
+
+def _perfect_hash(keys):
+    """Smallest modulus that sends every key to its own slot"""
+    if not len(keys):
+        return 1, np.zeros(1, dtype=np.intp)
+    modulus = len(keys)
+    while len(np.unique(keys % modulus)) < len(keys):
+        modulus += 1
+    slots = np.zeros(modulus, dtype=np.intp)
+    slots[keys % modulus] = np.arange(len(keys))
+    return modulus, slots
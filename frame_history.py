@@ -0,0 +1,96 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class FrameHistory:
+    """Preallocated ring of the most recent raw frames, bounded in bytes.
+
+    ``push`` copies frames into fixed slots, so after the first frame (or
+    a change of resolution) nothing is allocated per frame. The ring has
+    ``capacity`` slots, fewer if they would not fit in ``max_bytes``
+    (but at least one): 64 MB holds 10 frames at 1080p, 23 at 720p and
+    30 at 480p. Each push also scores the frame's sharpness: the
+    variance of the Laplacian of a ``focus_width``-pixel-wide grayscale
+    copy, computed in preallocated buffers. ``sharpest(window)`` picks
+    the best-focused recent frame, so a capture skips motion-blurred
+    frames.
+    """
+
+    def __init__(self, capacity=30, max_bytes=64 << 20, focus_width=160):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.focus_width = focus_width
+        self._lock = threading.Lock()
+        self._raw = None
+        self._small = None
+        self._gray = None
+        self._laplacian = None
+        self.slots = capacity
+        self.timestamps = np.full(capacity, -np.inf)
+        self.focus = np.zeros(capacity)
+        self.count = 0
+
+    @property
+    def nbytes(self):
+        return self._raw.nbytes if self._raw is not None else 0
+
+    def _slots_for(self, frame):
+        """Slot array for frames like this one, reallocated only when the shape changes"""
+        if self._raw is None or self._raw.shape[1:] != frame.shape or self._raw.dtype != frame.dtype:
+            # Frames of the old size are gone
+            self.timestamps[:] = -np.inf
+            self.count = 0
+            self.slots = max(1, min(self.capacity, self.max_bytes // frame.nbytes))
+            self._raw = np.empty((self.slots,) + frame.shape, dtype=frame.dtype)
+        return self._raw
+
+    def _focus(self, frame):
+        """Variance of the Laplacian of a downscaled grayscale copy"""
+        h, w = frame.shape[:2]
+        size = (self.focus_width, max(1, round(h * self.focus_width / w)))
+        if self._small is None or self._small.shape[:2] != size[::-1]:
+            self._small = np.empty((size[1], size[0]) + frame.shape[2:], dtype=np.uint8)
+            self._gray = np.empty(size[::-1], dtype=np.uint8)
+            self._laplacian = np.empty(size[::-1], dtype=np.int16)
+        cv2.resize(frame, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        gray = self._small if frame.ndim == 2 else cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        cv2.Laplacian(gray, cv2.CV_16S, dst=self._laplacian)
+        _, std = cv2.meanStdDev(self._laplacian)
+        return float(std[0, 0]) ** 2
+
+    def push(self, raw, timestamp=None):
+        """Store one raw BGR frame; returns its slot"""
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        with self._lock:
+            frames = self._slots_for(raw)
+            slot = self.count % self.slots
+            np.copyto(frames[slot], raw)
+            self.focus[slot] = self._focus(raw)
+            self.timestamps[slot] = timestamp
+            self.count += 1
+        return slot
+
+    def sharpest(self, window=1.0, now=None):
+        """Slot of the best-focused frame of the last window seconds, or None"""
+        now = time.perf_counter() if now is None else now
+        with self._lock:
+            recent = np.flatnonzero(self.timestamps >= now - window)
+            if not len(recent):
+                # Nothing that fresh (e.g. the camera stopped): fall back to the newest frame
+                if not self.count:
+                    return None
+                return (self.count - 1) % self.slots
+            return int(recent[np.argmax(self.focus[recent])])
+
+    def frame(self, slot):
+        """Copy of the frame in a slot"""
+        with self._lock:
+            return self._raw[slot].copy()
+
+    def clear(self):
+        with self._lock:
+            self.timestamps[:] = -np.inf
+            self.count = 0
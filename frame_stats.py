@@ -0,0 +1,71 @@
+import numpy as np
+
+# Frames with at least this many pixels are counted with a full 24-bit
+# bincount; smaller ones are cheaper to sort than to scan 2**24 bins.
+BINCOUNT_MIN_PIXELS = 1 << 20
+
+
+class FrameStats:
+    """Color statistics of one frame, as returned by frame_statistics"""
+
+    def __init__(self, total_pixels, unique_colors, average_color, top_colors):
+        self.total_pixels = total_pixels
+        self.unique_colors = unique_colors
+        self.average_color = average_color
+        # List of (rgb tuple, color name, pixel count, share of frame)
+        self.top_colors = top_colors
+
+    def __repr__(self):
+        return (f"FrameStats(total_pixels={self.total_pixels}, unique_colors={self.unique_colors}, "
+                f"average_color={self.average_color}, top_colors={len(self.top_colors)})")
+
+
+def pack_rgb(arr):
+    """Pack an (..., 3) uint8 image into flat 24-bit integers"""
+    flat = np.asarray(arr, dtype=np.uint8).reshape(-1, 3)
+    packed = flat[:, 0].astype(np.uint32)
+    packed <<= 8
+    packed |= flat[:, 1]
+    packed <<= 8
+    packed |= flat[:, 2]
+    return packed
+
+
+def unpack_rgb(packed):
+    """Inverse of pack_rgb, giving an N x 3 uint8 array"""
+    packed = np.asarray(packed, dtype=np.uint32)
+    return np.stack([packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF], axis=-1).astype(np.uint8)
+
+
+def color_histogram(arr):
+    """Distinct packed colors of an image and how many pixels each covers"""
+    packed = pack_rgb(arr)
+    if packed.size >= BINCOUNT_MIN_PIXELS:
+        counts = np.bincount(packed, minlength=1 << 24)
+        colors = np.flatnonzero(counts).astype(np.uint32)
+        return colors, counts[colors]
+    return np.unique(packed, return_counts=True)
+
+
+def frame_statistics(arr, top_n=8, name_colors=None):
+    """Unique color count, top-N palette and average color in one pass.
+
+    ``name_colors`` maps an N x 3 array of colors to their names, e.g.
+    ``ColorBlindAssist.get_color_names``. Without it names are left empty.
+    """
+    colors, counts = color_histogram(arr)
+    total = int(counts.sum())
+    rgb = unpack_rgb(colors)
+
+    average = (rgb.astype(np.float64) * counts[:, None]).sum(axis=0) / total
+    average_color = tuple(int(c) for c in average.astype(int))
+
+    top_n = min(top_n, len(colors))
+    top = np.argpartition(counts, -top_n)[-top_n:] if top_n else np.array([], dtype=np.intp)
+    top = top[np.argsort(-counts[top], kind='stable')]
+    names = name_colors(rgb[top]) if name_colors is not None and top_n else [""] * top_n
+    top_colors = [
+        (tuple(int(c) for c in rgb[i]), str(name), int(counts[i]), float(counts[i] / total))
+        for i, name in zip(top, names)
+    ]
+    return FrameStats(total, len(colors), average_color, top_colors)
@@ -0,0 +1,341 @@
+"""Helpers of the Streamlit app (model3_streamlit.py).
+
+Streamlit parses and compiles the app script again on every rerun, so
+only the page itself lives there; the engine subclass, shared resources
+and frame and widget helpers are imported once per process from here.
+"""
+import os
+import time
+
+import cv2
+import numpy as np
+import streamlit as st
+from streamlit import runtime
+
+from band_pool import BandPool
+from camera_broker import parse_source
+from capture_cache import CaptureCache
+from color_engine import ColorEngine
+from recorder import VideoRecorder, recording_path
+from speech import SpeechService
+
+# Sidebar choices, built once per process instead of on every rerun
+CB_OPTIONS = {
+    "Normal Vision": None,
+    "Protanopia (Red-blind)": "protanopia",
+    "Deuteranopia (Green-blind)": "deuteranopia", 
+    "Tritanopia (Blue-blind)": "tritanopia",
+    "Protanomaly (Red-weak)": "protanomaly",
+    "Deuteranomaly (Green-weak)": "deuteranomaly",
+    "Tritanomaly (Blue-weak)": "tritanomaly"
+}
+VIEW_MODES = ["Normal", "Simulated", "Corrected (Daltonized)"]
+# Camera index, video file or "synthetic"; lets the app run without a webcam (see soak_test.py)
+CAMERA_SOURCE = parse_source(os.environ.get("COLOR_ASSIST_CAMERA", "0"))
+
+class ColorBlindAssist(ColorEngine):
+    def __init__(self, color_index=None, lut_cache=None, speech=None):
+        super().__init__(color_index=color_index, lut_cache=lut_cache)
+        self.speech = speech
+        if speech is None:
+            self.init_voice_engine()
+
+    def init_voice_engine(self):
+        """Start the speech worker and warm its cache with common phrases"""
+        self.speech = SpeechService()
+        error = self.speech.start()
+        if error:
+            st.error(error)
+        else:
+            self.speech.prerender([f"This color is {name}" for name in list(self.extended_colors)[:12]])
+
+    def speak_async(self, text):
+        """Speak text without blocking; only the latest announcement is kept"""
+        if self.speech:
+            self.speech.speak(text)
+
+@st.cache_resource(show_spinner=False)
+def load_shared_resources():
+    """Naming index, LUT cache, band thread pool and speech worker, created once per server process.
+
+    Sessions share these instead of each building its own; per-session
+    state such as output buffers stays in ColorBlindAssist.
+    """
+    engine = ColorEngine()
+    speech = SpeechService()
+    speech_error = speech.start()
+    if not speech_error:
+        speech.prerender([f"This color is {name}" for name in list(engine.extended_colors)[:12]])
+    return engine.color_index, engine.lut_cache, BandPool(), speech, speech_error
+
+def camera_loop_settings(band_pool):
+    """Camera loop, preview and capture memory settings of this session.
+
+    Their widgets are drawn only while "Tune Camera Loop" is ticked, which
+    saves a dozen widget round trips on every rerun; untouched sessions use
+    the defaults and hidden settings keep their last values.
+    """
+    tuning = st.session_state.get('camera_tuning')
+    if tuning is None:
+        tuning = st.session_state.camera_tuning = {
+            'pipelined': True, 'target_fps': 30, 'multicore': band_pool.workers > 1, 'preview': True,
+            'preview_width': 700, 'preview_quality': 80, 'adapt_preview': True, 'history_mb': 64
+        }
+    if not st.sidebar.checkbox("Tune Camera Loop", value=False,
+                               help="Threading, frame rate, preview size and capture memory"):
+        return tuning
+    tuning['pipelined'] = st.sidebar.checkbox("Pipelined Camera Loop", value=tuning['pipelined'],
+                                              help="Capture, process and render on separate threads")
+    tuning['target_fps'] = st.sidebar.slider("Target FPS", 5, 60, tuning['target_fps'])
+    tuning['multicore'] = st.sidebar.checkbox("Multi-core Transform", value=tuning['multicore'],
+                                              help=f"Split large frames into row bands over {band_pool.workers} threads")
+    tuning['preview'] = st.sidebar.checkbox("Fast Preview", value=tuning['preview'],
+                                            help="Shrink and JPEG-encode the live view before processing")
+    if tuning['preview']:
+        tuning['preview_width'] = st.sidebar.slider("Preview Width", 320, 1280, tuning['preview_width'], step=20)
+        tuning['preview_quality'] = st.sidebar.slider("Preview JPEG Quality", 30, 95, tuning['preview_quality'])
+        tuning['adapt_preview'] = st.sidebar.checkbox("Adapt Preview to Target FPS", value=tuning['adapt_preview'])
+    tuning['history_mb'] = st.sidebar.slider("Capture History Memory (MB)", 16, 512, tuning['history_mb'], step=16,
+                                             help="Up to 30 frames are kept for captures, fewer at high resolutions")
+    return tuning
+
+def transform_camera_frame(color_assist, frame, cb_type, view_mode, cb_selection, monitor, incremental=None,
+                           confusion=None):
+    """Apply the selected view to a mirrored BGR frame and label it.
+
+    With an IncrementalTransform, only tiles that changed since the
+    previous frame are transformed again. A ConfusionOverlay highlights
+    the regions the selected deficiency would confuse.
+    """
+    with monitor.stage("transform"):
+        if cb_type and view_mode == "Simulated":
+            transform = lambda img, out=None: color_assist.simulate_color_blindness(img, cb_type, out, bgr=True)
+            label = f"Simulated {cb_selection}"
+            key = color_assist.view_key(cb_type, "simulated", bgr=True)
+        elif cb_type and view_mode == "Corrected (Daltonized)":
+            transform = lambda img, out=None: color_assist.daltonize_image(img, cb_type, out=out, bgr=True)
+            label = f"Corrected {cb_selection}"
+            key = color_assist.view_key(cb_type, "corrected", 0.7, bgr=True)
+        else:
+            transform = None
+            label = "Normal View"
+        if transform is None:
+            processed_frame = frame
+        elif incremental is not None:
+            processed_frame = incremental.apply(frame, key, transform)
+        else:
+            processed_frame = transform(frame)
+    if confusion is not None and cb_type:
+        with monitor.stage("confusion"):
+            simulated = processed_frame if view_mode == "Simulated" else None
+            if incremental is not None and processed_frame is incremental.output:
+                # Reused tiles must not keep last frame's highlights
+                processed_frame = processed_frame.copy()
+            # The simulated view is reused as is; otherwise a shrunk copy goes through the same
+            # kernel, in the same channel order (corrected output is clipped, so the error
+            # cannot be read back from it)
+            confusion.draw(processed_frame, frame, simulated, color_assist.kernel(cb_type, "simulated", bgr=True))
+    with monitor.stage("putText"):
+        cv2.putText(processed_frame, label, (10, 30),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+    return processed_frame
+
+def process_camera_frame(color_assist, frame, cb_type, view_mode, cb_selection, monitor, preview=None,
+                         incremental=None, palette=None, history=None, confusion=None, intact=None):
+    """Mirror, transform and label one BGR camera frame.
+
+    Returns (display, seconds). Without a preview, display is the
+    full-resolution RGB result. With one, the frame is shrunk before the
+    transform and display is JPEG bytes. A FrameHistory keeps the
+    mirrored full-resolution frame for captures. A PaletteTracker is
+    updated from the untransformed colors.
+
+    The frame may be a view into the camera broker's shared memory
+    (``read(copy=False)``): the mirror is the only copy taken, and
+    ``intact()`` is checked right after it. None is returned when the
+    writer reused the slot meanwhile.
+    """
+    start = time.perf_counter()
+    with monitor.stage("flip"):
+        frame = cv2.flip(frame, 1)
+    if intact is not None and not intact():
+        return None
+    if palette is not None and preview is None:
+        with monitor.stage("palette"):
+            palette.update(frame, bgr=True)
+    if history is not None:
+        with monitor.stage("history"):
+            history.push(frame)
+    if preview is None:
+        processed_frame = transform_camera_frame(color_assist, frame, cb_type, view_mode, cb_selection, monitor,
+                                                 incremental, confusion)
+        with monitor.stage("cvtColor"):
+            display = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
+        return display, time.perf_counter() - start
+    with monitor.stage("resize"):
+        frame = preview.resize(frame)
+    if palette is not None:
+        with monitor.stage("palette"):
+            palette.update(frame, bgr=True)
+    processed_frame = transform_camera_frame(color_assist, frame, cb_type, view_mode, cb_selection, monitor,
+                                             incremental, confusion)
+    with monitor.stage("encode"):
+        display = preview.encode(processed_frame)
+    return display, time.perf_counter() - start
+
+def capture_full_resolution(color_assist, cb_type, view_mode, cb_selection, monitor):
+    """Sharpest live frame of the last second at full camera resolution as RGB, or None"""
+    history = st.session_state.get('frame_history')
+    slot = history.sharpest(1.0) if history is not None else None
+    if slot is None:
+        return None
+    full_frame = history.frame(slot)
+    # Captures wait for the exact lookup table rather than use the stand-in
+    background = color_assist.bake_in_background
+    color_assist.bake_in_background = False
+    try:
+        processed_frame = transform_camera_frame(color_assist, full_frame, cb_type, view_mode,
+                                                 cb_selection, monitor)
+    finally:
+        color_assist.bake_in_background = background
+    return cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
+
+def show_perf_panel(placeholder, monitor, preview=None, incremental=None):
+    """Render FPS, dropped frames and per-stage latency percentiles"""
+    summary = monitor.summary()
+    with placeholder.container():
+        col1, col2 = st.columns(2)
+        col1.metric("FPS", f"{summary['fps']:.1f}")
+        col2.metric("Dropped", summary['dropped'])
+        if preview is not None:
+            st.caption(f"Preview: {preview.width}px wide, JPEG quality {preview.quality}")
+        if incremental is not None:
+            st.caption(f"Tiles reused: {incremental.last_reused_fraction:.0%} last frame, "
+                       f"{incremental.reused_fraction:.0%} overall")
+        if summary['stages']:
+            st.dataframe(
+                [{k: (round(v, 2) if isinstance(v, float) else v) for k, v in row.items()}
+                 for row in summary['stages']],
+                hide_index=True
+            )
+
+def stop_camera_pipeline():
+    """Shut down a pipeline left running by an interrupted script run"""
+    pipeline = st.session_state.get('camera_pipeline')
+    if pipeline is not None:
+        pipeline.stop()
+        st.session_state.camera_pipeline = None
+
+def release_replaced_frames():
+    """Free live-view images that newer frames have replaced.
+
+    Streamlit keeps every image sent during a script run until the run
+    ends, so an hour of live view would otherwise hold ~100k frames. This
+    is the same cleanup Streamlit runs whenever any session's run ends.
+    """
+    if runtime.exists():
+        runtime.get_instance().media_file_mgr.remove_orphaned_files()
+
+def session_recorder(codec, size, policy, fps):
+    """Running recorder for these settings, reused across reruns; a change starts a new file"""
+    recorder = st.session_state.get('recorder')
+    settings = (codec, size, policy)
+    if recorder is not None and recorder.running and not recorder.error and recorder.settings == settings:
+        return recorder
+    stop_recorder()
+    recorder = VideoRecorder(recording_path(codec=codec), fps, codec, size, policy=policy)
+    recorder.settings = settings
+    st.session_state.recorder = recorder.start()
+    return recorder
+
+def stop_recorder():
+    """Finish the session's recording, if any, and remember where it went"""
+    recorder = st.session_state.get('recorder')
+    if recorder is not None:
+        recorder.stop()
+        st.session_state.last_recording = recorder.stats()
+        st.session_state.recorder = None
+
+def show_recorder_status(placeholder, recorder):
+    stats = recorder.stats()
+    placeholder.caption(
+        f"⏺️ Recording to {stats['path']}: {stats['written']} frames | "
+        f"queue {stats['queue_depth']}/{stats['queue_size']} (max {stats['max_depth']}) | "
+        f"{stats['dropped']} dropped | {stats['encode_ms']:.1f} ms/frame encode"
+    )
+
+def show_palette_strip(placeholder, palette):
+    """Render tracked dominant colors as one strip of swatches sized by share"""
+    swatches = "".join(
+        f"<div title='{name} ({share:.0%})' style='flex:{share:.3f};background:#{r:02x}{g:02x}{b:02x};"
+        f"height:36px'></div>"
+        for (r, g, b), name, share in palette.palette
+    )
+    names = " · ".join(f"{name} {share:.0%}" for _, name, share in palette.palette if share >= palette.min_share)
+    placeholder.markdown(
+        f"<div style='display:flex;border:1px solid #888;border-radius:4px;overflow:hidden'>{swatches}</div>"
+        f"<small>{names}</small>",
+        unsafe_allow_html=True
+    )
+
+def show_palette_breakdown(stats):
+    """Render the dominant colors of a frame as swatches with pixel shares"""
+    st.markdown("**Palette Breakdown:**")
+    for rgb, name, count, share in stats.top_colors:
+        hex_color = "#{:02x}{:02x}{:02x}".format(*rgb)
+        swatch_col, info_col = st.columns([1, 5])
+        with swatch_col:
+            st.markdown(
+                f"<div style='background:{hex_color};height:28px;border-radius:4px;"
+                f"border:1px solid #888'></div>",
+                unsafe_allow_html=True
+            )
+        with info_col:
+            st.progress(min(share, 1.0), text=f"{name} | {hex_color} | {share:.1%} ({count} px)")
+
+def screenshot_capture():
+    """Cache entry of the current screenshot, shared by every rerun on it"""
+    if 'capture_cache' not in st.session_state:
+        st.session_state.capture_cache = CaptureCache()
+    return st.session_state.capture_cache.get(st.session_state.screenshot)
+
+def draw_name_overlay(color_assist, sampler, tolerance, radius, shape, cells=8):
+    """Copy of the screenshot labelled with the patch color name of each grid cell"""
+    overlay = sampler.image.copy()
+    step = max(sampler.width // cells, 1)
+    ys, xs, means = sampler.dense_means(step, radius, shape)
+    colors = np.clip(np.rint(means), 0, 255).astype(np.uint8).reshape(-1, 3)
+    names = color_assist.get_color_names(colors, tolerance)
+    scale = max(sampler.width / 1400, 0.4)
+    thickness = max(int(round(scale * 2)), 1)
+    for (y, x), name in zip(((y, x) for y in ys for x in xs), names):
+        (tw, th), _ = cv2.getTextSize(name, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+        origin = (int(x - tw // 2), int(y + th // 2))
+        cv2.putText(overlay, name, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, (0, 0, 0), thickness * 3, cv2.LINE_AA)
+        cv2.putText(overlay, name, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, (255, 255, 255), thickness, cv2.LINE_AA)
+    return overlay
+
+def sample_click(color_assist, capture, coords, radius, shape, robust, tolerance):
+    """Full-resolution position, RGB and name of a click on the scaled-down screenshot.
+
+    Results are remembered per capture, so reruns and repeated clicks
+    are lookups; single-pixel clicks read the capture's name map.
+    """
+    h, w = capture.image.shape[:2]
+    x = int(coords["x"] * w / coords.get("width", w))
+    y = int(coords["y"] * h / coords.get("height", h))
+    if not (0 <= x < w and 0 <= y < h):
+        return None
+
+    def compute():
+        if radius == 0:
+            rgb = tuple(int(v) for v in capture.image[y, x])
+            index = color_assist.color_index
+            return x, y, rgb, index.labels[capture.name_map(index, tolerance)[y, x]]
+        sampler = capture.sampler
+        if robust:
+            rgb = sampler.robust_color(x, y, radius, shape)
+        else:
+            rgb = sampler.color(x, y, radius, shape)
+        return x, y, rgb, color_assist.get_color_name_advanced(rgb, tolerance)
+    return capture.derived(('click', x, y, radius, shape, robust, tolerance), compute)
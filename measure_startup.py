@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+APP_SCRIPT = "model3_streamlit.py"
+
+
+def measure_app(app_dir, reruns):
+    """Time the app headlessly with Streamlit's AppTest; runs in a fresh process"""
+    sys.path.insert(0, app_dir)
+    os.chdir(app_dir)
+    t0 = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    framework = time.perf_counter() - t0
+
+    script = os.path.join(app_dir, APP_SCRIPT)
+    at = AppTest.from_file(script, default_timeout=120)
+    t0 = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - t0
+
+    rerun_times = []
+    for _ in range(reruns):
+        t0 = time.perf_counter()
+        at.run()
+        rerun_times.append(time.perf_counter() - t0)
+
+    # AppTest parses and compiles the script again for every run; a server keeps the bytecode per
+    # script, so reruns there cost only the script's execution
+    from streamlit.testing.v1 import local_script_runner
+    shared_cache = local_script_runner.ScriptCache()
+    uncached = local_script_runner.ScriptCache
+    local_script_runner.ScriptCache = lambda: shared_cache
+    cached_times = []
+    try:
+        for _ in range(reruns):
+            t0 = time.perf_counter()
+            at.run()
+            cached_times.append(time.perf_counter() - t0)
+    finally:
+        local_script_runner.ScriptCache = uncached
+
+    # A widget interaction, as when the user moves the sensitivity slider
+    widget_times = []
+    for value in (40, 60, 50):
+        t0 = time.perf_counter()
+        at.sidebar.slider[0].set_value(value).run()
+        widget_times.append(time.perf_counter() - t0)
+
+    # A second browser session in the same server process
+    t0 = time.perf_counter()
+    AppTest.from_file(script, default_timeout=120).run()
+    new_session = time.perf_counter() - t0
+
+    return {
+        'framework_import_s': framework,
+        'cold_start_s': cold,
+        'rerun_median_s': statistics.median(rerun_times),
+        'rerun_cached_median_s': statistics.median(cached_times),
+        'widget_change_median_s': statistics.median(widget_times),
+        'new_session_s': new_session,
+        'exceptions': [str(e.value) for e in at.exception],
+    }
+
+
+def run_child(app_dir, reruns):
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", app_dir, "--reruns", str(reruns)],
+        capture_output=True, text=True
+    )
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "child failed")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def export_revision(rev, dest):
+    """Extract the tree at a git revision into dest"""
+    archive = subprocess.run(["git", "archive", "--format=tar", rev], capture_output=True, check=True)
+    path = os.path.join(dest, "tree.tar")
+    with open(path, "wb") as f:
+        f.write(archive.stdout)
+    with tarfile.open(path) as tar:
+        tar.extractall(dest)
+    return dest
+
+
+def print_report(reports):
+    keys = ['framework_import_s', 'cold_start_s', 'rerun_median_s', 'rerun_cached_median_s', 'widget_change_median_s',
+            'new_session_s']
+    names = list(reports)
+    print(f"{'metric':<26}" + "".join(f"{name:>14}" for name in names))
+    for key in keys:
+        print(f"{key:<26}" + "".join(f"{reports[name][key] * 1e3:12.1f}ms" for name in names))
+    for name, report in reports.items():
+        if report['exceptions']:
+            print(f"⚠️ {name}: {report['exceptions']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure Streamlit cold-start and rerun times")
+    parser.add_argument("--ref", help="also measure this git revision (e.g. a commit before a change)")
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--json", metavar="PATH", help="write the results to a JSON file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure_app(args.child, args.reruns)))
+        return 0
+
+    reports = {}
+    if args.ref:
+        with tempfile.TemporaryDirectory() as tmp:
+            reports[f"before ({args.ref})"] = run_child(export_revision(args.ref, tmp), args.reruns)
+    reports["current"] = run_child(os.path.dirname(os.path.abspath(__file__)), args.reruns)
+    print_report(reports)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
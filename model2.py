@@ -1,113 +1,152 @@
+import argparse
+import os
 import cv2
 import numpy as np
-import pyttsx3
+from bayer import CFA_PATTERNS, DEMOSAIC_ALGORITHMS, RawBayerSource
+from color_engine import ColorEngine, demosaic, mosaic
+from recorder import CODECS, POLICIES, VideoRecorder, recording_path
+from speech import SpeechService
 
-# Voice Engine Setup
-engine = pyttsx3.init()
-engine.setProperty('rate', 150)
+# Voice Setup (the speech worker starts on first use, so the module imports headless)
+speech = SpeechService()
 
 # Mode Options
 modes = ['normal', 'bayer', 'protanopia']
 current_mode = 'normal'
+frame = None  # latest camera frame, read by mouse_callback
+raw_frame = None  # latest mosaic when reading raw Bayer files instead
+bayer_pattern = 'RGGB'
+bayer_algorithm = 'bilinear'
 
-# Color naming dictionary
-named_colors = {
-    'black': (0, 0, 0), 'white': (255, 255, 255), 'red': (255, 0, 0),
-    'green': (0, 255, 0), 'blue': (0, 0, 255), 'yellow': (255, 255, 0),
-    'cyan': (0, 255, 255), 'magenta': (255, 0, 255), 'gray': (128, 128, 128),
-    'orange': (255, 165, 0), 'pink': (255, 192, 203), 'purple': (128, 0, 128),
-    'brown': (165, 42, 42), 'navy': (0, 0, 128)
-}
+# Naming, Bayer utilities and the protanopia transform come from the shared engine
+engine = ColorEngine()
 
 def speak_color(color_name):
-    engine.say(f"This color is {color_name}")
-    engine.runAndWait()
+    speech.speak(f"This color is {color_name}")
 
 def closest_named_color(rgb):
-    min_dist = float('inf')
-    closest_name = "Unknown Color"
-    for name, value in named_colors.items():
-        dist = np.linalg.norm(np.array(rgb) - np.array(value))
-        if dist < min_dist:
-            min_dist = dist
-            closest_name = name
-    return closest_name
+    return engine.get_color_name_advanced(rgb, tolerance=None)
 
 def get_color_name(b, g, r):
     return closest_named_color((r, g, b))
 
-# Simulated Bayer filter
-def apply_bayer_filter(image):
-    bayer = np.zeros_like(image)
-    bayer[::2, ::2, 1] = image[::2, ::2, 1]  # Green
-    bayer[1::2, 1::2, 1] = image[1::2, 1::2, 1]  # Green
-    bayer[::2, 1::2, 2] = image[::2, 1::2, 2]  # Red
-    bayer[1::2, ::2, 0] = image[1::2, ::2, 0]  # Blue
-    return bayer
-
-# Demosaicing
-def demosaic_bayer(bayer_img):
-    bayer_gray = cv2.cvtColor(bayer_img, cv2.COLOR_BGR2GRAY)
-    return cv2.cvtColor(bayer_gray, cv2.COLOR_BAYER_BG2BGR)
-
 # Simulate Protanopia
 def simulate_protanopia(img):
-    conversion_matrix = np.array([[0.567, 0.433, 0],
-                                  [0.558, 0.442, 0],
-                                  [0, 0.242, 0.758]])
-    return cv2.transform(img, conversion_matrix)
+    return engine.simulate_color_blindness(img, 'protanopia', bgr=True)
 
 # Mouse event to detect color
 def mouse_callback(event, x, y, flags, param):
     if event == cv2.EVENT_LBUTTONDOWN:
-        b, g, r = frame[y, x]
+        image = frame if frame is not None else demosaic(raw_frame, bayer_pattern, bayer_algorithm)
+        b, g, r = image[y, x]
         color_name = get_color_name(b, g, r)
         print(f"Clicked Color at ({x},{y}): {color_name}")
         speak_color(color_name)
 
-# Start webcam
-cap = cv2.VideoCapture(0)
-cv2.namedWindow("Color Blind Assist - Multi View")
-cv2.setMouseCallback("Color Blind Assist - Multi View", mouse_callback)
-
-print("Press 'n' for Normal | 'b' for Bayer | 'p' for Protanopia | 'q' to Quit")
-
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-    frame = cv2.flip(frame, 1)
-
-    if current_mode == 'normal':
-        display_frame = frame.copy()
-        label = "Normal View"
-
-    elif current_mode == 'bayer':
-        bayer_image = apply_bayer_filter(frame)
-        display_frame = demosaic_bayer(bayer_image)
-        label = "Bayer Demosaiced View"
-
-    elif current_mode == 'protanopia':
-        bayer_image = apply_bayer_filter(frame)
-        demosaiced = demosaic_bayer(bayer_image)
-        display_frame = simulate_protanopia(demosaiced)
-        label = "Protanopia Simulation (Bayer Processed)"
-
-    # Show mode label
-    cv2.putText(display_frame, label, (10, 30),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-
-    cv2.imshow("Color Blind Assist - Multi View", display_frame)
-
-    key = cv2.waitKey(1) & 0xFF
-    if key == ord('q'):
-        break
-    elif key == ord('n'):
-        current_mode = 'normal'
-    elif key == ord('b'):
-        current_mode = 'bayer'
-    elif key == ord('p'):
-        current_mode = 'protanopia'
-
-cap.release()
-cv2.destroyAllWindows()
+def open_source(args):
+    """Webcam, or raw Bayer frames from a .raw/.npy file for sensor-pipeline testing"""
+    if args.source.lower().endswith(('.raw', '.npy')):
+        return RawBayerSource(args.source, args.width, args.height,
+                              np.uint16 if args.bits > 8 else np.uint8, args.bits), True
+    return cv2.VideoCapture(int(args.source) if args.source.isdigit() else args.source), False
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Color Blind Assist - Multi View with Bayer sensor simulation")
+    parser.add_argument("--source", default="0", help="camera index, video file, or raw Bayer .raw/.npy file")
+    parser.add_argument("--pattern", choices=CFA_PATTERNS, default="RGGB", help="CFA pattern of the mosaic")
+    parser.add_argument("--demosaic", choices=list(DEMOSAIC_ALGORITHMS), default="bilinear")
+    parser.add_argument("--width", type=int, help="frame width of a .raw file")
+    parser.add_argument("--height", type=int, help="frame height of a .raw file")
+    parser.add_argument("--bits", type=int, default=8, help="bits per sample of a .raw file (16-bit storage above 8)")
+    parser.add_argument("--record", action="store_true", help="start recording immediately ('r' toggles)")
+    parser.add_argument("--codec", choices=list(CODECS), default="mp4v", help="codec of recordings")
+    parser.add_argument("--record-size", type=int, nargs=2, metavar=("WIDTH", "HEIGHT"),
+                        help="resolution of recordings (default: shown size)")
+    parser.add_argument("--record-policy", choices=POLICIES, default="drop-oldest",
+                        help="what to do when the encoder falls behind")
+    args = parser.parse_args(argv)
+    if args.source.lower().endswith(('.raw', '.npy')):
+        if not os.path.isfile(args.source):
+            parser.error(f"{args.source} not found")
+        if args.source.lower().endswith('.raw') and not (args.width and args.height):
+            parser.error("--width and --height are required for a .raw source")
+    return args
+
+def main(argv=None):
+    global frame, raw_frame, bayer_pattern, bayer_algorithm, current_mode
+    args = parse_args(argv)
+    bayer_pattern = args.pattern
+    algorithms = list(DEMOSAIC_ALGORITHMS)
+    bayer_algorithm = args.demosaic
+    cap, raw_input = open_source(args)
+    cv2.namedWindow("Color Blind Assist - Multi View")
+    cv2.setMouseCallback("Color Blind Assist - Multi View", mouse_callback)
+
+    print("Press 'n' for Normal | 'b' for Bayer | 'p' for Protanopia | 'a' to switch demosaic | "
+          "'r' to record | 'q' to Quit")
+    new_recorder = lambda: VideoRecorder(recording_path(codec=args.codec), codec=args.codec,
+                                         size=args.record_size, policy=args.record_policy).start()
+    recorder = new_recorder() if args.record else None
+
+    while True:
+        ret, captured = cap.read()
+        if not ret:
+            break
+        if raw_input:
+            # Already a single-plane mosaic straight from the sensor
+            raw_frame, frame = captured, None
+        else:
+            frame = cv2.flip(captured, 1)
+            if current_mode != 'normal':
+                reuse = raw_frame is not None and raw_frame.shape == frame.shape[:2]
+                raw_frame = mosaic(frame, args.pattern, out=raw_frame if reuse else None)
+
+        if current_mode == 'normal':
+            display_frame = frame.copy() if frame is not None else demosaic(raw_frame, args.pattern, bayer_algorithm)
+            label = "Normal View"
+
+        elif current_mode == 'bayer':
+            display_frame = engine.demosaic_transform(raw_frame, pattern=args.pattern, algorithm=bayer_algorithm)
+            label = f"Bayer {args.pattern} Demosaiced View ({bayer_algorithm})"
+
+        elif current_mode == 'protanopia':
+            # Demosaic and simulation fused band by band
+            display_frame = engine.demosaic_transform(raw_frame, 'protanopia', pattern=args.pattern,
+                                                      algorithm=bayer_algorithm)
+            label = f"Protanopia Simulation (Bayer {args.pattern}, {bayer_algorithm})"
+
+        # Show mode label
+        cv2.putText(display_frame, label, (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+
+        cv2.imshow("Color Blind Assist - Multi View", display_frame)
+        if recorder is not None:
+            recorder.write(display_frame, label, current_mode, pattern=args.pattern, demosaic=bayer_algorithm)
+
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
+            break
+        elif key == ord('n'):
+            current_mode = 'normal'
+        elif key == ord('b'):
+            current_mode = 'bayer'
+        elif key == ord('p'):
+            current_mode = 'protanopia'
+        elif key == ord('a'):
+            bayer_algorithm = algorithms[(algorithms.index(bayer_algorithm) + 1) % len(algorithms)]
+        elif key == ord('r'):
+            if recorder is None:
+                recorder = new_recorder()
+                print(f"Recording to {recorder.path}")
+            else:
+                recorder.stop()
+                print(f"Saved {recorder.written} frames to {recorder.path} ({recorder.dropped} dropped)")
+                recorder = None
+
+    if recorder is not None:
+        recorder.stop()
+    cap.release()
+    cv2.destroyAllWindows()
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,25 @@
-import streamlit as st
-import cv2
-import numpy as np
-import pyttsx3
-import threading
-from PIL import Image
-import webcolors
-import colorsys
 import time
 
+import streamlit as st
+
+from camera_broker import acquire_camera
+from camera_pipeline import CameraPipeline, FramePacer
+from confusion_overlay import ConfusionOverlay
+from cvd_simulation import ANOMALOUS_TYPES
+from frame_history import FrameHistory
+from live_view import (
+    CAMERA_SOURCE, CB_OPTIONS, VIEW_MODES, ColorBlindAssist, camera_loop_settings, capture_full_resolution,
+    draw_name_overlay,
+    load_shared_resources, process_camera_frame, release_replaced_frames, sample_click, screenshot_capture,
+    session_recorder, show_palette_breakdown, show_palette_strip, show_perf_panel, show_recorder_status,
+    stop_camera_pipeline, stop_recorder
+)
+from palette_tracker import PaletteTracker
+from perf_monitor import PerfMonitor
+from preview import AdaptivePreview
+from recorder import CODECS
+from tile_cache import IncrementalTransform
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="Advanced Color Blind Assist",
@@ -16,179 +28,16 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-class ColorBlindAssist:
-    def __init__(self):
-        self.engine = None
-        self.init_voice_engine()
-        
-        # Enhanced color dictionary
-        self.extended_colors = {
-            'black': '#000000', 'white': '#ffffff', 'red': '#ff0000', 'lime': '#00ff00', 
-            'blue': '#0000ff', 'yellow': '#ffff00', 'cyan': '#00ffff', 'magenta': '#ff00ff',
-            'silver': '#c0c0c0', 'gray': '#808080', 'maroon': '#800000', 'olive': '#808000',
-            'green': '#008000', 'purple': '#800080', 'teal': '#008080', 'navy': '#000080',
-            'orange': '#ffa500', 'pink': '#ffc0cb', 'brown': '#a52a2a', 'gold': '#ffd700',
-            'beige': '#f5f5dc', 'coral': '#ff7f50', 'indigo': '#4b0082', 'violet': '#ee82ee',
-            'crimson': '#dc143c', 'salmon': '#fa8072', 'khaki': '#f0e68c', 'plum': '#dda0dd',
-            'orchid': '#da70d6', 'tan': '#d2691e', 'azure': '#f0ffff', 'lavender': '#e6e6fa',
-            'turquoise': '#40e0d0', 'chocolate': '#d2691e', 'firebrick': '#b22222'
-        }
-        
-        # Color blindness simulation matrices
-        self.color_matrices = {
-            'protanopia': np.array([
-                [0.56667, 0.43333, 0.00000],
-                [0.55833, 0.44167, 0.00000],
-                [0.00000, 0.24167, 0.75833]
-            ]),
-            'deuteranopia': np.array([
-                [0.625, 0.375, 0.0],
-                [0.7, 0.3, 0.0],
-                [0.0, 0.3, 0.7]
-            ]),
-            'tritanopia': np.array([
-                [0.95, 0.05, 0.0],
-                [0.0, 0.43333, 0.56667],
-                [0.0, 0.475, 0.525]
-            ])
-        }
-
-    def init_voice_engine(self):
-        """Initialize text-to-speech engine"""
-        try:
-            self.engine = pyttsx3.init()
-            self.engine.setProperty('rate', 150)
-            self.engine.setProperty('volume', 0.9)
-        except Exception as e:
-            st.error(f"Voice engine initialization failed: {e}")
-
-    def speak_async(self, text):
-        """Speak text asynchronously"""
-        if self.engine:
-            def speak():
-                try:
-                    self.engine.say(text)
-                    self.engine.runAndWait()
-                except:
-                    pass
-            thread = threading.Thread(target=speak)
-            thread.daemon = True
-            thread.start()
-
-    def hex_to_rgb(self, hex_color):
-        """Convert hex color to RGB"""
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-
-    def get_color_name_advanced(self, rgb, tolerance=50):
-        """Advanced color name detection"""
-        r, g, b = rgb
-        
-        # Try webcolors library first
-        try:
-            closest_name = webcolors.rgb_to_name((r, g, b))
-            return closest_name
-        except ValueError:
-            pass
-        
-        # Find closest in extended dictionary
-        min_distance = float('inf')
-        closest_name = "Unknown Color"
-        
-        for name, hex_value in self.extended_colors.items():
-            color_rgb = self.hex_to_rgb(hex_value)
-            distance = np.sqrt(sum((a - b) ** 2 for a, b in zip(rgb, color_rgb)))
-            
-            if distance < min_distance and distance <= tolerance:
-                min_distance = distance
-                closest_name = name
-        
-        # Generate descriptive color name if no close match
-        if closest_name == "Unknown Color" or min_distance > tolerance:
-            h, s, v = colorsys.rgb_to_hsv(r/255, g/255, b/255)
-            h = h * 360
-            s = s * 100
-            v = v * 100
-            
-            if s < 20:
-                if v < 30:
-                    closest_name = "very dark gray"
-                elif v < 70:
-                    closest_name = "gray"
-                else:
-                    closest_name = "light gray"
-            else:
-                if h < 15 or h >= 345:
-                    hue_name = "red"
-                elif h < 45:
-                    hue_name = "orange"
-                elif h < 75:
-                    hue_name = "yellow"
-                elif h < 105:
-                    hue_name = "yellow-green"
-                elif h < 135:
-                    hue_name = "green"
-                elif h < 165:
-                    hue_name = "cyan-green"
-                elif h < 195:
-                    hue_name = "cyan"
-                elif h < 225:
-                    hue_name = "blue"
-                elif h < 255:
-                    hue_name = "blue-violet"
-                elif h < 285:
-                    hue_name = "violet"
-                elif h < 315:
-                    hue_name = "magenta"
-                else:
-                    hue_name = "red-magenta"
-                
-                if v < 30:
-                    hue_name = f"dark {hue_name}"
-                elif v > 80:
-                    hue_name = f"bright {hue_name}"
-                
-                if s < 40:
-                    hue_name = f"pale {hue_name}"
-                elif s > 80:
-                    hue_name = f"vivid {hue_name}"
-                
-                closest_name = hue_name
-        
-        return closest_name
-
-    def apply_color_matrix(self, img, matrix):
-        """Apply color transformation matrix"""
-        img_float = img.astype(float) / 255.0
-        h, w, c = img_float.shape
-        img_reshaped = img_float.reshape(-1, c)
-        transformed = np.dot(img_reshaped, matrix.T)
-        transformed = np.clip(transformed, 0, 1.0)
-        result = (transformed * 255).astype(np.uint8)
-        return result.reshape(h, w, c)
-
-    def simulate_color_blindness(self, img, cb_type):
-        """Simulate different types of color blindness"""
-        if cb_type in self.color_matrices:
-            return self.apply_color_matrix(img, self.color_matrices[cb_type])
-        return img
-
-    def daltonize_image(self, img, cb_type):
-        """Apply basic daltonization correction"""
-        if cb_type in self.color_matrices:
-            simulated = self.simulate_color_blindness(img, cb_type)
-            error = img.astype(float) - simulated.astype(float)
-            corrected = img.astype(float) + error * 0.7
-            return np.clip(corrected, 0, 255).astype(np.uint8)
-        return img
-
 def main():
     st.title("🎨 Advanced Color Blind Assist - Real Time Color Guide")
     st.markdown("### Comprehensive color detection and assistance for various color vision deficiencies")
     
     # Initialize the color assist system
+    color_index, lut_cache, band_pool, speech, speech_error = load_shared_resources()
     if 'color_assist' not in st.session_state:
-        st.session_state.color_assist = ColorBlindAssist()
+        st.session_state.color_assist = ColorBlindAssist(color_index, lut_cache, speech)
+        if speech_error:
+            st.error(speech_error)
     color_assist = st.session_state.color_assist
     # Initialize screenshot state
     if 'screenshot' not in st.session_state:
@@ -198,21 +47,18 @@ def main():
     st.sidebar.header("🔧 Settings")
     
     # Color blindness type selection
-    cb_options = {
-        "Normal Vision": None,
-        "Protanopia (Red-blind)": "protanopia",
-        "Deuteranopia (Green-blind)": "deuteranopia", 
-        "Tritanopia (Blue-blind)": "tritanopia"
-    }
-    
-    cb_selection = st.sidebar.selectbox("Select Color Vision Type:", list(cb_options.keys()))
-    cb_type = cb_options[cb_selection]
+    cb_selection = st.sidebar.selectbox("Select Color Vision Type:", list(CB_OPTIONS.keys()))
+    cb_type = CB_OPTIONS[cb_selection]
+    if cb_type in ANOMALOUS_TYPES:
+        color_assist.severity = st.sidebar.slider("Severity", 0.0, 1.0, 0.6, step=0.05,
+                                                  help="0 is normal vision, 1 the matching dichromacy")
+    color_assist.linear_rgb = st.sidebar.checkbox("Linear RGB Processing", value=False,
+                                                  help="Apply the simulation to linear light, as the models intend")
+    # New settings are baked into lookup tables in the background; frames keep flowing meanwhile
+    color_assist.bake_in_background = True
     
     # View mode selection
-    view_mode = st.sidebar.selectbox(
-        "View Mode:",
-        ["Normal", "Simulated", "Corrected (Daltonized)"]
-    )
+    view_mode = st.sidebar.selectbox("View Mode:", VIEW_MODES)
     
     # Voice settings
     voice_enabled = st.sidebar.checkbox("Enable Voice Assistance", value=True)
@@ -220,6 +66,97 @@ def main():
     # Color detection sensitivity
     tolerance = st.sidebar.slider("Color Detection Sensitivity", 10, 100, 50)
     
+    # Camera loop, preview and capture memory settings, shown only while being tuned
+    tuning = camera_loop_settings(band_pool)
+    pipelined = tuning['pipelined']
+    target_fps = tuning['target_fps']
+    color_assist.band_pool = band_pool if tuning['multicore'] else None
+    
+    # Live preview size and encoding (captures always use full resolution)
+    if 'preview' not in st.session_state:
+        st.session_state.preview = AdaptivePreview()
+    preview = st.session_state.preview if tuning['preview'] else None
+    if preview is not None:
+        preview.configure(tuning['preview_width'], tuning['preview_quality'], target_fps, tuning['adapt_preview'])
+    
+    # Recent full-resolution frames; captures take the sharpest of the last second
+    history_mb = tuning['history_mb']
+    history = st.session_state.get('frame_history')
+    if history is None or history.max_bytes != history_mb << 20:
+        history = st.session_state.frame_history = FrameHistory(max_bytes=history_mb << 20)
+    if history.nbytes:
+        st.sidebar.caption(f"Capture history: {history.slots} frames, {history.nbytes / 1e6:.0f} MB")
+    
+    # Incremental mode: transform only the tiles that changed since the last frame
+    incremental = None
+    if st.sidebar.checkbox("Skip Unchanged Regions", value=False,
+                           help="Reuse transformed tiles where the scene is still"):
+        if 'incremental' not in st.session_state:
+            st.session_state.incremental = IncrementalTransform()
+        incremental = st.session_state.incremental
+        threshold = st.sidebar.slider("Change Threshold", 2, 64, 16,
+                                      help="Pixel difference that marks a tile as changed")
+        if threshold != incremental.threshold:
+            incremental.threshold = threshold
+            incremental.reset()
+    
+    # Regions the selected deficiency would confuse, outlined on the live view
+    confusion = None
+    if st.sidebar.checkbox("Highlight Confusable Regions", value=False, disabled=cb_type is None,
+                           help="Outline colors that change most under the selected deficiency"):
+        if 'confusion_overlay' not in st.session_state:
+            st.session_state.confusion_overlay = ConfusionOverlay()
+        confusion = st.session_state.confusion_overlay
+        confusion.threshold = st.sidebar.slider("Confusion Threshold", 10, 200, confusion.threshold,
+                                                help="Color error (summed over R, G, B) that counts as confusable; "
+                                                     "lower highlights more")
+    
+    # Dominant colors of the live view, announced when they change
+    palette = None
+    if st.sidebar.checkbox("Live Palette Tracking", value=False,
+                           help="Track and announce the main colors in view"):
+        palette_size = st.sidebar.slider("Palette Colors", 3, 8, 5)
+        palette = st.session_state.get('palette_tracker')
+        if palette is None or palette.k != palette_size:
+            palette = st.session_state.palette_tracker = PaletteTracker(None, k=palette_size)
+        palette.namer = lambda pixels: color_assist.get_color_names(pixels, tolerance)
+    
+    # Click-to-detect sampling on captured frames
+    patch_radius = st.sidebar.slider("Click Patch Radius", 0, 50, 5,
+                                     help="Average the color around a click (0 reads a single pixel)")
+    patch_shape = st.sidebar.radio("Patch Shape", ["Square", "Circle"], horizontal=True).lower()
+    robust_color = st.sidebar.checkbox("Robust Color (median)", value=False,
+                                       help="Use the patch median, which ignores specks and edges")
+    name_overlay = st.sidebar.checkbox("Name Overlay", value=False,
+                                       help="Label the captured frame with the color name of each region")
+    
+    # Recording of the processed live view, encoded on a background thread
+    record = st.sidebar.checkbox("Record Session", value=False,
+                                 help="Save the live view as a video with a per-frame log")
+    if record:
+        record_codec = st.sidebar.selectbox("Recording Codec", list(CODECS))
+        record_size = {"Shown size": None, "1280x720": (1280, 720), "640x480": (640, 480)}[
+            st.sidebar.selectbox("Recording Resolution", ["Shown size", "1280x720", "640x480"])]
+        record_policy = st.sidebar.radio("When Encoding Falls Behind", ["drop-oldest", "block"], horizontal=True,
+                                         help="Drop the oldest queued frames, or slow the live view down")
+    elif st.session_state.get('last_recording'):
+        last = st.session_state.last_recording
+        st.sidebar.caption(f"Last recording: {last['path']} ({last['written']} frames, {last['dropped']} dropped)")
+    
+    # Performance instrumentation (no-op while the panel is hidden)
+    if 'perf_monitor' not in st.session_state:
+        st.session_state.perf_monitor = PerfMonitor()
+    monitor = st.session_state.perf_monitor
+    monitor.enabled = st.sidebar.checkbox("Show Performance Panel", value=False)
+    perf_placeholder = st.sidebar.empty()
+    if monitor.enabled:
+        show_perf_panel(perf_placeholder, monitor, preview, incremental)
+        export_col1, export_col2 = st.sidebar.columns(2)
+        export_col1.download_button("Export JSON", monitor.to_json(), "perf_stats.json", "application/json")
+        export_col2.download_button("Export CSV", monitor.to_csv(), "perf_stats.csv", "text/csv")
+        if st.sidebar.button("Reset Stats"):
+            monitor.reset()
+    
     # Main interface
     st.header("📹 Live Camera Feed")
     # Initialize camera state
@@ -234,13 +171,17 @@ def main():
         if st.button("⏹️ Stop Camera"):
             st.session_state.camera_active = False
     with camera_col3:
-        if st.button("📸 Capture Frame") and st.session_state.current_frame is not None:
-            st.session_state.screenshot = st.session_state.current_frame.copy()
-            st.rerun()
+        if st.button("📸 Capture Frame"):
+            captured = capture_full_resolution(color_assist, cb_type, view_mode, cb_selection, monitor)
+            if captured is not None:
+                st.session_state.screenshot = captured
+                st.rerun()
     # Video display area
     video_placeholder = st.empty()
+    palette_placeholder = st.empty()
     # Status display
     status_placeholder = st.empty()
+    record_placeholder = st.empty()
     # Instructions
     st.markdown("""
     **Instructions:**
@@ -261,53 +202,120 @@ def main():
     if st.button("🔊 Speak Manual Color"):
         hex_color = manual_color.lstrip('#')
         rgb = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-        color_name = color_assist.get_color_name_advanced(rgb, tolerance)
+        with monitor.stage("naming"):
+            color_name = color_assist.get_color_name_advanced(rgb, tolerance)
         st.write(f"**Selected Color:** {color_name}")
         if voice_enabled:
             color_assist.speak_async(f"This color is {color_name}")
     
     # Fast live camera feed loop
+    stop_camera_pipeline()
+    if not (record and st.session_state.camera_active):
+        stop_recorder()
     if st.session_state.camera_active:
-        cap = cv2.VideoCapture(0)
+        # One capture process per device, shared by every open session
+        cap = acquire_camera(CAMERA_SOURCE)
         if not cap.isOpened():
+            cap.release()
             status_placeholder.error("Cannot access camera. Please check your camera connection.")
             st.session_state.camera_active = False
         else:
-            status_placeholder.success("📹 Camera is active")
-            frame_rgb = None
-            if 'current_frame' not in st.session_state:
-                st.session_state.current_frame = None
-            while st.session_state.camera_active:
-                ret, frame = cap.read()
-                if not ret:
-                    status_placeholder.error("Failed to read from camera.")
-                    break
-                frame = cv2.flip(frame, 1)
-                if cb_type and view_mode == "Simulated":
-                    processed_frame = color_assist.simulate_color_blindness(frame, cb_type)
-                    label = f"Simulated {cb_selection}"
-                elif cb_type and view_mode == "Corrected (Daltonized)":
-                    processed_frame = color_assist.daltonize_image(frame, cb_type)
-                    label = f"Corrected {cb_selection}"
-                else:
-                    processed_frame = frame.copy()
-                    label = "Normal View"
-                cv2.putText(processed_frame, label, (10, 30),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                frame_rgb = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-                st.session_state.current_frame = frame_rgb
-                video_placeholder.image(frame_rgb, channels="RGB", use_container_width=True)
-                time.sleep(0.03)
-            cap.release()
+            viewers = cap.broker.subscribers
+            status_placeholder.success("📹 Camera is active" + (f" (shared by {viewers} sessions)" if viewers > 1 else ""))
+            process = lambda frame, intact=None: process_camera_frame(color_assist, frame, cb_type, view_mode,
+                                                                      cb_selection, monitor, preview, incremental,
+                                                                      palette, history, confusion, intact)
+            last_panel_update = 0.0
+            recorder = session_recorder(record_codec, record_size, record_policy, target_fps) if record else None
+            record_settings = {'cb_type': cb_type, 'severity': color_assist.severity,
+                               'linear_rgb': color_assist.linear_rgb}
+            # (palette version on screen, when it was drawn); speech only follows version bumps
+            palette_shown = (palette.version if palette is not None else 0, 0.0)
+
+            def render(result):
+                nonlocal last_panel_update, palette_shown
+                display, process_seconds = result
+                start = time.perf_counter()
+                with monitor.stage("display"):
+                    if preview is None:
+                        video_placeholder.image(display, channels="RGB", use_container_width=True)
+                    else:
+                        # Already JPEG at display size, so Streamlit sends it as is
+                        video_placeholder.image(display, output_format="JPEG", use_container_width=True)
+                display_seconds = time.perf_counter() - start
+                if recorder is not None:
+                    with monitor.stage("record"):
+                        recorder.write(display, cb_selection, view_mode, rgb=preview is None, **record_settings)
+                if preview is not None:
+                    # Pipelined stages overlap; the sequential loop pays for both
+                    preview.update(max(process_seconds, display_seconds) if pipelined
+                                   else process_seconds + display_seconds)
+                if palette is not None and palette.palette:
+                    version, shown_at = palette_shown
+                    if version != palette.version or time.perf_counter() - shown_at > 1.0:
+                        show_palette_strip(palette_placeholder, palette)
+                        if version != palette.version and voice_enabled and palette.announcement():
+                            color_assist.speak_async(palette.announcement())
+                        palette_shown = (palette.version, time.perf_counter())
+                monitor.frame_done()
+                if time.perf_counter() - last_panel_update > 1.0:
+                    last_panel_update = time.perf_counter()
+                    release_replaced_frames()
+                    if monitor.enabled:
+                        show_perf_panel(perf_placeholder, monitor, preview, incremental)
+                    if recorder is not None:
+                        show_recorder_status(record_placeholder, recorder)
+                        if recorder.error:
+                            record_placeholder.error(recorder.error)
+
+            if pipelined:
+                pipeline = CameraPipeline(cap, process, target_fps, monitor=monitor)
+                st.session_state.camera_pipeline = pipeline
+                try:
+                    pipeline.start()
+                    for result in pipeline.frames():
+                        render(result)
+                finally:
+                    # Also runs when a rerun or Stop Camera interrupts the loop
+                    stop_camera_pipeline()
+                if pipeline.error:
+                    status_placeholder.error(pipeline.error)
+            else:
+                pacer = FramePacer(target_fps)
+                try:
+                    while st.session_state.camera_active:
+                        # Read in place: the mirror in process() is the frame's only copy
+                        with monitor.stage("capture"):
+                            ret, frame = cap.read(copy=False)
+                        if not ret:
+                            status_placeholder.error("Failed to read from camera.")
+                            break
+                        result = process(frame, cap.intact)
+                        if result is None:
+                            # The broker lapped us while mirroring; take the next frame
+                            continue
+                        render(result)
+                        pacer.wait()
+                finally:
+                    # Unsubscribe even when a rerun interrupts the loop
+                    cap.release()
     else:
         status_placeholder.info("📷 Camera is inactive. Click 'Start Camera' to begin.")
     if st.session_state.screenshot is not None:
         st.subheader("🖼️ Captured Frame - Click Anywhere to Detect Color")
         from streamlit_image_coordinates import streamlit_image_coordinates
-        screenshot_img = Image.fromarray(st.session_state.screenshot)
+        capture = screenshot_capture()
+        shown = capture.image
+        if name_overlay:
+            with monitor.stage("naming"):
+                overlay_radius = max(patch_radius, 1)
+                shown = capture.derived(
+                    ('overlay', tolerance, overlay_radius, patch_shape),
+                    lambda: draw_name_overlay(color_assist, capture.sampler, tolerance, overlay_radius, patch_shape)
+                )
         
         coords = streamlit_image_coordinates(
-            st.session_state.screenshot,
+            shown,
             key="clickable_image",
             width=700
         )
@@ -317,46 +325,42 @@ def main():
         with col_btn1:
             if st.button("🔙 Return to Live View", key="return_to_live"):
                 st.session_state.screenshot = None
+                st.session_state.capture_cache.clear()
                 st.rerun()
         with col_btn2:
-            if st.button("🔄 Recapture Frame", key="recapture_frame") and st.session_state.current_frame is not None:
-                st.session_state.screenshot = st.session_state.current_frame.copy()
-                st.rerun()
+            if st.button("🔄 Recapture Frame", key="recapture_frame"):
+                captured = capture_full_resolution(color_assist, cb_type, view_mode, cb_selection, monitor)
+                if captured is not None:
+                    st.session_state.screenshot = captured
+                    st.rerun()
         with col_btn3:
             if st.button("� Analyse Frame", key="analyse_frame"):
-                arr = np.array(screenshot_img)
-                avg_color = tuple(np.mean(arr.reshape(-1, 3), axis=0).astype(int))
+                stats = capture.derived(('stats', tolerance),
+                                        lambda: color_assist.analyse_frame(capture.image, tolerance))
+                avg_color = stats.average_color
                 color_name = color_assist.get_color_name_advanced(avg_color, tolerance)
                 st.success(f"Average Color: {color_name} | RGB: {avg_color}")
-                unique_colors = len(np.unique(arr.reshape(-1, 3), axis=0))
-                st.info(f"Unique Colors in Frame: {unique_colors}")
+                st.info(f"Unique Colors in Frame: {stats.unique_colors}")
+                show_palette_breakdown(stats)
         
         # Show detected color below image
+        clicked = None
         if coords is not None:
-            x, y = coords["x"], coords["y"]
-            arr = np.array(screenshot_img)
-            h, w, _ = arr.shape
-            if 0 <= x < w and 0 <= y < h:
-                r, g, b = arr[y, x]
-                color_name = color_assist.get_color_name_advanced((r, g, b), tolerance)
-                st.markdown(f"# 🎨 {color_name.upper()}")
-                st.color_picker("Color Preview", f"#{r:02x}{g:02x}{b:02x}", disabled=True)
-                st.write(f"**Position:** ({x}, {y}) | **RGB:** ({r}, {g}, {b}) | **Hex:** #{r:02x}{g:02x}{b:02x}")
-                if voice_enabled:
-                    color_assist.speak_async(f"This color is {color_name}")
+            with monitor.stage("sampling"):
+                clicked = sample_click(color_assist, capture, coords, patch_radius, patch_shape, robust_color,
+                                       tolerance)
+        if clicked is not None:
+            x, y, (r, g, b), color_name = clicked
+            st.markdown(f"# 🎨 {color_name.upper()}")
+            st.color_picker("Color Preview", f"#{r:02x}{g:02x}{b:02x}", disabled=True)
+            st.write(f"**Position:** ({x}, {y}) | **RGB:** ({r}, {g}, {b}) | **Hex:** #{r:02x}{g:02x}{b:02x}")
+            if voice_enabled:
+                color_assist.speak_async(f"This color is {color_name}")
         
         # Session Summary expander
         with st.expander("Session Summary"):
-            if coords is not None:
-                x, y = coords["x"], coords["y"]
-                arr = np.array(screenshot_img)
-                h, w, _ = arr.shape
-                if 0 <= x < w and 0 <= y < h:
-                    r, g, b = arr[y, x]
-                    color_name_summary = color_assist.get_color_name_advanced((r, g, b), tolerance)
-                    st.write(f"Last Detected Color: {color_name_summary} at ({x}, {y})")
-                else:
-                    st.write("No color detected yet.")
+            if clicked is not None:
+                st.write(f"Last Detected Color: {color_name} at ({x}, {y})")
             else:
                 st.write("No color detected yet.")
         with st.expander("Color Blindness Info"):
@@ -365,6 +369,8 @@ def main():
 - **Protanopia**: Difficulty distinguishing red colors (affects ~1% of males)
 - **Deuteranopia**: Difficulty distinguishing green colors (affects ~1% of males)
 - **Tritanopia**: Difficulty distinguishing blue colors (affects ~0.01% of population)
+- **Protanomaly / Deuteranomaly / Tritanomaly**: Weakened rather than missing red, green or blue
+  sensitivity; deuteranomaly alone affects ~5% of males. Use the severity slider to match it
 
 **This tool helps by:**
 - Providing audio descriptions of colors
@@ -0,0 +1,142 @@
+import time
+
+import numpy as np
+
+
+class PaletteTracker:
+    """Dominant colors of a live feed, tracked with warm-started mini-batch k-means.
+
+    Each ``update(frame)`` samples ``sample_size`` pixels and refines the
+    previous frame's centroids with mini-batches until ``budget_s`` is
+    spent (at least one batch runs). Centroid counts decay between frames,
+    so the palette follows the scene without restarting from scratch.
+    Colors are named in one batch call through ``namer`` (N x 3 RGB ->
+    names) and clusters sharing a name are merged. The palette counts as
+    changed once its set of names, ignoring colors below ``min_share``,
+    has stayed different for ``stable_frames`` frames; ``version`` is
+    bumped then, and only then.
+    """
+
+    def __init__(self, namer, k=5, sample_size=2048, batch_size=256, budget_s=0.004,
+                 min_share=0.05, stable_frames=5, decay=0.5, seed=0):
+        self.namer = namer
+        self.k = k
+        self.sample_size = sample_size
+        self.batch_size = batch_size
+        self.budget_s = budget_s
+        self.min_share = min_share
+        self.stable_frames = stable_frames
+        self.decay = decay
+        self.rng = np.random.default_rng(seed)
+        self.reset()
+
+    def reset(self):
+        self.centroids = None
+        self.counts = None
+        self.palette = []
+        self.version = 0
+        self.announced_names = None
+        self._candidate = None
+        self._candidate_frames = 0
+        self.iterations = 0
+        self.last_seconds = 0.0
+
+    def _sample(self, frame, bgr):
+        pixels = frame.reshape(-1, 3)
+        picks = pixels[self.rng.integers(0, len(pixels), min(self.sample_size, len(pixels)))]
+        if bgr:
+            picks = picks[:, ::-1]
+        return picks.astype(np.float32)
+
+    def _seed(self, sample):
+        """k-means++ initialisation on the sample"""
+        centroids = [sample[self.rng.integers(len(sample))]]
+        for _ in range(1, self.k):
+            d2 = ((sample[:, None, :] - np.array(centroids)[None]) ** 2).sum(axis=2).min(axis=1)
+            total = d2.sum()
+            index = self.rng.choice(len(sample), p=d2 / total) if total > 0 else self.rng.integers(len(sample))
+            centroids.append(sample[index])
+        self.centroids = np.array(centroids, dtype=np.float32)
+        self.counts = np.zeros(self.k, dtype=np.float32)
+
+    def _assign(self, points):
+        c = self.centroids
+        d = (c * c).sum(axis=1)[None, :] - 2.0 * points @ c.T
+        return d.argmin(axis=1)
+
+    def _step(self, batch):
+        labels = self._assign(batch)
+        batch_counts = np.bincount(labels, minlength=self.k).astype(np.float32)
+        sums = np.stack([np.bincount(labels, batch[:, c], self.k) for c in range(3)], axis=1)
+        hit = batch_counts > 0
+        self.counts += batch_counts
+        rate = np.where(hit, batch_counts / np.maximum(self.counts, 1), 0)[:, None]
+        means = sums / np.maximum(batch_counts, 1)[:, None]
+        self.centroids += (rate * (means - self.centroids)).astype(np.float32)
+
+    def update(self, frame, bgr=False):
+        """Track the palette of one frame; returns True when it changed"""
+        start = time.perf_counter()
+        sample = self._sample(frame, bgr)
+        if self.centroids is None:
+            self._seed(sample)
+        self.counts *= self.decay
+        deadline = start + self.budget_s
+        iterations = 0
+        while True:
+            self._step(sample[self.rng.integers(0, len(sample), self.batch_size)])
+            iterations += 1
+            if time.perf_counter() >= deadline or iterations * self.batch_size >= 4 * len(sample):
+                break
+
+        labels = self._assign(sample)
+        shares = np.bincount(labels, minlength=self.k) / len(sample)
+        # Re-seed clusters that lost all their pixels at the worst-fit sample
+        empty = np.flatnonzero(shares == 0)
+        if len(empty):
+            d = ((sample - self.centroids[labels]) ** 2).sum(axis=1)
+            self.centroids[empty] = sample[np.argsort(d)[-len(empty):]]
+            self.counts[empty] = 0
+
+        colors = np.clip(np.rint(self.centroids), 0, 255).astype(np.uint8)
+        self.palette = self._merge_by_name(colors, self.namer(colors), shares)
+        self.iterations = iterations
+        self.last_seconds = time.perf_counter() - start
+        return self._check_changed()
+
+    @staticmethod
+    def _merge_by_name(colors, names, shares):
+        """(rgb, name, share) per distinct name, largest share first"""
+        merged = {}
+        for color, name, share in zip(colors, names, shares):
+            if share <= 0:
+                continue
+            total, weighted = merged.get(name, (0.0, np.zeros(3)))
+            merged[name] = (total + share, weighted + share * color.astype(np.float64))
+        palette = [(tuple(int(round(v)) for v in weighted / total), name, float(total))
+                   for name, (total, weighted) in merged.items()]
+        return sorted(palette, key=lambda entry: -entry[2])
+
+    def _check_changed(self):
+        names = frozenset(name for _, name, share in self.palette if share >= self.min_share)
+        if names == self.announced_names:
+            self._candidate, self._candidate_frames = None, 0
+            return False
+        if names != self._candidate:
+            self._candidate, self._candidate_frames = names, 0
+        self._candidate_frames += 1
+        if self._candidate_frames < self.stable_frames:
+            return False
+        self.announced_names = names
+        self._candidate, self._candidate_frames = None, 0
+        self.version += 1
+        return True
+
+    def announcement(self):
+        """Sentence naming the main colors, largest share first"""
+        names = [name for _, name, share in self.palette if share >= self.min_share]
+        if not names:
+            return ""
+        if len(names) == 1:
+            return f"Main color is {names[0]}"
+        return f"Main colors are {', '.join(names[:-1])} and {names[-1]}"
@@ -0,0 +1,94 @@
+import cv2
+import numpy as np
+
+# Disjoint horizontal bands a circular patch is split into; each band is
+# one rectangle lookup, so a circle costs the same at any radius
+CIRCLE_BANDS = 7
+
+
+class PatchSampler:
+    """Mean and robust color of patches in one image, via a summed-area table.
+
+    The integral image is built once per image. After that the mean of
+    any square patch takes four lookups, and a circular patch takes
+    ``CIRCLE_BANDS`` rectangles stacked to follow the circle, whatever
+    the radius. That staircase is exactly the disc up to radius 3; beyond
+    it, it holds about as many pixels as the disc but differs from it in
+    roughly a tenth of them, at the band corners. Queries accept scalars
+    or arrays of centres, so a whole grid of patches (``dense_means``) is
+    one vectorised call. Patches are clipped at the image border.
+
+    ``robust_color`` (the median) uses the exact disc instead; it reads
+    every pixel of the patch, O(radius^2) per call.
+    """
+
+    def __init__(self, image):
+        self.image = np.ascontiguousarray(image)
+        self.height, self.width = self.image.shape[:2]
+        # int32 holds the sums of up to 8.4 million pixels of 255
+        depth = cv2.CV_32S if self.height * self.width * 255 < 2 ** 31 else cv2.CV_64F
+        self.integral = cv2.integral(self.image, sdepth=depth)
+
+    def box_sum(self, x0, y0, x1, y1):
+        """Channel sums and pixel counts of rectangles [x0, x1) x [y0, y1)"""
+        x0 = np.clip(x0, 0, self.width)
+        x1 = np.clip(x1, 0, self.width)
+        y0 = np.clip(y0, 0, self.height)
+        y1 = np.clip(y1, 0, self.height)
+        s = self.integral
+        sums = (s[y1, x1].astype(np.float64) - s[y0, x1] - s[y1, x0] + s[y0, x0])
+        counts = np.maximum(x1 - x0, 0) * np.maximum(y1 - y0, 0)
+        return sums, counts
+
+    def _bands(self, radius):
+        """(dy0, dy1, half width) of the bands approximating a disc of this radius"""
+        edges = np.unique(np.rint(np.linspace(-radius, radius + 1, CIRCLE_BANDS + 1)).astype(int))
+        bands = []
+        for top, bottom in zip(edges[:-1], edges[1:]):
+            # Width matching the disc's pixels in these rows, so the band covers the same area
+            rows = np.arange(top, bottom)
+            widths = 2 * np.floor(np.sqrt(np.maximum(radius * radius - rows * rows, 0))) + 1
+            bands.append((top, bottom, int(np.rint((widths.mean() - 1) / 2))))
+        return bands
+
+    def mean(self, x, y, radius, shape='square'):
+        """Mean color of the patch around (x, y); float array of shape (..., 3)"""
+        x = np.asarray(x, dtype=np.int64)
+        y = np.asarray(y, dtype=np.int64)
+        if shape == 'circle' and radius > 0:
+            total = 0.0
+            count = 0
+            for top, bottom, half in self._bands(radius):
+                sums, counts = self.box_sum(x - half, y + top, x + half + 1, y + bottom)
+                total = total + sums
+                count = count + counts
+        else:
+            total, count = self.box_sum(x - radius, y - radius, x + radius + 1, y + radius + 1)
+        return total / np.maximum(count, 1)[..., np.newaxis]
+
+    def color(self, x, y, radius, shape='square'):
+        """Mean patch color rounded to uint8 RGB, for one point"""
+        return tuple(int(v) for v in np.clip(np.rint(self.mean(x, y, radius, shape)), 0, 255))
+
+    def robust_color(self, x, y, radius, shape='square'):
+        """Per-channel median of the patch, ignoring specks and JPEG ringing.
+
+        Unlike the mean this reads every patch pixel, so it costs
+        O(radius^2); it is meant for single clicks.
+        """
+        y0, y1 = max(y - radius, 0), min(y + radius + 1, self.height)
+        x0, x1 = max(x - radius, 0), min(x + radius + 1, self.width)
+        patch = self.image[y0:y1, x0:x1]
+        if shape == 'circle':
+            yy, xx = np.ogrid[y0 - y:y1 - y, x0 - x:x1 - x]
+            patch = patch[xx * xx + yy * yy <= radius * radius]
+        else:
+            patch = patch.reshape(-1, patch.shape[-1])
+        return tuple(int(v) for v in np.median(patch, axis=0))
+
+    def dense_means(self, step, radius, shape='square'):
+        """Patch means on a grid every ``step`` pixels: (ys, xs, means[rows, cols, 3])"""
+        ys = np.arange(step // 2, self.height, step)
+        xs = np.arange(step // 2, self.width, step)
+        grid_y, grid_x = np.meshgrid(ys, xs, indexing='ij')
+        return ys, xs, self.mean(grid_x, grid_y, radius, shape)
@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import numpy as np
+
+# Histogram bucket edges in milliseconds, roughly logarithmic
+HISTOGRAM_EDGES_MS = [0, 0.5, 1, 2, 5, 10, 20, 33, 50, 100, 200, 500, 1000, float('inf')]
+
+_DISABLED = nullcontext()
+
+
+class _StageTimer:
+    __slots__ = ('monitor', 'name', 'start')
+
+    def __init__(self, monitor, name):
+        self.monitor = monitor
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.monitor.record(self.name, time.perf_counter() - self.start)
+
+
+class PerfMonitor:
+    """Rolling per-stage latency, effective FPS and dropped-frame counters.
+
+    Wrap work in ``with monitor.stage("name"):``. While ``enabled`` is
+    False the stage is a shared no-op context, so the instrumentation can
+    stay in the hot loop. Samples are kept in fixed-size windows, so long
+    sessions use constant memory.
+    """
+
+    def __init__(self, enabled=False, window=300):
+        self.enabled = enabled
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.samples = {}
+        self.counts = {}
+        self.frame_times = deque(maxlen=self.window)
+        self.frames = 0
+        self.dropped = 0
+
+    def stage(self, name):
+        if not self.enabled:
+            return _DISABLED
+        return _StageTimer(self, name)
+
+    def record(self, name, seconds):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples.setdefault(name, deque(maxlen=self.window))
+        samples.append(seconds)
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def frame_done(self):
+        """Mark one frame as delivered to the screen"""
+        if self.enabled:
+            self.frame_times.append(time.perf_counter())
+            self.frames += 1
+
+    def drop(self, count=1):
+        if self.enabled and count:
+            self.dropped += count
+
+    @property
+    def fps(self):
+        if len(self.frame_times) < 2:
+            return 0.0
+        span = self.frame_times[-1] - self.frame_times[0]
+        return (len(self.frame_times) - 1) / span if span > 0 else 0.0
+
+    def stage_summary(self, name):
+        """Percentiles of one stage over the current window, in milliseconds"""
+        ms = np.array(self.samples[name], dtype=np.float64) * 1e3
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        return {
+            'stage': name,
+            'count': self.counts[name],
+            'mean_ms': float(ms.mean()),
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+            'max_ms': float(ms.max()),
+        }
+
+    def histogram(self, name):
+        """Counts per HISTOGRAM_EDGES_MS bucket over the current window"""
+        ms = np.array(self.samples[name], dtype=np.float64) * 1e3
+        counts, _ = np.histogram(ms, bins=HISTOGRAM_EDGES_MS)
+        return counts.tolist()
+
+    def summary(self):
+        return {
+            'fps': self.fps,
+            'frames': self.frames,
+            'dropped': self.dropped,
+            'stages': [self.stage_summary(name) for name in list(self.samples) if self.samples[name]],
+        }
+
+    def to_json(self):
+        report = self.summary()
+        report['histogram_edges_ms'] = [e if e != float('inf') else None for e in HISTOGRAM_EDGES_MS]
+        report['histograms'] = {name: self.histogram(name) for name in list(self.samples) if self.samples[name]}
+        return json.dumps(report, indent=2)
+
+    def to_csv(self):
+        rows = self.summary()['stages']
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=['stage', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'])
+        writer.writeheader()
+        writer.writerows(rows)
+        return out.getvalue()
@@ -0,0 +1,83 @@
+import cv2
+
+
+class AdaptivePreview:
+    """Downsized, JPEG-encoded live preview that holds a target frame rate.
+
+    Frames are shrunk to at most ``width`` pixels before they are
+    transformed and encoded, since the browser shows them at about that
+    size anyway. With ``adaptive`` on, ``update()`` is fed the per-frame
+    work time: when it stays above the frame budget JPEG quality is
+    lowered first and then the width; when there is headroom the width
+    is restored first and then the quality. Full-resolution frames are
+    left to the caller for captures and pixel lookups.
+    """
+
+    def __init__(self, width=700, quality=80, target_fps=30, adaptive=True,
+                 min_width=320, min_quality=40, settle_frames=10):
+        self.min_width = min_width
+        self.min_quality = min_quality
+        self.settle_frames = settle_frames
+        self.max_width = self.width = width
+        self.max_quality = self.quality = quality
+        self.target_fps = target_fps
+        self.adaptive = adaptive
+        self.load = 0.0
+        self.frames_since_change = 0
+
+    def configure(self, width, quality, target_fps, adaptive):
+        """Apply sidebar settings; adapted values restart from the new limits"""
+        if (width, quality, target_fps, adaptive) != (self.max_width, self.max_quality,
+                                                      self.target_fps, self.adaptive):
+            self.max_width = self.width = width
+            self.max_quality = self.quality = quality
+            self.target_fps = target_fps
+            self.adaptive = adaptive
+            self.load = 0.0
+            self.frames_since_change = 0
+
+    def resize(self, frame):
+        """Shrink a frame to the current preview width, keeping its aspect ratio"""
+        h, w = frame.shape[:2]
+        if w <= self.width:
+            return frame
+        height = max(1, round(h * self.width / w))
+        # INTER_AREA is only fast for whole-number factors: halve with it
+        # while possible, then finish with a bilinear step
+        while w // 2 >= self.width:
+            w, h = w // 2, h // 2
+            frame = cv2.resize(frame, (w, h), interpolation=cv2.INTER_AREA)
+        if w == self.width:
+            return frame
+        return cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_LINEAR)
+
+    def encode(self, frame_bgr):
+        """JPEG bytes that st.image passes to the browser without re-encoding"""
+        ok, buf = cv2.imencode(".jpg", frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return buf.tobytes()
+
+    def update(self, seconds):
+        """Adapt width and quality to the work time of the last frame"""
+        if not self.adaptive or not self.target_fps:
+            return
+        self.load = 0.8 * self.load + 0.2 * seconds * self.target_fps
+        self.frames_since_change += 1
+        if self.frames_since_change < self.settle_frames:
+            return
+        if self.load > 0.9:
+            if self.quality > self.min_quality:
+                self.quality = max(self.min_quality, self.quality - 10)
+            else:
+                self.width = max(self.min_width, int(self.width * 0.8) // 8 * 8)
+        elif self.load < 0.6:
+            if self.width < self.max_width:
+                self.width = min(self.max_width, int(self.width * 1.25) // 8 * 8)
+            elif self.quality < self.max_quality:
+                self.quality = min(self.max_quality, self.quality + 5)
+            else:
+                return
+        else:
+            return
+        self.frames_since_change = 0
@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+# Codec name -> (fourcc, file extension)
+CODECS = {
+    'mp4v': ('mp4v', '.mp4'),
+    'xvid': ('XVID', '.avi'),
+    'mjpeg': ('MJPG', '.avi'),
+}
+POLICIES = ('drop-oldest', 'block')
+
+
+def recording_path(directory="recordings", codec='mp4v', prefix="session"):
+    """Timestamped file name for a new recording"""
+    return os.path.join(directory, f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}{CODECS[codec][1]}")
+
+
+class VideoRecorder:
+    """Encodes shown frames to a video file on a background thread.
+
+    ``write(frame, label, mode)`` only queues the frame; a single encoder
+    thread resizes it to ``size`` (default: the first frame's size) and
+    writes it with cv2.VideoWriter. Frames may be BGR arrays, RGB arrays
+    (``rgb=True``) or JPEG bytes, which are decoded on the encoder thread.
+    The queue holds ``queue_size`` frames. When it is full, ``drop-oldest``
+    discards the oldest queued frame so the caller never waits, and
+    ``block`` makes the caller wait so no frame is lost.
+
+    Next to the video, ``<video>.frames.jsonl`` gets one line per written
+    frame with its time (seconds since start), label, mode and any extra
+    settings passed to write(), plus a closing summary line.
+    """
+
+    def __init__(self, path, fps=30.0, codec='mp4v', size=None, queue_size=32, policy='drop-oldest'):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec {codec!r}; expected one of {', '.join(CODECS)}")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}; expected one of {', '.join(POLICIES)}")
+        self.path = path
+        self.log_path = os.path.splitext(path)[0] + ".frames.jsonl"
+        self.fps = fps
+        self.codec = codec
+        self.size = tuple(size) if size else None
+        self.queue_size = queue_size
+        self.policy = policy
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self.start_time = None
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.encode_seconds = 0.0
+        self.error = None
+
+    @property
+    def queue_depth(self):
+        return len(self._queue)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.start_time = time.perf_counter()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="recorder", daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self, frame, label="", mode="", rgb=False, timestamp=None, **settings):
+        """Queue one frame; returns False if it was not accepted"""
+        if not self.running or self._stopping:
+            return False
+        if isinstance(frame, np.ndarray):
+            # The caller reuses its buffers, so keep a private copy
+            frame = frame.copy()
+        stamp = (timestamp if timestamp is not None else time.perf_counter()) - self.start_time
+        item = (frame, rgb, stamp, label, mode, settings)
+        with self._condition:
+            if len(self._queue) >= self.queue_size:
+                if self.policy == 'block':
+                    self._condition.wait_for(lambda: len(self._queue) < self.queue_size or self._stopping)
+                    if self._stopping:
+                        return False
+                else:
+                    self._queue.popleft()
+                    self.dropped += 1
+            self._queue.append(item)
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._condition.notify_all()
+        return True
+
+    def stop(self, timeout=10.0):
+        """Encode what is queued, then close the video and the log"""
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self):
+        """Counters for a status line or the performance panel"""
+        return {
+            'path': self.path,
+            'written': self.written,
+            'dropped': self.dropped,
+            'queue_depth': self.queue_depth,
+            'queue_size': self.queue_size,
+            'max_depth': self.max_depth,
+            'encode_ms': 1000.0 * self.encode_seconds / self.written if self.written else 0.0,
+        }
+
+    def _next(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self._queue or self._stopping)
+            if not self._queue:
+                return None
+            item = self._queue.popleft()
+            self._condition.notify_all()
+            return item
+
+    def _decode(self, frame, rgb):
+        if isinstance(frame, (bytes, bytearray, memoryview)):
+            frame = cv2.imdecode(np.frombuffer(frame, dtype=np.uint8), cv2.IMREAD_COLOR)
+        elif rgb:
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        if frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        if self.size is None:
+            self.size = (frame.shape[1], frame.shape[0])
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return frame
+
+    def _run(self):
+        writer = None
+        try:
+            with open(self.log_path, "w", encoding="utf-8") as log:
+                while True:
+                    item = self._next()
+                    if item is None:
+                        break
+                    frame, rgb, stamp, label, mode, settings = item
+                    start = time.perf_counter()
+                    frame = self._decode(frame, rgb)
+                    if writer is None:
+                        writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*CODECS[self.codec][0]),
+                                                 self.fps, self.size)
+                        if not writer.isOpened():
+                            raise RuntimeError(f"Cannot open {self.codec} video writer for {self.path}")
+                    writer.write(frame)
+                    self.encode_seconds += time.perf_counter() - start
+                    log.write(json.dumps({'frame': self.written, 't': round(stamp, 4), 'label': label,
+                                          'mode': mode, **settings}) + "\n")
+                    self.written += 1
+                log.write(json.dumps({'summary': True, **self.stats()}) + "\n")
+        except Exception as exc:
+            self.error = f"Recording stopped: {exc}"
+            with self._condition:
+                self._stopping = True
+                self._queue.clear()
+                self._condition.notify_all()
+        finally:
+            if writer is not None:
+                writer.release()
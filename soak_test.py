@@ -0,0 +1,290 @@
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import statistics
+import sys
+import threading
+import time
+
+APP_SCRIPT = "model3_streamlit.py"
+
+
+def process_stats():
+    """RSS, open file descriptors, threads and child processes of this process (Linux /proc where needed)"""
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        fds = len(os.listdir("/proc/self/fd"))
+    except OSError:
+        import resource
+        # Peak rather than current RSS, but still shows steady growth
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+        fds = None
+    return {
+        'rss_mb': rss / 2**20,
+        'fds': fds,
+        'threads': threading.active_count(),
+        'children': len(mp.active_children()),
+    }
+
+
+def media_files():
+    """Images held by Streamlit's media store; replaced frames are only dropped when a script run ends"""
+    from streamlit.runtime import Runtime
+    runtime = Runtime._instance
+    manager = getattr(runtime, 'media_file_mgr', None)
+    return len(getattr(manager, '_file_metadata', ()))
+
+
+def state_bytes(state):
+    """Bytes of arrays (and objects reporting nbytes) kept in one session's state"""
+    total = 0
+    for value in state.values():
+        if isinstance(value, (bytes, bytearray)):
+            total += len(value)
+        else:
+            total += getattr(value, 'nbytes', 0) or 0
+    return total
+
+
+class Session:
+    """One simulated browser session that keeps the live camera view running.
+
+    Each live script run is cut off after ``slice_seconds``, as a widget
+    change or page reload would cut it off, so every slice also checks
+    that the interrupted loop cleaned up after itself.
+    """
+
+    def __init__(self, script, index, slice_seconds):
+        from streamlit.testing.v1 import AppTest
+        self.index = index
+        self.slice_seconds = slice_seconds
+        self.at = AppTest.from_file(script, default_timeout=120)
+        self.slices = 0
+        self.errors = []
+        self.thread = None
+
+    def setup(self):
+        self.at.run()
+        for checkbox in self.at.sidebar.checkbox:
+            if checkbox.label == "Show Performance Panel":
+                # Turns on frame counting; the panel itself only redraws once a second
+                checkbox.check()
+        self.at.run()
+        self._button("Start Camera").click()
+
+    def _button(self, label):
+        return next(button for button in self.at.button if label in button.label)
+
+    @property
+    def frames(self):
+        monitor = self.at.session_state.get('perf_monitor')
+        return monitor.frames if monitor is not None else 0
+
+    def live_slice(self):
+        try:
+            self.at.run(timeout=self.slice_seconds)
+        except RuntimeError as e:
+            if "timed out" not in str(e):
+                raise
+            # The expected end of a live run
+            self.slices += 1
+            return
+        # The live loop returned by itself: the camera failed or the script raised
+        messages = [str(e.value) for e in self.at.exception] + [e.value for e in self.at.error]
+        self.errors.append(f"session {self.index}: live run ended early: {messages or 'no message'}")
+
+    def run(self, stop_event):
+        while not stop_event.is_set() and not self.errors:
+            try:
+                self.live_slice()
+            except Exception as e:
+                self.errors.append(f"session {self.index}: {type(e).__name__}: {e}")
+
+    def stop_camera(self):
+        self._button("Stop Camera").click()
+        self.at.run()
+
+
+def sample(sessions, elapsed, last_frames, interval):
+    frames = sum(session.frames for session in sessions)
+    row = {'t': round(elapsed, 1), **process_stats(), 'media_files': media_files(),
+           'state_mb': sum(state_bytes(session.at.session_state) for session in sessions) / 2**20,
+           'fps': (frames - last_frames) / interval}
+    return row, frames
+
+
+def print_row(row):
+    print(f"{row['t']:8.0f}s {row['fps']:7.1f} {row['rss_mb']:9.1f} {row['fds'] if row['fds'] is not None else '-':>5} "
+          f"{row['threads']:>7} {row['children']:>8} {row['media_files']:>7} {row['state_mb']:9.1f}", flush=True)
+
+
+def soak(sessions_count, duration, slice_seconds, interval, source):
+    """Run the app live in several sessions for duration seconds; returns the samples and end state"""
+    os.environ["COLOR_ASSIST_CAMERA"] = source
+    # Streamlit warns per frame (deprecations) and per state read from this thread; keep the table readable
+    logging.getLogger("streamlit.deprecation_util").disabled = True
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").disabled = True
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, app_dir)
+    import camera_broker
+    from streamlit.testing.v1 import local_script_runner
+    # Sessions share the compiled script, as on a server; AppTest would otherwise parse it on every run,
+    # and Python 3.11's parser fails when two session threads parse at once
+    shared_cache = local_script_runner.ScriptCache()
+    local_script_runner.ScriptCache = lambda: shared_cache
+
+    before = process_stats()
+    script = os.path.join(app_dir, APP_SCRIPT)
+    sessions = [Session(script, index, slice_seconds) for index in range(sessions_count)]
+    # Set up one at a time: a finished AppTest run resets the runtime other sessions share
+    for session in sessions:
+        session.setup()
+
+    stop_event = threading.Event()
+    for session in sessions:
+        session.thread = threading.Thread(target=session.run, args=(stop_event,), name=f"soak-{session.index}",
+                                          daemon=True)
+        session.thread.start()
+
+    print(f"{'time':>9} {'fps':>7} {'rss MB':>9} {'fds':>5} {'threads':>7} {'children':>8} {'media':>7} {'state MB':>9}")
+    samples = []
+    start = time.perf_counter()
+    last_frames = 0
+    try:
+        while time.perf_counter() - start < duration and not any(session.errors for session in sessions):
+            time.sleep(interval)
+            row, last_frames = sample(sessions, time.perf_counter() - start, last_frames, interval)
+            samples.append(row)
+            print_row(row)
+    finally:
+        stop_event.set()
+        for session in sessions:
+            session.thread.join(slice_seconds + 30)
+
+    for session in sessions:
+        session.stop_camera()
+    # Give the brokers time to release the camera after their linger period
+    linger = max((broker.linger for broker in camera_broker._brokers.values()), default=0.0)
+    time.sleep(linger + 1.0)
+    end = {
+        **process_stats(),
+        'subscribers': sum(broker.subscribers for broker in camera_broker._brokers.values()),
+        'camera_processes': sum(broker.process is not None for broker in camera_broker._brokers.values()),
+        'slices': sum(session.slices for session in sessions),
+    }
+    errors = [error for session in sessions for error in session.errors]
+    camera_broker.shutdown_brokers()
+    return {'before': before, 'samples': samples, 'end': end, 'errors': errors}
+
+
+def check(report, warmup, limits):
+    """Failure messages for leaks and throughput drops, comparing the warmed-up start to the end"""
+    failures = list(report['errors'])
+    samples = report['samples']
+    warm = [row for row in samples if row['t'] >= warmup] or samples
+    if len(warm) < 4:
+        return failures + ["too few samples after warmup; run longer or sample more often"]
+    quarter = max(len(warm) // 4, 1)
+    first, last = warm[:quarter], warm[-quarter:]
+
+    def growth(key):
+        values = [row[key] for row in warm if row[key] is not None]
+        return max(values[-quarter:]) - max(values[:quarter]) if values else 0
+
+    for key, limit, unit in (('rss_mb', limits['rss_mb'], "MB"), ('fds', limits['fds'], ""),
+                             ('threads', limits['threads'], ""), ('state_mb', limits['state_mb'], "MB")):
+        if growth(key) > limit:
+            failures.append(f"{key} grew by {growth(key):.1f}{unit} (limit {limit}{unit})")
+    # Each slice starts a fresh media store, so growth within a slice is what shows
+    media = max(row['media_files'] for row in warm)
+    if media > limits['media_files']:
+        failures.append(f"Streamlit held {media} images at once (limit {limits['media_files']})")
+    start_fps = statistics.median(row['fps'] for row in first)
+    end_fps = statistics.median(row['fps'] for row in last)
+    if start_fps and end_fps < start_fps * (1 - limits['fps_drop']):
+        failures.append(f"FPS dropped from {start_fps:.1f} to {end_fps:.1f} (limit {limits['fps_drop']:.0%})")
+    if limits['min_fps'] and end_fps < limits['min_fps']:
+        failures.append(f"FPS {end_fps:.1f} is below the minimum of {limits['min_fps']}")
+
+    end, before = report['end'], report['before']
+    if end['subscribers'] or end['camera_processes'] or end['children']:
+        failures.append(f"camera not released after stopping: {end['subscribers']} subscribers, "
+                        f"{end['camera_processes']} capture processes, {end['children']} child processes")
+    if end['threads'] > before['threads'] + limits['threads']:
+        failures.append(f"{end['threads'] - before['threads']} threads left running after stopping")
+    return failures
+
+
+def compare(report, baseline, threshold):
+    """Names of the metrics that regressed against a saved soak report"""
+    regressions = []
+    current, old = summarize(report), summarize(baseline)
+    print(f"\n{'metric':<16} {'baseline':>10} {'current':>10} {'change':>8}")
+    for key, worse_when_higher in (('fps', False), ('rss_mb', True)):
+        if not old.get(key):
+            continue
+        change = current[key] / old[key] - 1
+        regressed = change > threshold if worse_when_higher else change < -threshold
+        if regressed:
+            regressions.append(key)
+        print(f"{key:<16} {old[key]:10.1f} {current[key]:10.1f} {change:+7.1%}{'  ⚠️ REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def summarize(report):
+    samples = report['samples']
+    if not samples:
+        return {}
+    return {'fps': statistics.median(row['fps'] for row in samples), 'rss_mb': samples[-1]['rss_mb']}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Streamlit app live in simulated sessions and watch for leaks")
+    parser.add_argument("-n", "--sessions", type=int, default=2, help="simulated browser sessions")
+    parser.add_argument("-d", "--duration", type=float, default=120.0, help="seconds to run (hours: 3600 * h)")
+    parser.add_argument("--slice", type=float, default=15.0, help="seconds before each live run is interrupted")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between samples")
+    parser.add_argument("--warmup", type=float, default=20.0, help="seconds ignored while caches fill")
+    parser.add_argument("--source", default="synthetic", help="'synthetic', a video file, or a camera index")
+    parser.add_argument("--max-rss-growth", type=float, default=64.0, help="MB")
+    parser.add_argument("--max-fd-growth", type=int, default=4)
+    parser.add_argument("--max-thread-growth", type=int, default=4)
+    parser.add_argument("--max-state-growth", type=float, default=1.0, help="MB of arrays in session state")
+    parser.add_argument("--max-media-files", type=int, default=100, help="images held by Streamlit's media store")
+    parser.add_argument("--max-fps-drop", type=float, default=0.25, help="0.25 = 25%% below the warmed-up FPS")
+    parser.add_argument("--min-fps", type=float, default=0.0, help="total FPS over all sessions")
+    parser.add_argument("--save", metavar="JSON", help="write the samples as a baseline file")
+    parser.add_argument("--compare", metavar="JSON", help="compare FPS and memory against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="change treated as a regression")
+    args = parser.parse_args(argv)
+
+    report = soak(args.sessions, args.duration, args.slice, args.interval, args.source)
+    report['settings'] = vars(args)
+    limits = {'rss_mb': args.max_rss_growth, 'fds': args.max_fd_growth, 'threads': args.max_thread_growth,
+              'state_mb': args.max_state_growth, 'media_files': args.max_media_files,
+              'fps_drop': args.max_fps_drop, 'min_fps': args.min_fps}
+    failures = check(report, args.warmup, limits)
+
+    end = report['end']
+    print(f"\n{end['slices']} interrupted live runs; after stopping: {end['subscribers']} subscribers, "
+          f"{end['camera_processes']} capture processes, {end['threads']} threads")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            failures += [f"{key} regressed against {args.compare}"
+                         for key in compare(report, json.load(f), args.threshold)]
+    if failures:
+        print("\n❌ " + "\n❌ ".join(failures))
+        return 1
+    print("\n✅ No leaks or throughput drops")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+
+def play_audio_file(path):
+    """Play a wav file with the platform's own player; False if none is available"""
+    try:
+        if sys.platform.startswith('win'):
+            import winsound
+            winsound.PlaySound(path, winsound.SND_FILENAME)
+            return True
+        for player in (['afplay'], ['paplay'], ['aplay', '-q']):
+            if shutil.which(player[0]):
+                return subprocess.run(player + [path], capture_output=True).returncode == 0
+    except Exception:
+        pass
+    return False
+
+
+class Pyttsx3Backend:
+    """Offline text-to-speech through pyttsx3.
+
+    Must be created and used from a single thread; SpeechService does
+    that by building it inside its worker.
+    """
+
+    def __init__(self, rate=150, volume=0.9):
+        import pyttsx3
+        self.engine = pyttsx3.init()
+        self.engine.setProperty('rate', rate)
+        self.engine.setProperty('volume', volume)
+
+    def say(self, text):
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def render(self, text, path):
+        """Pre-render text to a wav file; returns the path or None"""
+        self.engine.save_to_file(text, path)
+        self.engine.runAndWait()
+        return path if os.path.exists(path) and os.path.getsize(path) > 0 else None
+
+    def play(self, path):
+        return play_audio_file(path)
+
+
+class StubBackend:
+    """Records what would be spoken, for tests and headless runs"""
+
+    def __init__(self, delay=0.0, can_render=True):
+        self.delay = delay
+        self.can_render = can_render
+        self.spoken = []
+        self.rendered = []
+        self.played = []
+
+    def say(self, text):
+        time.sleep(self.delay)
+        self.spoken.append(text)
+
+    def render(self, text, path):
+        if not self.can_render:
+            return None
+        self.rendered.append(text)
+        return path
+
+    def play(self, path):
+        time.sleep(self.delay)
+        self.played.append(path)
+        return True
+
+
+class SpeechService:
+    """One long-lived speech worker fed by a small coalescing queue.
+
+    ``speak()`` never blocks: an announcement equal to one already waiting
+    or being spoken is merged into it, and when more than ``max_pending``
+    are waiting the oldest (outdated) ones are dropped, so the latest
+    color is what gets spoken. Phrases requested ``cache_after`` times are
+    rendered to audio once and replayed from the cache afterwards.
+    """
+
+    def __init__(self, backend_factory=Pyttsx3Backend, max_pending=1, cache_after=2, cache_dir=None):
+        self.backend_factory = backend_factory
+        self.backend = None
+        self.error = None
+        self.max_pending = max_pending
+        self.cache_after = cache_after
+        self.cache_dir = cache_dir
+        self.audio_cache = {}
+        self.requests = {}
+        self.pending = deque()
+        self.to_prerender = deque()
+        self.current = None
+        self.dropped = 0
+        self.merged = 0
+        self._condition = threading.Condition()
+        self._ready = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def start(self, timeout=2.0):
+        """Start the worker and wait for the backend; returns an error message or None"""
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="speech-worker", daemon=True)
+                self._thread.start()
+        self._ready.wait(timeout)
+        return self.error
+
+    def speak(self, text):
+        """Queue text to be spoken; returns False if it was merged or the service is down"""
+        if self._thread is None:
+            self.start(timeout=0)
+        with self._condition:
+            if self._stopped or self.error:
+                return False
+            self.requests[text] = self.requests.get(text, 0) + 1
+            if text == self.current or text in self.pending:
+                self.merged += 1
+                return False
+            self.pending.append(text)
+            while len(self.pending) > self.max_pending:
+                self.pending.popleft()
+                self.dropped += 1
+            self._condition.notify()
+        return True
+
+    def prerender(self, phrases):
+        """Queue phrases to be rendered into the audio cache while idle"""
+        with self._condition:
+            for text in phrases:
+                self.requests[text] = max(self.requests.get(text, 0), self.cache_after)
+            self.to_prerender.extend(t for t in phrases if t not in self.audio_cache)
+            self._condition.notify()
+
+    def stop(self, timeout=2.0):
+        with self._condition:
+            self._stopped = True
+            self.pending.clear()
+            self._condition.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def idle(self):
+        with self._condition:
+            return not self.pending and self.current is None
+
+    def _run(self):
+        try:
+            self.backend = self.backend_factory()
+        except Exception as e:
+            self.error = f"Voice engine initialization failed: {e}"
+        finally:
+            self._ready.set()
+        if self.error:
+            return
+        if self.cache_dir is None:
+            self.cache_dir = tempfile.mkdtemp(prefix="cba_speech_")
+        while True:
+            with self._condition:
+                while not self._stopped and not self.pending and not self.to_prerender:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                if self.pending:
+                    text = self.current = self.pending.popleft()
+                    warmup = None
+                else:
+                    text, warmup = None, self.to_prerender.popleft()
+            try:
+                if warmup is not None:
+                    self._cached_audio(warmup, render=True)
+                else:
+                    self._say(text)
+            except Exception:
+                pass
+            finally:
+                with self._condition:
+                    self.current = None
+
+    def _say(self, text):
+        render = self.requests.get(text, 0) >= self.cache_after
+        path = self._cached_audio(text, render)
+        if path is None or not self.backend.play(path):
+            self.backend.say(text)
+
+    def _cached_audio(self, text, render):
+        path = self.audio_cache.get(text)
+        if path is None and render and hasattr(self.backend, 'render'):
+            name = f"phrase_{len(self.audio_cache):04d}.wav"
+            path = self.backend.render(text, os.path.join(self.cache_dir, name))
+            if path is not None:
+                self.audio_cache[text] = path
+        return path
@@ -0,0 +1,477 @@
+"""Low-latency MJPEG front-end for the color transforms, built on asyncio.
+
+    python stream_server.py --source 0 --port 8080       # webcam, open http://localhost:8080
+    python stream_server.py --load-test 50 --slow 5      # synthetic source, 50 local clients
+
+One producer thread captures, transforms and JPEG-encodes each frame
+once, however many clients are connected. Every client gets the newest
+encoded frame once the previous one has left its socket (and, on Linux,
+has been acknowledged), so a slow client skips frames instead of queueing
+them or holding back the others.
+"""
+import argparse
+import asyncio
+import fcntl
+import json
+import socket
+import statistics
+import termios
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import cv2
+
+from camera_broker import acquire_camera, parse_source, shutdown_brokers
+from color_engine import ColorEngine
+from cvd_simulation import ANOMALOUS_TYPES
+
+BOUNDARY = "frame"
+MODES = ('normal', 'simulated', 'corrected')
+
+PAGE = """<!doctype html>
+<html><head><title>Color Blind Assist Stream</title></head>
+<body style="font-family:sans-serif">
+<select id="cb_type">{types}</select>
+<select id="mode">{modes}</select>
+<span id="name"></span><br>
+<img id="view" src="/stream" style="max-width:100%;cursor:crosshair">
+<script>
+const post = q => fetch(q, {{method: "POST"}}).then(r => r.json());
+for (const id of ["cb_type", "mode"])
+  document.getElementById(id).onchange = e => post(`/settings?${{id}}=${{e.target.value}}`);
+document.getElementById("view").onclick = e => {{
+  const img = e.target, x = Math.floor(e.offsetX * img.naturalWidth / img.width),
+        y = Math.floor(e.offsetY * img.naturalHeight / img.height);
+  fetch(`/color?x=${{x}}&y=${{y}}`).then(r => r.json()).then(c =>
+    document.getElementById("name").textContent = c.error || `${{c.name}} ${{c.hex}} at (${{x}}, ${{y}})`);
+}};
+</script></body></html>
+"""
+
+
+def unsent_bytes(sock):
+    """Bytes written to a TCP socket that the peer has not acknowledged yet (0 where unknown)"""
+    if sock is None or not hasattr(termios, 'TIOCOUTQ'):
+        return 0
+    try:
+        return int.from_bytes(fcntl.ioctl(sock.fileno(), termios.TIOCOUTQ, bytes(4)), 'little', signed=True)
+    except OSError:
+        return 0
+
+
+class EncodedFrame:
+    """One shared JPEG with the frame it came from"""
+
+    __slots__ = ('seq', 'jpeg', 'captured', 'raw')
+
+    def __init__(self, seq, jpeg, captured, raw):
+        self.seq = seq
+        self.jpeg = jpeg
+        self.captured = captured
+        self.raw = raw
+
+
+class ClientStats:
+    """Frames sent, skipped and capture-to-sent latency of one stream client"""
+
+    def __init__(self, peer):
+        self.peer = peer
+        self.connected = time.perf_counter()
+        self.sent = 0
+        self.skipped = 0
+        self.latencies = []
+
+    def as_dict(self):
+        elapsed = time.perf_counter() - self.connected
+        latency = sorted(self.latencies[-300:])
+        return {
+            'peer': self.peer,
+            'sent': self.sent,
+            'skipped': self.skipped,
+            'fps': round(self.sent / elapsed, 2) if elapsed > 0 else 0.0,
+            'latency_ms_p50': round(1000 * latency[len(latency) // 2], 2) if latency else None,
+            'latency_ms_p95': round(1000 * latency[int(len(latency) * 0.95)], 2) if latency else None,
+        }
+
+
+class StreamServer:
+    """Serves one camera, transformed by a shared ColorEngine, to any number of clients.
+
+    Endpoints: ``/`` (viewer page), ``/stream`` (MJPEG), ``/settings``
+    (GET or POST with ``cb_type``, ``mode``, ``strength``, ``severity``),
+    ``/color?x=&y=`` (name of a pixel of the newest camera frame) and
+    ``/stats`` (producer and per-client counters).
+    """
+
+    def __init__(self, source=0, host="127.0.0.1", port=8080, quality=80, engine=None, send_buffer=64 << 10):
+        self.source = source
+        self.host = host
+        self.port = port
+        self.quality = quality
+        self.send_buffer = send_buffer
+        self.engine = engine or ColorEngine()
+        # Settings changes bake new tables in the background instead of stalling every stream
+        self.engine.bake_in_background = True
+        self.settings = {'cb_type': None, 'mode': 'normal', 'strength': 0.7}
+        self.latest = None
+        self.clients = {}
+        self.encode_seconds = 0.0
+        self.error = None
+        self._frame_ready = None
+        self._loop = None
+        self._stop = threading.Event()
+        self._producer = None
+        self._server = None
+
+    # ---- producer thread: capture, transform and encode once per frame ----
+
+    def _transform(self, frame):
+        settings = self.settings
+        cb_type, mode = settings['cb_type'], settings['mode']
+        if mode == 'normal' or not self.engine.simulates(cb_type):
+            return frame
+        # The matrices are defined on RGB
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if mode == 'simulated':
+            rgb = self.engine.simulate_color_blindness(rgb, cb_type)
+        else:
+            rgb = self.engine.daltonize_image(rgb, cb_type, settings['strength'])
+        return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+    def _produce(self):
+        cap = acquire_camera(self.source)
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        try:
+            if not cap.isOpened():
+                self.error = f"Cannot open source {self.source!r}"
+                return
+            seq = 0
+            while not self._stop.is_set():
+                ret, frame = cap.read(copy=False)
+                if not ret:
+                    self.error = "Failed to read from camera."
+                    break
+                captured = time.perf_counter()
+                raw = cv2.flip(frame, 1)
+                if not cap.intact():
+                    # The writer lapped us while flipping
+                    continue
+                start = time.perf_counter()
+                ok, jpeg = cv2.imencode(".jpg", self._transform(raw), params)
+                self.encode_seconds += time.perf_counter() - start
+                if not ok:
+                    continue
+                seq += 1
+                encoded = EncodedFrame(seq, jpeg.tobytes(), captured, raw)
+                self._loop.call_soon_threadsafe(self._publish, encoded)
+        finally:
+            cap.release()
+
+    def _publish(self, encoded):
+        """Make a frame the newest one and wake every client waiting for it"""
+        self.latest = encoded
+        self._frame_ready.set()
+        self._frame_ready = asyncio.Event()
+
+    # ---- HTTP ----
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._frame_ready = asyncio.Event()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._producer = threading.Thread(target=self._produce, name="stream-producer", daemon=True)
+        self._producer.start()
+        return self
+
+    async def stop(self):
+        self._stop.set()
+        if self._frame_ready is not None:
+            # Wake streams waiting for a frame so they can finish
+            self._frame_ready.set()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._producer is not None:
+            await asyncio.to_thread(self._producer.join, 5.0)
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"📡 Streaming on http://{self.host}:{self.port}/")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        parts = request.split(b"\r\n", 1)[0].split(b" ")
+        if len(parts) != 3 or not parts[0].isalpha() or not parts[1].startswith(b"/"):
+            try:
+                writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                writer.close()
+            return
+        method, target = parts[:2]
+        url = urlsplit(target.decode("latin-1"))
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if url.path == "/stream":
+                await self._stream(writer)
+                return
+            if url.path == "/":
+                options = lambda values: "".join(f"<option>{value}</option>" for value in values)
+                types = ["normal", *self.engine.color_matrices, *ANOMALOUS_TYPES]
+                body, content_type = PAGE.format(types=options(types), modes=options(MODES)), "text/html"
+                status = "200 OK"
+            else:
+                status, payload = self._api(url.path, query, method == b"POST")
+                body, content_type = json.dumps(payload), "application/json"
+            data = body.encode()
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(data)}\r\n"
+                         f"Cache-Control: no-store\r\nConnection: close\r\n\r\n".encode() + data)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _api(self, path, query, post):
+        if path == "/settings":
+            return self._update_settings(query) if post or query else ("200 OK", self._settings_payload())
+        if path == "/color":
+            return self._color(query)
+        if path == "/stats":
+            return "200 OK", self.stats()
+        return "404 Not Found", {'error': f"No such endpoint {path}"}
+
+    def _settings_payload(self):
+        return {**self.settings, 'severity': self.engine.severity}
+
+    def _update_settings(self, query):
+        settings = dict(self.settings)
+        try:
+            if 'cb_type' in query:
+                cb_type = None if query['cb_type'] in ("", "normal", "none") else query['cb_type']
+                if cb_type is not None and not self.engine.simulates(cb_type):
+                    raise ValueError(f"Unknown cb_type {cb_type!r}")
+                settings['cb_type'] = cb_type
+            if 'mode' in query:
+                if query['mode'] not in MODES:
+                    raise ValueError(f"mode must be one of {', '.join(MODES)}")
+                settings['mode'] = query['mode']
+            if 'strength' in query:
+                settings['strength'] = float(query['strength'])
+            if 'severity' in query:
+                self.engine.severity = min(max(float(query['severity']), 0.0), 1.0)
+        except ValueError as exc:
+            return "400 Bad Request", {'error': str(exc)}
+        # One assignment, so the producer never sees half-applied settings
+        self.settings = settings
+        return "200 OK", self._settings_payload()
+
+    def _color(self, query):
+        latest = self.latest
+        if latest is None:
+            return "503 Service Unavailable", {'error': "No frame yet"}
+        try:
+            x, y = int(query['x']), int(query['y'])
+        except (KeyError, ValueError):
+            return "400 Bad Request", {'error': "x and y are required integers"}
+        h, w = latest.raw.shape[:2]
+        if not (0 <= x < w and 0 <= y < h):
+            return "400 Bad Request", {'error': f"({x}, {y}) is outside the {w}x{h} frame"}
+        b, g, r = (int(v) for v in latest.raw[y, x])
+        return "200 OK", {'x': x, 'y': y, 'rgb': [r, g, b], 'hex': f"#{r:02x}{g:02x}{b:02x}",
+                          'name': self.engine.get_color_name_advanced((r, g, b)), 'frame': latest.seq}
+
+    def stats(self):
+        latest = self.latest
+        frames = latest.seq if latest is not None else 0
+        return {
+            'frames': frames,
+            'encode_ms': round(1000 * self.encode_seconds / frames, 2) if frames else 0.0,
+            'settings': self._settings_payload(),
+            'error': self.error,
+            'clients': [client.as_dict() for client in self.clients.values()],
+        }
+
+    async def _stream(self, writer):
+        """Send the newest frame each time the previous one has drained"""
+        peer = writer.get_extra_info("peername")
+        client = ClientStats(f"{peer[0]}:{peer[1]}" if peer else "?")
+        # Keep one frame in flight: nothing waits in asyncio's buffer, and a frame is only
+        # written once the kernel has handed the previous one to the client
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer)
+        writer.transport.set_write_buffer_limits(high=0)
+        self.clients[id(writer)] = client
+        try:
+            writer.write(f"HTTP/1.1 200 OK\r\nContent-Type: multipart/x-mixed-replace; boundary={BOUNDARY}\r\n"
+                         f"Cache-Control: no-store\r\nConnection: close\r\n\r\n".encode())
+            last_seq = 0
+            while not self._stop.is_set():
+                latest = self.latest
+                if latest is None or latest.seq == last_seq:
+                    await self._frame_ready.wait()
+                    continue
+                if writer.transport.get_write_buffer_size() or unsent_bytes(sock):
+                    # The client is still reading an older frame; try again with the next one
+                    await self._frame_ready.wait()
+                    continue
+                if last_seq:
+                    client.skipped += latest.seq - last_seq - 1
+                last_seq = latest.seq
+                # Wall-clock capture time, so clients on this machine can measure latency too
+                stamp = time.time() - (time.perf_counter() - latest.captured)
+                writer.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(latest.jpeg)}\r\n"
+                             f"X-Frame: {latest.seq}\r\nX-Timestamp: {stamp:.6f}\r\n\r\n".encode())
+                writer.write(latest.jpeg)
+                writer.write(b"\r\n")
+                # Backpressure: a slow client waits here while newer frames replace this one
+                await writer.drain()
+                client.sent += 1
+                client.latencies.append(time.perf_counter() - latest.captured)
+                del client.latencies[:-1000]
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.pop(id(writer), None)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+# ---- local load test ----
+
+async def _stream_client(port, duration, read_delay, results, index):
+    """Read an MJPEG stream, optionally slowly, and record FPS and latency"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if read_delay:
+        # A small receive window, like a slow link, instead of loopback's megabytes of buffering; with the
+        # small reader limit below, the client itself holds well under one 640x480 frame
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 << 10)
+    sock.setblocking(False)
+    await asyncio.get_running_loop().sock_connect(sock, ("127.0.0.1", port))
+    reader, writer = await asyncio.open_connection(sock=sock, limit=4 << 10)
+    writer.write(b"GET /stream HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    await writer.drain()
+    await reader.readuntil(b"\r\n\r\n")
+    frames, latencies = 0, []
+    start = time.perf_counter()
+    try:
+        while time.perf_counter() - start < duration:
+            headers = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+            fields = dict(line.split(": ", 1) for line in headers if ": " in line)
+            await reader.readexactly(int(fields["Content-Length"]) + 2)
+            latencies.append(time.time() - float(fields["X-Timestamp"]))
+            frames += 1
+            if read_delay:
+                await asyncio.sleep(read_delay)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    results[index] = {
+        'client': index,
+        'slow': bool(read_delay),
+        'fps': frames / elapsed,
+        'latency_ms_p50': 1000 * statistics.median(latencies) if latencies else float('nan'),
+        'latency_ms_max': 1000 * max(latencies) if latencies else float('nan'),
+    }
+
+
+async def load_test(clients=20, slow=0, duration=5.0, width=640, height=480, fps=30, quality=80,
+                    cb_type='protanopia', mode='simulated', send_buffer=64 << 10):
+    """Serve a synthetic source to many local clients and report per-client FPS and latency"""
+    server = StreamServer(("synthetic", width, height, fps), port=0, quality=quality, send_buffer=send_buffer)
+    server._update_settings({'cb_type': cb_type, 'mode': mode})
+    await server.start()
+    try:
+        results = [None] * clients
+        # The slow clients read one frame per 200 ms and must not hold back the rest
+        await asyncio.gather(*(
+            _stream_client(server.port, duration, 0.2 if i < slow else 0.0, results, i) for i in range(clients)
+        ))
+        stats = server.stats()
+    finally:
+        await server.stop()
+    return results, stats
+
+
+def print_load_test(results, stats):
+    print(f"{'client':>6} {'slow':>5} {'fps':>7} {'p50 ms':>8} {'max ms':>8}")
+    for r in results:
+        print(f"{r['client']:>6} {'yes' if r['slow'] else '':>5} {r['fps']:>7.1f} "
+              f"{r['latency_ms_p50']:>8.1f} {r['latency_ms_max']:>8.1f}")
+    fast = [r for r in results if not r['slow']]
+    if fast:
+        print(f"fast clients: mean {statistics.mean(r['fps'] for r in fast):.1f} fps, "
+              f"median latency {statistics.median(r['latency_ms_p50'] for r in fast):.1f} ms")
+    print(f"producer: {stats['frames']} frames, {stats['encode_ms']} ms transform+encode per frame "
+          f"(shared by all clients)")
+
+
+def check_load_test(results, max_slow_latency_ms=500.0):
+    """Failure messages for slow clients that were sent stale frames.
+
+    A slow client reads one frame per 200 ms, so a frame it is sent
+    should wait for about one read; much more means frames queued up.
+    """
+    return [f"slow client {r['client']}: median latency {r['latency_ms_p50']:.0f} ms "
+            f"(limit {max_slow_latency_ms:.0f} ms)"
+            for r in results if r['slow'] and not r['latency_ms_p50'] <= max_slow_latency_ms]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream the color transforms as MJPEG over HTTP")
+    parser.add_argument("--source", default="0", help="camera index, video file, or 'synthetic'")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--quality", type=int, default=80, help="JPEG quality")
+    parser.add_argument("--width", type=int, default=640, help="synthetic source width")
+    parser.add_argument("--height", type=int, default=480, help="synthetic source height")
+    parser.add_argument("--fps", type=int, default=30, help="synthetic source frame rate")
+    parser.add_argument("--send-buffer", type=int, default=64, metavar="KB",
+                        help="socket send buffer per stream; smaller cuts slow-client latency, larger suits long links")
+    parser.add_argument("--load-test", type=int, metavar="CLIENTS",
+                        help="run CLIENTS local clients against a synthetic source and report")
+    parser.add_argument("--slow", type=int, default=0, help="how many load-test clients read slowly")
+    parser.add_argument("--duration", type=float, default=5.0, help="load-test duration in seconds")
+    parser.add_argument("--max-slow-latency", type=float, default=500.0, metavar="MS",
+                        help="load-test limit on a slow client's median latency")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.load_test:
+            results, stats = asyncio.run(load_test(args.load_test, args.slow, args.duration, args.width,
+                                                   args.height, args.fps, args.quality,
+                                                   send_buffer=args.send_buffer << 10))
+            print_load_test(results, stats)
+            failures = check_load_test(results, args.max_slow_latency)
+            if failures:
+                print("\n❌ " + "\n❌ ".join(failures))
+                return 1
+            return 0
+        source = parse_source(args.source, args.width, args.height, args.fps)
+        asyncio.run(StreamServer(source, args.host, args.port, args.quality,
+                                 send_buffer=args.send_buffer << 10).serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_brokers()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
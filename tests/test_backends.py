@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from benchmark import synthetic_frame
+from color_engine import ColorEngine
+from color_lut import LUTCache
+from cvd_simulation import ANOMALOUS_TYPES
+
+DICHROMATS = ('protanopia', 'deuteranopia', 'tritanopia')
+MODES = (('simulated', None), ('corrected', 0.7))
+
+
+@pytest.fixture(scope="module")
+def pixels():
+    """A camera-like scene plus uniformly random colors"""
+    rng = np.random.default_rng(0)
+    random = rng.integers(0, 256, size=(64 * 64, 3), dtype=np.uint8)
+    return np.concatenate([synthetic_frame(64, 64).reshape(-1, 3), random]).reshape(128, 64, 3)
+
+
+@pytest.fixture(scope="module")
+def lut_cache():
+    """One cache for the whole module, so each exact table is baked once"""
+    return LUTCache(max_entries=64, max_bytes=4 << 30)
+
+
+def bound(cb_type, backend, linear):
+    """Largest per-channel difference allowed against the float64 matrix path"""
+    if cb_type in ANOMALOUS_TYPES or linear:
+        # Clipping and gamma curves always go through an exact 8-bit LUT
+        return 1
+    # The fused path rounds instead of truncating; the 7-bit LUT is off by up to one input level
+    return 1 if backend == 'fused' else 2
+
+
+@pytest.mark.parametrize("linear", [False, True], ids=["srgb", "linear"])
+@pytest.mark.parametrize("severity", [1.0, 0.6])
+@pytest.mark.parametrize("cb_type", DICHROMATS + ANOMALOUS_TYPES)
+@pytest.mark.parametrize("backend", ["fused", "lut"])
+def test_backend_matches_matrix_path(pixels, lut_cache, backend, cb_type, severity, linear):
+    engine = ColorEngine(lut_cache=lut_cache)
+    engine.severity = severity
+    engine.linear_rgb = linear
+    for mode, strength in MODES:
+        error = engine.compare_backends(pixels, cb_type, mode, strength, backend)
+        assert error <= bound(cb_type, backend, linear), (mode, error)
+
+
+def test_lut_max_error_against_matrix():
+    engine = ColorEngine()
+    lut = engine.get_lut('deuteranopia', 'simulated')
+    assert lut.max_error(lambda img: engine.simulate_matrix(img, 'deuteranopia')) <= 2
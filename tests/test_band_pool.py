@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from band_pool import BandPool
+from benchmark import synthetic_frame
+from color_engine import ColorEngine
+
+# Heights that do not split evenly into 4 bands, and one with fewer rows than workers.
+# BayerPipeline over a BandPool is covered in test_bayer.py.
+HEIGHTS = (97, 130, 3)
+
+
+@pytest.fixture(scope="module")
+def pool():
+    # Several small bands even on a single-core machine
+    pool = BandPool(workers=4, min_band_pixels=64)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.parametrize("height", HEIGHTS)
+@pytest.mark.parametrize("backend", ["fused", "lut", "matrix"])
+@pytest.mark.parametrize("cb_type, mode, strength", [("protanopia", "simulated", None),
+                                                     ("deuteranopia", "corrected", 0.7),
+                                                     ("protanomaly", "corrected", 0.7)])
+def test_banded_transform_is_byte_identical(pool, height, backend, cb_type, mode, strength):
+    frame = synthetic_frame(max(height, 16), 90)[:height]
+    single = ColorEngine(backend=backend)
+    banded = ColorEngine(backend=backend, lut_cache=single.lut_cache, band_pool=pool)
+    assert pool.band_count(frame.shape) > 1
+    expected = single.transform(frame, cb_type, mode, strength).copy()
+    assert np.array_equal(banded.transform(frame, cb_type, mode, strength), expected)
+
+
+def test_bands_cover_every_row_once(pool):
+    for height in (1, 2, 97, 130):
+        rows = np.concatenate([np.arange(height)[band] for band in pool.bands(height, min(pool.workers, height))])
+        assert np.array_equal(rows, np.arange(height))
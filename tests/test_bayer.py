@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from band_pool import BandPool
+from bayer import CFA_PATTERNS, DEMOSAIC_ALGORITHMS, BayerPipeline, RawBayerSource, demosaic, mosaic
+from benchmark import synthetic_frame
+from color_engine import ColorEngine
+
+
+@pytest.mark.parametrize("algorithm", list(DEMOSAIC_ALGORITHMS))
+@pytest.mark.parametrize("pattern", CFA_PATTERNS)
+def test_mosaic_round_trips(pattern, algorithm):
+    flat = np.empty((16, 16, 3), dtype=np.uint8)
+    flat[...] = (30, 120, 220)
+    assert (demosaic(mosaic(flat, pattern), pattern, algorithm) == (30, 120, 220)).all()
+
+    # Demosaicing keeps every sampled value, away from the borders
+    raw = mosaic(synthetic_frame(64, 80), pattern)
+    resampled = mosaic(demosaic(raw, pattern, algorithm), pattern)
+    assert np.array_equal(resampled[2:-2, 2:-2], raw[2:-2, 2:-2])
+
+
+@pytest.mark.parametrize("height", (8, 34, 98, 101))
+@pytest.mark.parametrize("algorithm", list(DEMOSAIC_ALGORITHMS))
+@pytest.mark.parametrize("pattern", CFA_PATTERNS)
+def test_pipeline_matches_full_frame_demosaic(pattern, algorithm, height):
+    raw = mosaic(synthetic_frame(max(height, 16), 48)[:height], pattern)
+    kernel = ColorEngine().kernel('deuteranopia', 'corrected', 0.7, bgr=True)
+    expected = np.empty((height, 48, 3), dtype=np.uint8)
+    kernel(demosaic(raw, pattern, algorithm), expected)
+    pool = BandPool(workers=3, min_band_pixels=64)
+    try:
+        for band_pool in (None, pool):
+            pipeline = BayerPipeline(pattern, algorithm, band_pool=band_pool, band_rows=16)
+            assert np.array_equal(pipeline.process(raw), demosaic(raw, pattern, algorithm))
+            assert np.array_equal(pipeline.process(raw, kernel), expected)
+    finally:
+        pool.shutdown()
+
+
+def test_raw_file_smaller_than_a_frame(tmp_path):
+    path = tmp_path / "short.raw"
+    path.write_bytes(bytes(10))
+    with pytest.raises(ValueError, match="less than one 4x4 frame"):
+        RawBayerSource(str(path), 4, 4)
+
+
+def test_raw_file_frames_loop_and_scale(tmp_path):
+    frames = np.arange(2 * 4 * 6, dtype=np.uint16).reshape(2, 4, 6) << 2
+    path = tmp_path / "frames.raw"
+    frames.tofile(path)
+    source = RawBayerSource(str(path), 6, 4, np.uint16, bits=10)
+    assert len(source) == 2
+    read = [source.read()[1] for _ in range(3)]
+    assert [frame.dtype for frame in read] == [np.uint8] * 3
+    assert np.array_equal(read[0], frames[0] >> 2)
+    assert np.array_equal(read[2], read[0])
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import numpy as np
+
+from camera_broker import CameraBroker, FrameRing
+
+
+def frame(value, shape=(4, 6, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_copy_survives_the_writer_lapping_the_reader():
+    ring = FrameRing((4, 6, 3), slots=2, create=True)
+    try:
+        ring.write(frame(1), 1)
+        copied = ring.copy(1)
+        view = ring.view(1)
+        ring.write(frame(2), 2)
+        ring.write(frame(3), 3)  # reuses frame 1's slot
+        assert not ring.intact(1)
+        assert ring.view(1) is None and ring.copy(1) is None
+        # The copy is private; the view now shows the newer frame
+        assert (copied == 1).all() and (view == 3).all()
+        del view
+    finally:
+        ring.close()
+
+
+def test_copy_rejects_a_frame_overwritten_while_copying():
+    ring = FrameRing((4, 6, 3), slots=2, create=True)
+    try:
+        ring.write(frame(1), 1)
+        out = np.empty((4, 6, 3), dtype=np.uint8)
+        original = np.copyto
+
+        def copy_then_overwrite(dst, src):
+            # The writer reuses the slot right after the reader's copy
+            np.copyto = original
+            original(dst, src)
+            ring.write(frame(3), 3)
+        np.copyto = copy_then_overwrite
+        try:
+            assert ring.copy(1, out) is None
+        finally:
+            np.copyto = original
+    finally:
+        ring.close()
+
+
+def test_close_with_a_reader_view_alive():
+    ring = FrameRing((4, 6, 3), slots=2, create=True)
+    ring.write(frame(1), 1)
+    view = ring.view(1)
+    ring.close()
+    assert view.shape == (4, 6, 3)
+
+
+def test_unsubscribe_does_not_wait_for_a_starting_camera():
+    broker = CameraBroker("synthetic", linger=0)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_start():
+        started.set()
+        release.wait(5)
+    broker._start = slow_start
+    broker.subscribers = 1
+    threading.Thread(target=broker.subscribe, daemon=True).start()
+    assert started.wait(5)
+    t0 = time.perf_counter()
+    broker.unsubscribe()
+    assert time.perf_counter() - t0 < 0.5
+    # The starting subscriber is still counted, so the process is not released
+    assert broker.subscribers == 1
+    release.set()
@@ -0,0 +1,63 @@
+import numpy as np
+
+from capture_cache import CaptureCache
+
+
+def frame(tag, shape=(48, 64, 3)):
+    img = np.zeros(shape, dtype=np.uint8)
+    img.flat[0] = tag
+    return img
+
+
+def test_entries_are_found_by_content():
+    cache = CaptureCache()
+    calls = []
+    entry = cache.get(frame(1))
+    assert entry.derived('stats', lambda: calls.append(1) or 'computed') == 'computed'
+
+    # Same array, then an equal copy: both hit, nothing is recomputed
+    assert cache.get(entry.image) is entry
+    assert cache.get(frame(1)) is entry
+    assert entry.derived('stats', lambda: calls.append(1) or 'again') == 'computed'
+    assert calls == [1]
+
+    # Different pixels, or the same bytes in another shape, miss
+    assert cache.get(frame(2)) is not entry
+    assert cache.get(frame(1, (64, 48, 3))) is not entry
+    assert len(cache) == 3
+
+
+def test_least_recently_used_capture_goes_beyond_three_entries():
+    cache = CaptureCache()
+    first, second, third = (cache.get(frame(tag)) for tag in (1, 2, 3))
+    # Revisiting the first capture makes the second the oldest
+    assert cache.get(frame(1)) is first
+    cache.get(frame(4))
+    assert len(cache) == 3
+    assert cache.get(frame(1)) is first
+    assert cache.get(frame(3)) is third
+    assert cache.get(frame(2)) is not second
+
+
+def test_captures_are_evicted_at_the_byte_cap():
+    cache = CaptureCache()
+    assert cache.max_bytes == 256 << 20
+    # 64 MB frames; derived arrays are left unwritten, so they cost address space only
+    big = (8192, 8192)
+    first = cache.get(frame(1, big))
+    first.derived('overlay', lambda: np.empty(100 << 20, dtype=np.uint8))
+    second = cache.get(frame(2, big))
+    assert len(cache) == 2
+
+    # 164 + 164 MB is over the cap: the older capture goes
+    second.derived('overlay', lambda: np.empty(100 << 20, dtype=np.uint8))
+    assert len(cache) == 1
+    assert cache.nbytes <= 256 << 20
+    assert cache.get(frame(2, big)) is second
+
+    # A capture over the cap on its own keeps its frame and drops derived data, oldest first
+    name_map = second.derived('name_map', lambda: np.empty(150 << 20, dtype=np.uint8))
+    assert second.nbytes <= 256 << 20
+    assert second.derived('name_map', lambda: None) is name_map
+    assert second.derived('overlay', lambda: None) is None
+    assert second.image.shape == big
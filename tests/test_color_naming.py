@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from color_engine import ColorEngine
+
+# Colors only the lazily built CSS3 exact-name table knows
+CSS3_ONLY = {
+    (240, 248, 255): 'aliceblue',
+    (250, 235, 215): 'antiquewhite',
+    (127, 255, 212): 'aquamarine',
+    (255, 228, 196): 'bisque',
+}
+
+
+def test_batch_naming_cold_index_with_css3_only_colors():
+    engine = ColorEngine()
+    pixels = np.array(list(CSS3_ONLY), dtype=np.uint8)
+    # First call on a fresh index: the exact table is built during the call
+    names = engine.get_color_names(pixels)
+    assert list(names) == list(CSS3_ONLY.values())
+
+
+def test_batch_naming_cold_index_frame():
+    engine = ColorEngine()
+    frame = np.zeros((4, 6, 3), dtype=np.uint8)
+    frame[:2] = (240, 248, 255)
+    names = engine.get_color_names(frame)
+    assert names.shape == (4, 6)
+    assert names[0, 0] == 'aliceblue' and names[3, 5] == 'black'
+
+
+@pytest.mark.parametrize("tolerance", [None, 0, 20, 50, 120])
+def test_batch_naming_matches_single_naming(tolerance):
+    engine = ColorEngine()
+    rng = np.random.default_rng(tolerance or 0)
+    pixels = np.concatenate([
+        rng.integers(0, 256, size=(3000, 3), dtype=np.uint8),
+        # Exact palette and CSS3 colors, and grays for the HSV fallback
+        np.array([engine.hex_to_rgb(h) for h in engine.extended_colors.values()], dtype=np.uint8),
+        np.array(list(CSS3_ONLY), dtype=np.uint8),
+        np.repeat(np.arange(0, 256, 15, dtype=np.uint8)[:, None], 3, axis=1),
+    ])
+    batch = engine.get_color_names(pixels, tolerance)
+    single = [engine.get_color_name_advanced(tuple(rgb), tolerance) for rgb in pixels]
+    assert list(batch) == single
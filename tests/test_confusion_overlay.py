@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from color_engine import ColorEngine
+from color_lut import LUTCache
+from confusion_overlay import ConfusionOverlay
+from live_view import transform_camera_frame
+from perf_monitor import PerfMonitor
+
+VIEW_MODES = ["Simulated", "Corrected (Daltonized)"]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return ColorEngine(lut_cache=LUTCache(max_entries=16, max_bytes=1 << 30))
+
+
+def red_and_gray():
+    """BGR frame: pure red on the left, which protanopia darkens, and gray on the right"""
+    frame = np.full((96, 128, 3), 128, dtype=np.uint8)
+    frame[:, :64] = (0, 0, 255)
+    return frame
+
+
+def grays():
+    """BGR frame of grays only, which no simulation changes"""
+    return np.repeat(np.linspace(0, 255, 128).astype(np.uint8)[None, :, None], 96, axis=0).repeat(3, axis=2)
+
+
+@pytest.mark.parametrize("path", ["simulated frame", "kernel"])
+def test_mask_flags_confusable_colors_only(engine, path):
+    kernel = engine.kernel("protanopia", "simulated", bgr=True)
+    overlay = ConfusionOverlay()
+    for frame, expected in ((red_and_gray(), 0.5), (grays(), 0.0)):
+        if path == "kernel":
+            mask = overlay.mask(frame, kernel=kernel)
+        else:
+            mask = overlay.mask(frame, engine.simulate_color_blindness(frame, "protanopia", bgr=True))
+        assert overlay.last_fraction == pytest.approx(expected, abs=0.05)
+        if expected:
+            # Confused on the red side, nowhere on the gray side
+            assert (mask[:, :mask.shape[1] // 2 - 1] == 255).all()
+            assert not mask[:, mask.shape[1] // 2 + 1:].any()
+
+
+@pytest.mark.parametrize("view_mode", VIEW_MODES)
+def test_live_view_outlines_confusable_regions(engine, view_mode):
+    frame = red_and_gray()
+    # The engine reuses its output buffer, so keep a copy
+    plain = transform_camera_frame(engine, frame, "protanopia", view_mode, view_mode, PerfMonitor()).copy()
+    marked = transform_camera_frame(engine, frame, "protanopia", view_mode, view_mode, PerfMonitor(),
+                                    confusion=ConfusionOverlay())
+    changed = (plain != marked).any(axis=2)
+    # Rows below the label: the red half is tinted, the gray half beyond the outline is untouched
+    assert changed[40:, :60].all()
+    assert not changed[40:, 70:].any()
+
+
+@pytest.mark.parametrize("view_mode", VIEW_MODES)
+def test_live_view_leaves_frames_without_confusable_colors_alone(engine, view_mode):
+    frame = grays()
+    # The engine reuses its output buffer, so keep a copy
+    plain = transform_camera_frame(engine, frame, "protanopia", view_mode, view_mode, PerfMonitor()).copy()
+    overlay = ConfusionOverlay()
+    marked = transform_camera_frame(engine, frame, "protanopia", view_mode, view_mode, PerfMonitor(),
+                                    confusion=overlay)
+    assert overlay.last_fraction == 0
+    assert (plain == marked).all()
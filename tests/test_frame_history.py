@@ -0,0 +1,36 @@
+import numpy as np
+
+from frame_history import FrameHistory
+
+
+def test_history_stays_within_its_byte_budget():
+    history = FrameHistory(capacity=30, max_bytes=64 << 20)
+    full_hd = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    for t in range(40):
+        history.push(full_hd, timestamp=t)
+    assert history.slots == 10
+    assert history.nbytes <= 64 << 20
+
+    # Smaller frames fit the full capacity
+    history.push(np.zeros((480, 640, 3), dtype=np.uint8), timestamp=40)
+    assert history.slots == 30
+    assert history.nbytes <= 64 << 20
+
+
+def test_history_keeps_one_frame_over_budget():
+    history = FrameHistory(max_bytes=1)
+    history.push(np.full((4, 6, 3), 7, dtype=np.uint8), timestamp=0)
+    assert history.slots == 1
+    assert (history.frame(history.sharpest(1.0, now=0.5)) == 7).all()
+
+
+def test_sharpest_picks_the_focused_frame_in_the_window():
+    history = FrameHistory(capacity=4)
+    flat = np.full((120, 160, 3), 128, dtype=np.uint8)
+    detailed = np.random.default_rng(0).integers(0, 256, flat.shape, dtype=np.uint8)
+    history.push(flat, timestamp=0.0)
+    history.push(detailed, timestamp=0.1)
+    history.push(flat, timestamp=0.2)
+    assert history.sharpest(1.0, now=0.5) == 1
+    # Nothing recent: the newest frame
+    assert history.sharpest(1.0, now=10.0) == 2
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import frame_stats
+from frame_stats import frame_statistics
+
+
+@pytest.fixture(params=["sort", "bincount"])
+def counting(request, monkeypatch):
+    # Small frames are sorted, large ones bincounted; run every test through both
+    monkeypatch.setattr(frame_stats, "BINCOUNT_MIN_PIXELS", 1 << 40 if request.param == "sort" else 0)
+    return request.param
+
+
+def reference(img):
+    """Distinct colors and counts by np.unique, most frequent first"""
+    colors, counts = np.unique(img.reshape(-1, 3), axis=0, return_counts=True)
+    order = np.argsort(-counts, kind="stable")
+    return [tuple(int(c) for c in colors[i]) for i in order], counts[order]
+
+
+def test_dominant_colors_match_a_naive_count(counting):
+    rng = np.random.default_rng(0)
+    palette = rng.integers(0, 256, (12, 3), dtype=np.uint8)
+    # Distinct frequencies, so the order of the top colors is fixed
+    weights = np.arange(1, 13) ** 2
+    labels = rng.permutation(np.repeat(np.arange(12), weights))
+    img = palette[labels].reshape(26, 25, 3)
+
+    stats = frame_statistics(img, top_n=8)
+    colors, counts = reference(img)
+    assert stats.total_pixels == img.shape[0] * img.shape[1]
+    assert stats.unique_colors == len(colors)
+    assert [rgb for rgb, _, _, _ in stats.top_colors] == colors[:8]
+    assert [count for _, _, count, _ in stats.top_colors] == counts[:8].tolist()
+    for _, _, count, share in stats.top_colors:
+        assert share == pytest.approx(count / stats.total_pixels)
+    expected_average = tuple(int(c) for c in img.reshape(-1, 3).mean(axis=0))
+    assert stats.average_color == expected_average
+
+
+def test_single_color_frame(counting):
+    img = np.full((40, 30, 3), (200, 10, 90), dtype=np.uint8)
+    stats = frame_statistics(img, name_colors=lambda rgb: ["magenta"] * len(rgb))
+    assert stats.unique_colors == 1
+    assert stats.average_color == (200, 10, 90)
+    assert stats.top_colors == [((200, 10, 90), "magenta", 1200, 1.0)]
+
+
+def test_all_unique_frame(counting):
+    packed = np.random.default_rng(1).choice(1 << 24, 64 * 64, replace=False).astype(np.uint32)
+    img = frame_stats.unpack_rgb(packed).reshape(64, 64, 3)
+    stats = frame_statistics(img, top_n=5)
+    assert stats.unique_colors == 64 * 64
+    assert len(stats.top_colors) == 5
+    pixels = set(map(tuple, img.reshape(-1, 3).tolist()))
+    for rgb, name, count, share in stats.top_colors:
+        assert rgb in pixels
+        assert name == ""
+        assert count == 1
+        assert share == pytest.approx(1 / (64 * 64))
@@ -0,0 +1,59 @@
+import cv2
+import numpy as np
+import pytest
+
+from benchmark import synthetic_frame
+from color_engine import ColorEngine
+from color_lut import LUTCache
+from live_view import process_camera_frame, transform_camera_frame
+from perf_monitor import PerfMonitor
+from tile_cache import IncrementalTransform
+
+VIEWS = (("Simulated", "simulated", None), ("Corrected (Daltonized)", "corrected", 0.7))
+
+
+@pytest.fixture(scope="module")
+def lut_cache():
+    return LUTCache(max_entries=64, max_bytes=4 << 30)
+
+
+def rgb_reference(engine, frame, cb_type, mode, strength):
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    out = engine.transform(rgb, cb_type, mode, strength)
+    return cv2.cvtColor(out, cv2.COLOR_RGB2BGR)
+
+
+@pytest.mark.parametrize("backend", ["fused", "lut", "matrix"])
+@pytest.mark.parametrize("cb_type", ["protanopia", "tritanopia", "protanomaly", "deuteranomaly"])
+@pytest.mark.parametrize("view_mode, mode, strength", VIEWS)
+@pytest.mark.parametrize("incremental", [False, True])
+def test_live_view_transforms_bgr_frames_like_rgb_front_ends(lut_cache, backend, cb_type, view_mode, mode, strength,
+                                                              incremental):
+    engine = ColorEngine(backend=backend, lut_cache=lut_cache)
+    frame = synthetic_frame(96, 128)
+    expected = rgb_reference(engine, frame, cb_type, mode, strength)
+    result = transform_camera_frame(engine, frame, cb_type, view_mode, cb_type, PerfMonitor(),
+                                    IncrementalTransform() if incremental else None)
+    # Rows below the label
+    diff = np.abs(result[40:].astype(np.int16) - expected[40:])
+    assert diff.max() <= 1
+
+
+def test_protanomaly_turns_pure_red_dark(lut_cache):
+    engine = ColorEngine(lut_cache=lut_cache)
+    frame = np.zeros((64, 64, 3), dtype=np.uint8)
+    frame[...] = (0, 0, 255)
+    result = transform_camera_frame(engine, frame, "protanomaly", "Simulated", "protanomaly", PerfMonitor())
+    b, g, r = result[-1, -1]
+    # (38.8, 29.9, 0) before rounding
+    assert np.abs(np.array([r, g, b], dtype=int) - (39, 30, 0)).max() <= 1
+
+
+def test_frames_overwritten_while_mirrored_are_skipped(lut_cache):
+    engine = ColorEngine(lut_cache=lut_cache)
+    frame = synthetic_frame(48, 64)
+    assert process_camera_frame(engine, frame, None, "Normal", "Normal Vision", PerfMonitor(),
+                                intact=lambda: False) is None
+    display, _ = process_camera_frame(engine, frame, None, "Normal", "Normal Vision", PerfMonitor(),
+                                      intact=lambda: True)
+    assert (display[40:] == cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)[40:]).all()
@@ -0,0 +1,18 @@
+import pytest
+
+from model2 import parse_args
+
+
+def test_raw_source_without_size_is_a_usage_error(tmp_path, capsys):
+    source = tmp_path / "frames.raw"
+    source.write_bytes(bytes(16))
+    with pytest.raises(SystemExit) as exit_info:
+        parse_args(["--source", str(source)])
+    assert exit_info.value.code == 2
+    assert "--width and --height" in capsys.readouterr().err
+    assert parse_args(["--source", str(source), "--width", "4", "--height", "4"]).width == 4
+
+
+def test_missing_raw_file_is_a_usage_error(tmp_path):
+    with pytest.raises(SystemExit):
+        parse_args(["--source", str(tmp_path / "missing.npy")])
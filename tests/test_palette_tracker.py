@@ -0,0 +1,65 @@
+import numpy as np
+
+from palette_tracker import PaletteTracker
+
+COLORS = {"red": (220, 30, 30), "green": (30, 200, 60), "blue": (30, 60, 220), "yellow": (240, 230, 40)}
+RGB = np.array(list(COLORS.values()), dtype=np.float64)
+
+
+def nearest_names(colors):
+    d = ((np.asarray(colors, dtype=np.float64)[:, None] - RGB[None]) ** 2).sum(axis=2)
+    return [list(COLORS)[i] for i in d.argmin(axis=1)]
+
+
+def quadrants(h=120, w=160, noise=0, seed=0):
+    """Frame split into four blocks, one per known color, with optional noise"""
+    frame = np.empty((h, w, 3), dtype=np.int16)
+    frame[:h // 2, :w // 2] = COLORS["red"]
+    frame[:h // 2, w // 2:] = COLORS["green"]
+    frame[h // 2:, :w // 2] = COLORS["blue"]
+    frame[h // 2:, w // 2:] = COLORS["yellow"]
+    if noise:
+        frame += np.random.default_rng(seed).integers(-noise, noise + 1, frame.shape, dtype=np.int16)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def test_converges_on_a_frame_with_known_colors():
+    tracker = PaletteTracker(nearest_names, k=4, budget_s=1.0)
+    for _ in range(5):
+        tracker.update(quadrants())
+    assert {name for _, name, _ in tracker.palette} == set(COLORS)
+    for rgb, name, share in tracker.palette:
+        assert np.abs(np.array(rgb) - COLORS[name]).max() <= 2
+        assert abs(share - 0.25) < 0.05
+    assert tracker.version == 1
+    assert tracker.announcement().startswith("Main colors are ")
+
+
+def test_warm_start_keeps_cluster_order_across_similar_frames():
+    tracker = PaletteTracker(nearest_names, k=4, budget_s=1.0)
+    for _ in range(5):
+        tracker.update(quadrants())
+    order = nearest_names(tracker.centroids)
+    assert sorted(order) == sorted(COLORS)
+    for seed in range(10):
+        assert not tracker.update(quadrants(noise=6, seed=seed))
+        assert nearest_names(tracker.centroids) == order
+    assert tracker.version == 1
+
+
+def test_refinement_stops_at_the_time_budget():
+    frame = np.random.default_rng(0).integers(0, 256, (600, 800, 3), dtype=np.uint8)
+    # One batch always runs, even without a budget
+    tracker = PaletteTracker(nearest_names, k=8, budget_s=0.0)
+    tracker.update(frame)
+    tracker.update(frame)
+    assert tracker.iterations == 1
+
+    tracker = PaletteTracker(nearest_names, k=8, sample_size=20_000, budget_s=0.01)
+    # The first update also seeds the clusters; time a warm one
+    tracker.update(frame)
+    tracker.update(frame)
+    # The deadline, not the pass limit (4 passes over the sample), ended the refinement
+    assert 1 < tracker.iterations < 4 * 20_000 // tracker.batch_size
+    # Sampling, the final assignment and naming come on top of the budget
+    assert tracker.last_seconds < 0.01 + 0.05
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from patch_sampler import PatchSampler
+
+# Centre, near an edge and in a corner, so clipped patches are covered too
+POINTS = [(40, 30), (2, 33), (78, 58)]
+
+
+@pytest.fixture(scope="module")
+def noisy():
+    return np.random.default_rng(0).integers(0, 256, (60, 80, 3), dtype=np.uint8)
+
+
+def disc(image, x, y, radius):
+    """Pixels of the exact disc around (x, y), clipped to the image"""
+    h, w = image.shape[:2]
+    yy, xx = np.mgrid[:h, :w]
+    return image[(xx - x) ** 2 + (yy - y) ** 2 <= radius * radius]
+
+
+def staircase(sampler, image, x, y, radius):
+    """Pixels of the bands the sampler sums for a circle, clipped to the image"""
+    h, w = image.shape[:2]
+    mask = np.zeros((h, w), dtype=bool)
+    for top, bottom, half in sampler._bands(radius):
+        mask[max(y + top, 0):max(y + bottom, 0), max(x - half, 0):max(x + half + 1, 0)] = True
+    return image[mask]
+
+
+@pytest.mark.parametrize("x, y", POINTS)
+@pytest.mark.parametrize("radius", [0, 1, 4, 12])
+def test_square_mean_and_median_match_a_direct_computation(noisy, x, y, radius):
+    sampler = PatchSampler(noisy)
+    patch = noisy[max(y - radius, 0):y + radius + 1, max(x - radius, 0):x + radius + 1].reshape(-1, 3)
+    assert sampler.mean(x, y, radius) == pytest.approx(patch.mean(axis=0))
+    assert sampler.robust_color(x, y, radius) == tuple(int(v) for v in np.median(patch, axis=0))
+
+
+@pytest.mark.parametrize("x, y", POINTS)
+@pytest.mark.parametrize("radius", [1, 2, 3])
+def test_small_circles_are_exact(noisy, x, y, radius):
+    sampler = PatchSampler(noisy)
+    patch = disc(noisy, x, y, radius)
+    assert sampler.mean(x, y, radius, 'circle') == pytest.approx(patch.mean(axis=0))
+    assert sampler.robust_color(x, y, radius, 'circle') == tuple(int(v) for v in np.median(patch, axis=0))
+
+
+@pytest.mark.parametrize("x, y", POINTS)
+@pytest.mark.parametrize("radius", [4, 9, 25])
+def test_large_circles_follow_the_disc(noisy, x, y, radius):
+    sampler = PatchSampler(noisy)
+    patch = disc(noisy, x, y, radius)
+    # The median reads the exact disc
+    assert sampler.robust_color(x, y, radius, 'circle') == tuple(int(v) for v in np.median(patch, axis=0))
+    # The mean is exactly the mean of the band staircase...
+    assert sampler.mean(x, y, radius, 'circle') == pytest.approx(staircase(sampler, noisy, x, y, radius).mean(axis=0))
+    # ...which holds about as many pixels as the disc, and follows it on a smooth image
+    staircase_area = sum((bottom - top) * (2 * half + 1) for top, bottom, half in sampler._bands(radius))
+    disc_area = len(disc(np.zeros((2 * radius + 1, 2 * radius + 1)), radius, radius, radius))
+    assert abs(staircase_area - disc_area) <= 0.1 * disc_area
+    h, w = noisy.shape[:2]
+    yy, xx = np.mgrid[:h, :w]
+    gradient = np.dstack([xx * 3, yy * 4, np.full((h, w), 128)]).astype(np.uint8)
+    smooth = PatchSampler(gradient)
+    assert np.abs(smooth.mean(x, y, radius, 'circle') - disc(gradient, x, y, radius).mean(axis=0)).max() < 2
+
+
+def test_dense_means_match_single_queries(noisy):
+    sampler = PatchSampler(noisy)
+    ys, xs, means = sampler.dense_means(16, 5, 'circle')
+    for i, y in enumerate(ys):
+        for j, x in enumerate(xs):
+            assert means[i, j] == pytest.approx(sampler.mean(x, y, 5, 'circle'))
@@ -0,0 +1,125 @@
+import json
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from recorder import VideoRecorder
+
+
+class GatedRecorder(VideoRecorder):
+    """Recorder whose encoder waits for ``gate`` before each frame and keeps what it was given"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gate = threading.Event()
+        self.seen = []
+
+    def _decode(self, frame, rgb):
+        self.gate.wait()
+        self.seen.append(np.array(frame))
+        return super()._decode(frame, rgb)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline
+        time.sleep(0.005)
+
+
+def frame(value):
+    return np.full((32, 48, 3), value, dtype=np.uint8)
+
+
+def labels(recorder):
+    with open(recorder.log_path, encoding="utf-8") as f:
+        return [line['label'] for line in map(json.loads, f) if 'frame' in line]
+
+
+def test_drop_oldest_never_waits_and_counts_drops(tmp_path):
+    recorder = GatedRecorder(str(tmp_path / "drop.avi"), codec='mjpeg', queue_size=4).start()
+    recorder.write(frame(0), label="0")
+    # The encoder holds frame 0, so the next frames queue up
+    wait_for(lambda: recorder.queue_depth == 0)
+    start = time.perf_counter()
+    assert all(recorder.write(frame(i), label=str(i)) for i in range(1, 10))
+    assert time.perf_counter() - start < 1.0
+    assert recorder.queue_depth == 4
+    assert recorder.dropped == 5
+    recorder.gate.set()
+    recorder.stop()
+    assert recorder.written == 5
+    assert labels(recorder) == ["0", "6", "7", "8", "9"]
+
+
+def test_block_waits_for_the_encoder_and_drops_nothing(tmp_path):
+    recorder = GatedRecorder(str(tmp_path / "block.avi"), codec='mjpeg', queue_size=2, policy='block').start()
+    recorder.write(frame(0), label="0")
+    wait_for(lambda: recorder.queue_depth == 0)
+    recorder.write(frame(1), label="1")
+    recorder.write(frame(2), label="2")
+    writer = threading.Thread(target=recorder.write, args=(frame(3),), kwargs={'label': "3"})
+    writer.start()
+    writer.join(0.2)
+    # The queue is full, so the caller waits
+    assert writer.is_alive()
+    recorder.gate.set()
+    writer.join(5.0)
+    assert not writer.is_alive()
+    recorder.stop()
+    assert recorder.dropped == 0
+    assert recorder.written == 4
+    assert labels(recorder) == ["0", "1", "2", "3"]
+
+
+def test_frames_are_copied_on_write(tmp_path):
+    recorder = GatedRecorder(str(tmp_path / "copy.avi"), codec='mjpeg').start()
+    buffer = frame(10)
+    recorder.write(buffer)
+    # The caller reuses its buffer before the encoder gets to the frame
+    buffer[...] = 200
+    recorder.write(buffer)
+    recorder.gate.set()
+    recorder.stop()
+    assert [int(seen[0, 0, 0]) for seen in recorder.seen] == [10, 200]
+
+
+def test_sidecar_log_describes_every_frame(tmp_path):
+    recorder = VideoRecorder(str(tmp_path / "log.avi"), fps=10, codec='mjpeg').start()
+    recorder.write(frame(50), "Protanopia (Red-blind)", "Simulated", timestamp=recorder.start_time + 0.1,
+                   cb_type='protanopia', severity=1.0)
+    rgb = cv2.cvtColor(frame(80), cv2.COLOR_BGR2RGB)
+    recorder.write(rgb, "Normal Vision", "Normal", rgb=True, timestamp=recorder.start_time + 0.2)
+    ok, jpeg = cv2.imencode(".jpg", frame(120))
+    recorder.write(jpeg.tobytes(), "Normal Vision", "Corrected (Daltonized)", timestamp=recorder.start_time + 0.3)
+    recorder.stop()
+    assert recorder.error is None
+
+    with open(recorder.log_path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert lines[:3] == [
+        {'frame': 0, 't': 0.1, 'label': "Protanopia (Red-blind)", 'mode': "Simulated", 'cb_type': 'protanopia',
+         'severity': 1.0},
+        {'frame': 1, 't': 0.2, 'label': "Normal Vision", 'mode': "Normal"},
+        {'frame': 2, 't': 0.3, 'label': "Normal Vision", 'mode': "Corrected (Daltonized)"},
+    ]
+    summary = lines[3]
+    assert summary['summary'] is True
+    assert summary['path'] == recorder.path
+    assert (summary['written'], summary['dropped']) == (3, 0)
+    assert len(lines) == 4
+
+    video = cv2.VideoCapture(recorder.path)
+    count = 0
+    while video.read()[0]:
+        count += 1
+    video.release()
+    assert count == 3
+
+
+def test_unknown_policy_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="policy"):
+        VideoRecorder(str(tmp_path / "x.avi"), policy='newest')
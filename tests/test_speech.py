@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+from speech import SpeechService, StubBackend
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Factory of started services on a StubBackend, stopped after the test"""
+    services = []
+
+    def start(delay=0.2, can_render=True, **options):
+        backend = StubBackend(delay, can_render)
+        speech = SpeechService(lambda: backend, cache_dir=str(tmp_path), **options)
+        services.append(speech)
+        assert speech.start() is None
+        return speech, backend
+
+    yield start
+    for speech in services:
+        speech.stop()
+
+
+def test_speaks_text(service):
+    speech, backend = service(delay=0.0)
+    assert speech.speak("This color is red")
+    wait_for(speech.idle)
+    assert backend.spoken == ["This color is red"]
+
+
+def test_repeats_are_merged_while_speaking(service):
+    # No audio cache, so every utterance goes through say()
+    speech, backend = service(cache_after=100)
+    speech.speak("red")
+    wait_for(lambda: speech.current == "red")
+    assert not speech.speak("red")
+    speech.speak("blue")
+    assert not speech.speak("blue")
+    wait_for(speech.idle)
+    assert backend.spoken == ["red", "blue"]
+    assert speech.merged == 2
+
+
+def test_outdated_requests_are_dropped(service):
+    speech, backend = service(cache_after=100)
+    speech.speak("red")
+    wait_for(lambda: speech.current == "red")
+    for text in ("green", "blue", "yellow"):
+        speech.speak(text)
+    wait_for(speech.idle)
+    # Only the newest color waiting behind the current one is spoken
+    assert backend.spoken == ["red", "yellow"]
+    assert speech.dropped == 2
+
+
+def test_frequent_phrases_are_played_from_cache(service):
+    speech, backend = service(delay=0.0)
+    for _ in range(3):
+        speech.speak("red")
+        wait_for(speech.idle)
+    # First request is spoken directly, the second renders it once, then it is replayed
+    assert backend.spoken == ["red"]
+    assert backend.rendered == ["red"]
+    assert len(backend.played) == 2
+
+
+def test_backend_without_rendering_falls_back_to_speech(service):
+    speech, backend = service(delay=0.0, can_render=False)
+    for _ in range(3):
+        speech.speak("red")
+        wait_for(speech.idle)
+    assert backend.spoken == ["red"] * 3 and not backend.played
+
+
+def test_prerendered_phrases_are_cached_while_idle(service):
+    speech, backend = service(delay=0.0)
+    speech.prerender(["red", "blue"])
+    wait_for(lambda: len(speech.audio_cache) == 2)
+    speech.speak("blue")
+    wait_for(speech.idle)
+    assert backend.spoken == [] and backend.played == [speech.audio_cache["blue"]]
+
+
+def test_failing_backend_reports_error():
+    def broken():
+        raise RuntimeError("no audio device")
+    speech = SpeechService(broken)
+    assert "no audio device" in speech.start()
+    assert not speech.speak("red")
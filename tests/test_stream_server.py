@@ -0,0 +1,34 @@
+import asyncio
+
+from stream_server import StreamServer, check_load_test, load_test
+
+
+def test_slow_clients_get_fresh_frames_without_slowing_the_rest():
+    results, stats = asyncio.run(load_test(clients=3, slow=1, duration=2.5))
+    assert stats['frames'] > 0
+    assert check_load_test(results) == []
+    assert all(r['fps'] > 10 for r in results if not r['slow'])
+
+
+def test_malformed_request_line_gets_400():
+    async def request(server, data):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(data)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+
+    async def run():
+        server = await StreamServer(("synthetic", 64, 48, 10), port=0).start()
+        try:
+            bad = [await request(server, line) for line in (b"GARBAGE\r\n\r\n", b"GET\r\n\r\n",
+                                                             b"GET nothing HTTP/1.1\r\n\r\n")]
+            good = await request(server, b"GET /stats HTTP/1.1\r\n\r\n")
+        finally:
+            await server.stop()
+        return bad, good
+
+    bad, good = asyncio.run(run())
+    assert all(response.startswith(b"HTTP/1.1 400 ") for response in bad)
+    assert good.startswith(b"HTTP/1.1 200 ")
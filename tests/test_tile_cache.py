@@ -0,0 +1,27 @@
+import pytest
+
+from benchmark import synthetic_frame
+from color_engine import ColorEngine
+from tile_cache import IncrementalTransform
+
+
+@pytest.mark.parametrize("backend", ["fused", "lut", "matrix"])
+def test_tiles_match_a_full_transform_without_reallocating(backend):
+    engine = ColorEngine()
+    engine.backend = backend
+    incremental = IncrementalTransform(tile=16)
+    transform = lambda img, out=None: engine.simulate_color_blindness(img, 'protanopia', out)
+
+    frame = synthetic_frame(100, 70)
+    incremental.apply(frame, 'key', transform)
+    output = incremental.output
+    buffer = engine._output_buffer
+
+    moved = frame.copy()
+    moved[20:40, 10:60] = 255 - moved[20:40, 10:60]
+    result = incremental.apply(moved, 'key', transform)
+    assert incremental.last_reused_fraction > 0
+    assert result is output
+    # Tiles of other shapes must not resize the engine's frame buffer
+    assert engine._output_buffer is buffer
+    assert (result == engine.simulate_color_blindness(moved, 'protanopia')).all()
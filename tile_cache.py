@@ -0,0 +1,101 @@
+import cv2
+import numpy as np
+
+
+class IncrementalTransform:
+    """Re-runs a per-pixel transform only on the tiles of a frame that changed.
+
+    The frame is split into ``tile`` x ``tile`` blocks. A tile counts as
+    changed when any of its pixels differs by more than ``threshold``
+    levels from the raw pixels its cached output was computed from, so
+    slow drift also triggers a refresh eventually. Changed tiles are
+    transformed in horizontal runs; all others are reused from the
+    previous output. A new ``key`` (settings, deficiency type) or frame
+    size forces a full refresh, as does motion over more than
+    ``full_refresh_fraction`` of the tiles.
+
+    ``transform(img, out)`` writes the transform of img into out, a
+    view of the output, and returns it (or returns a result to copy
+    there). The output and reference frames are allocated once per frame
+    size, so a run of tiles does not allocate a buffer of its own shape.
+    The returned output is owned by this object and reused on the next
+    call. Drawing the same overlay on it every frame is fine.
+    """
+
+    def __init__(self, tile=32, threshold=16, full_refresh_fraction=0.5):
+        self.tile = tile
+        self.threshold = threshold
+        self.full_refresh_fraction = full_refresh_fraction
+        self.reset()
+
+    def reset(self):
+        self.key = None
+        self.reference = None
+        self.output = None
+        self.tiles_total = 0
+        self.tiles_reused = 0
+        self.last_reused_fraction = 0.0
+
+    @property
+    def reused_fraction(self):
+        """Share of tiles reused since the last reset"""
+        return self.tiles_reused / self.tiles_total if self.tiles_total else 0.0
+
+    def changed_tiles(self, frame):
+        """Boolean (tile rows, tile columns) grid of tiles that differ from the reference"""
+        t = self.tile
+        h, w = frame.shape[:2]
+        diff = cv2.absdiff(frame, self.reference).reshape(h, -1)
+        rows, cols = -(-h // t), -(-w // t)
+        full_rows = h // t
+        # Max over each tile's rows, then over its columns (channels included)
+        row_max = np.zeros((rows, cols * t * (diff.shape[1] // w)), dtype=np.uint8)
+        row_max[:full_rows, :diff.shape[1]] = diff[:full_rows * t].reshape(full_rows, t, -1).max(axis=1)
+        if full_rows < rows:
+            row_max[-1, :diff.shape[1]] = diff[full_rows * t:].max(axis=0)
+        return row_max.reshape(rows, cols, -1).max(axis=2) > self.threshold
+
+    def apply(self, frame, key, transform):
+        """Transformed frame, recomputing only the tiles that changed"""
+        if key != self.key or self.output is None or self.output.shape != frame.shape:
+            return self._refresh(frame, key, transform)
+        changed = self.changed_tiles(frame)
+        count = int(changed.sum())
+        if count > self.full_refresh_fraction * changed.size:
+            return self._refresh(frame, key, transform)
+
+        t = self.tile
+        h, w = frame.shape[:2]
+        for ty in np.flatnonzero(changed.any(axis=1)):
+            row = changed[ty]
+            # Transform each horizontal run of changed tiles in one call
+            edges = np.flatnonzero(np.diff(np.concatenate(([False], row, [False]))))
+            y0, y1 = ty * t, min((ty + 1) * t, h)
+            for start, end in zip(edges[::2], edges[1::2]):
+                x0, x1 = start * t, min(end * t, w)
+                self._transform_into(transform, frame[y0:y1, x0:x1], self.output[y0:y1, x0:x1])
+                self.reference[y0:y1, x0:x1] = frame[y0:y1, x0:x1]
+        self._count(changed.size, changed.size - count)
+        return self.output
+
+    def _refresh(self, frame, key, transform):
+        self.key = key
+        if self.output is None or self.output.shape != frame.shape:
+            self.output = np.empty(frame.shape, dtype=np.uint8)
+            self.reference = np.empty(frame.shape, dtype=np.uint8)
+        self._transform_into(transform, frame, self.output)
+        np.copyto(self.reference, frame)
+        tiles = -(-frame.shape[0] // self.tile) * -(-frame.shape[1] // self.tile)
+        self._count(tiles, 0)
+        return self.output
+
+    @staticmethod
+    def _transform_into(transform, img, out):
+        result = transform(img, out)
+        if result is not out:
+            np.copyto(out, result)
+
+    def _count(self, total, reused):
+        self.tiles_total += total
+        self.tiles_reused += reused
+        self.last_reused_fraction = reused / total if total else 0.0